@@ -0,0 +1,35 @@
+"""
+JWT authentication from signed claims (see accounts.claims).
+
+Access tokens issued by login/refresh carry the user's role, staff and active flags, therapist
+profile and memberships, so the request user is built from the token without loading the row.
+Inactive users are rejected as in simplejwt. Tokens without those claims (issued before they
+existed) fall back to the database lookup.
+"""
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .claims import has_user_claims, user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that builds a lightweight User from token claims when present."""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if not has_user_claims(validated_token):
+            return super().get_user(validated_token)
+        user = user_from_claims(validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """OpenAPI bearer scheme for ClaimsJWTAuthentication (same as simplejwt's)."""
+
+    target_class = ClaimsJWTAuthentication
@@ -0,0 +1,93 @@
+"""
+Per-user authorization context: role flags plus a clinic_id -> membership role map.
+
+The membership map is loaded at most once per request (memoized on the user object, which DRF
+keeps for the whole request) and cached across requests under AUTHZ_CACHE_KEY in the shared
+settings.AUTHZ_CACHE alias, so an invalidation reaches every worker. Without a shared backend
+that alias is a dummy cache and only the per-request memo applies. Membership.save and
+Membership.delete invalidate it; writes that bypass those (queryset update/delete, clinic
+cascade deletes) are bounded by AUTHZ_TTL.
+"""
+
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+
+AUTHZ_CACHE_KEY = "accounts:authz:{user_id}"
+AUTHZ_TTL = 5 * 60
+
+# Attribute memoizing the membership map on a user instance
+_MEMO_ATTR = "_authz_memberships"
+
+
+@dataclass(frozen=True)
+class AuthzContext:
+    """Authorization facts about one user; membership checks need no queries."""
+
+    user_id: int | None
+    role: str | None
+    is_staff: bool
+    memberships: dict[int, str] = field(default_factory=dict)
+
+    def clinic_role(self, clinic) -> str | None:
+        """Membership role in clinic (Clinic or id), or None if not a member."""
+        return self.memberships.get(getattr(clinic, "pk", clinic))
+
+    def is_clinic_admin_of(self, clinic) -> bool:
+        from clinics.models import Membership
+
+        return self.clinic_role(clinic) == Membership.MemberRole.ADMIN
+
+    def is_therapist_of(self, clinic) -> bool:
+        from clinics.models import Membership
+
+        return self.clinic_role(clinic) == Membership.MemberRole.THERAPIST
+
+
+def load_memberships(user_id) -> dict[int, str]:
+    """clinic_id -> role for the user, straight from the database."""
+    from clinics.models import Membership
+
+    return dict(Membership.objects.filter(user_id=user_id).values_list("clinic_id", "role"))
+
+
+def _cache():
+    return caches[getattr(settings, "AUTHZ_CACHE", "authz")]
+
+
+def _memberships(user) -> dict[int, str]:
+    memberships = getattr(user, _MEMO_ATTR, None)
+    if memberships is not None:
+        return memberships
+    key = AUTHZ_CACHE_KEY.format(user_id=user.pk)
+    memberships = _cache().get(key)
+    if memberships is None:
+        memberships = load_memberships(user.pk)
+        _cache().set(key, memberships, AUTHZ_TTL)
+    setattr(user, _MEMO_ATTR, memberships)
+    return memberships
+
+
+def get_authz(user) -> AuthzContext:
+    """Authorization context for user (anonymous users get an empty one)."""
+    if not getattr(user, "is_authenticated", False):
+        return AuthzContext(user_id=None, role=None, is_staff=False)
+    return AuthzContext(
+        user_id=user.pk,
+        role=user.role,
+        is_staff=user.is_staff,
+        memberships=_memberships(user),
+    )
+
+
+def set_memberships(user, memberships: dict[int, str]) -> None:
+    """Use a membership map already known for this request (e.g. from token claims)."""
+    setattr(user, _MEMO_ATTR, memberships)
+
+
+def invalidate_authz(user_id, user=None) -> None:
+    """Drop the cached membership map of user_id (and the memo on user, if given)."""
+    _cache().delete(AUTHZ_CACHE_KEY.format(user_id=user_id))
+    if user is not None and hasattr(user, _MEMO_ATTR):
+        delattr(user, _MEMO_ATTR)
@@ -0,0 +1,214 @@
+"""
+Refresh-token blacklist checks backed by an in-process Bloom filter, and expired-token purging.
+
+With ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION every refresh first checks that the
+presented token is not blacklisted. The filter holds the jtis of all unexpired blacklisted
+tokens, so a token that is not in it is known not to be blacklisted without a query; hits (real
+or false positives) are confirmed against the database as before.
+
+Processes keep their filter current through the shared settings.JWT_BLACKLIST_CACHE alias: every
+blacklist made through RefreshToken below appends its jti to a cached log (a sequence counter plus
+one key per entry), and a filter that sees the counter move adds the new jtis without touching
+the database. If log entries are missing (evicted, or the counter was reset) the filter re-reads
+recent rows from the database instead. Filters are also rebuilt every BLACKLIST_FILTER_MAX_AGE
+seconds, which bounds staleness from writes that bypass this module (e.g. the admin). A token
+rotated on one worker must be seen by every other worker's filter, so settings.JWT_BLACKLIST_FILTER
+refuses to work (ImproperlyConfigured) when that alias is a local-memory or dummy backend; without
+REDIS_URL it is a dummy cache and the filter stays off.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+BLACKLIST_SEQ_CACHE_KEY = "accounts:jwt_blacklist:seq"
+BLACKLIST_LOG_CACHE_KEY = "accounts:jwt_blacklist:log:{seq}"
+BLACKLIST_FILTER_MAX_AGE = 5 * 60
+BLACKLIST_FILTER_ERROR_RATE = 0.001
+MIN_FILTER_CAPACITY = 10_000
+# Larger gaps in the cached log are synced from the database
+MAX_LOG_SYNC = 1000
+# Ids are assigned before commit, so a database sync re-reads this many ids below the last one
+# seen to catch rows from transactions that committed out of id order.
+SYNC_ID_OVERLAP = 1000
+
+PURGE_BATCH_SIZE = 5000
+
+# Backends that are not shared between processes
+LOCAL_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+
+def _cache():
+    return caches[getattr(settings, "JWT_BLACKLIST_CACHE", "jwt_blacklist")]
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float = BLACKLIST_FILTER_ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class BlacklistFilter:
+    """Per-process Bloom filter of unexpired blacklisted jtis, synced via the cached log."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.bloom = None
+        self.synced_id = 0
+        self.seq = 0
+        self.built_at = 0.0
+
+    def _add(self, jti: str) -> None:
+        if jti not in self.bloom:
+            self.bloom.add(jti)
+
+    def _rebuild(self, seq: int) -> None:
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        bloom = BloomFilter(max(live.count() * 2, MIN_FILTER_CAPACITY))
+        synced_id = 0
+        for row_id, jti in live.order_by("id").values_list("id", "token__jti").iterator():
+            bloom.add(jti)
+            synced_id = row_id
+        self.bloom, self.synced_id, self.seq = bloom, synced_id, seq
+        self.built_at = time.monotonic()
+
+    def _sync_from_log(self, seq: int) -> bool:
+        """Add jtis logged after self.seq up to seq. False if any entry is missing."""
+        keys = [BLACKLIST_LOG_CACHE_KEY.format(seq=n) for n in range(self.seq + 1, seq + 1)]
+        entries = _cache().get_many(keys)
+        if len(entries) != len(keys):
+            return False
+        for jti in entries.values():
+            self._add(jti)
+        return True
+
+    def _sync_from_db(self) -> None:
+        rows = BlacklistedToken.objects.filter(id__gt=self.synced_id - SYNC_ID_OVERLAP)
+        for row_id, jti in rows.order_by("id").values_list("id", "token__jti").iterator():
+            self._add(jti)
+            self.synced_id = max(self.synced_id, row_id)
+
+    def might_contain(self, jti: str) -> bool:
+        """False only if jti is certainly not blacklisted."""
+        # Read the counter before syncing: a blacklist racing the sync moves it again
+        seq = _cache().get(BLACKLIST_SEQ_CACHE_KEY, 0)
+        with self._lock:
+            stale = time.monotonic() - self.built_at > BLACKLIST_FILTER_MAX_AGE
+            if self.bloom is None or stale or seq < self.seq:
+                self._rebuild(seq)
+            elif seq != self.seq:
+                if seq - self.seq > MAX_LOG_SYNC or not self._sync_from_log(seq):
+                    self._sync_from_db()
+                self.seq = seq
+                if self.bloom.count > self.bloom.capacity:
+                    self._rebuild(seq)
+            return jti in self.bloom
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def blacklist_filter_enabled() -> bool:
+    """settings.JWT_BLACKLIST_FILTER; raises ImproperlyConfigured if its cache is process-local."""
+    if not getattr(settings, "JWT_BLACKLIST_FILTER", False):
+        return False
+    if isinstance(_cache(), LOCAL_CACHE_BACKENDS):
+        raise ImproperlyConfigured(
+            "JWT_BLACKLIST_FILTER needs a cache shared by all workers, but the "
+            f"{getattr(settings, 'JWT_BLACKLIST_CACHE', 'jwt_blacklist')!r} cache is "
+            "process-local (set REDIS_URL)."
+        )
+    return True
+
+
+def log_blacklisted(jti: str) -> None:
+    """Append jti to the cached blacklist log (called after the blacklist commits)."""
+    cache = _cache()
+    try:
+        seq = cache.incr(BLACKLIST_SEQ_CACHE_KEY)
+    except ValueError:
+        cache.add(BLACKLIST_SEQ_CACHE_KEY, 0, None)
+        seq = cache.incr(BLACKLIST_SEQ_CACHE_KEY)
+    cache.set(BLACKLIST_LOG_CACHE_KEY.format(seq=seq), jti, BLACKLIST_FILTER_MAX_AGE * 2)
+
+
+class RefreshToken(BaseRefreshToken):
+    """RefreshToken whose blacklist check skips the query for jtis not in the filter."""
+
+    def check_blacklist(self) -> None:
+        if blacklist_filter_enabled() and not blacklist_filter.might_contain(
+            self.payload[api_settings.JTI_CLAIM]
+        ):
+            return
+        super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        if blacklist_filter_enabled():
+            jti = self.payload[api_settings.JTI_CLAIM]
+            transaction.on_commit(lambda: log_blacklisted(jti))
+        return result
+
+
+def purge_expired_tokens(*, batch_size=PURGE_BATCH_SIZE, now=None, pause=0.0, full=False) -> int:
+    """
+    Delete expired outstanding tokens (and their blacklist rows) in primary-key order, one short
+    transaction per batch. Refresh lifetime is constant, so expiry follows id order and the walk
+    stops at the first batch holding an unexpired token instead of scanning the rest of the table
+    (full=True walks the whole table, e.g. after a lifetime change).
+    Returns the number of outstanding tokens deleted.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    last_id = 0
+    while True:
+        rows = list(
+            OutstandingToken.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "expires_at")[:batch_size]
+        )
+        expired = [row_id for row_id, expires_at in rows if expires_at <= now]
+        if expired:
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=expired).delete()
+                OutstandingToken.objects.filter(id__in=expired).delete()
+            deleted += len(expired)
+        if len(rows) < batch_size or (not full and len(expired) < len(rows)):
+            return deleted
+        last_id = rows[-1][0]
+        if pause:
+            time.sleep(pause)
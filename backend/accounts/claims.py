@@ -0,0 +1,99 @@
+"""
+Authorization claims carried in JWT access tokens.
+
+Login and refresh sign the user's role, is_staff, is_active, therapist profile id and clinic
+memberships into the token, so authenticated requests can build the user from the token instead of loading
+the row (see accounts.authentication). Claims are re-read from the database on every refresh,
+so ACCESS_TOKEN_LIFETIME bounds how long a role or membership change can go unnoticed.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.settings import api_settings
+
+from .authz import set_memberships
+from .models import User
+
+CLAIM_ROLE = "role"
+CLAIM_IS_STAFF = "is_staff"
+CLAIM_IS_ACTIVE = "is_active"
+CLAIM_THERAPIST_PROFILE = "therapist_profile_id"
+CLAIM_MEMBERSHIPS = "memberships"
+CLAIMS = (CLAIM_ROLE, CLAIM_IS_STAFF, CLAIM_IS_ACTIVE, CLAIM_THERAPIST_PROFILE)
+
+# Larger membership sets are left out of the token and loaded through accounts.authz
+MAX_MEMBERSHIP_CLAIMS = 50
+
+# Attribute holding the therapist profile id on users built from claims
+_THERAPIST_PROFILE_ATTR = "_claims_therapist_profile_id"
+# Marks a claims-built user; User.save refuses it until load_full_user has run
+_FROM_CLAIMS_ATTR = "_from_claims"
+
+# Fields of the user row that a claims-built user has loaded; the rest are deferred
+_LOADED_FIELDS = ("id", "role", "is_staff", "is_active")
+
+
+def set_user_claims(token, user) -> None:
+    """Sign user's authorization facts into token (access or refresh)."""
+    from clinics.models import Membership
+    from directory.models import TherapistProfile
+
+    token[CLAIM_ROLE] = user.role
+    token[CLAIM_IS_STAFF] = user.is_staff
+    token[CLAIM_IS_ACTIVE] = user.is_active
+    token[CLAIM_THERAPIST_PROFILE] = (
+        TherapistProfile.objects.filter(user_id=user.pk).values_list("id", flat=True).first()
+    )
+    memberships = list(
+        Membership.objects.filter(user_id=user.pk)
+        .order_by("clinic_id")
+        .values_list("clinic_id", "role")[: MAX_MEMBERSHIP_CLAIMS + 1]
+    )
+    if len(memberships) <= MAX_MEMBERSHIP_CLAIMS:
+        token[CLAIM_MEMBERSHIPS] = [[clinic_id, role] for clinic_id, role in memberships]
+
+
+def has_user_claims(token) -> bool:
+    return all(claim in token for claim in CLAIMS)
+
+
+def user_from_claims(token) -> User:
+    """
+    A User instance built from token claims without a query. Only id, role, is_staff and
+    is_active are loaded; any other field is fetched on first access (see load_full_user).
+    The instance cannot be saved until load_full_user has replaced the claims with the row.
+    """
+    values = {
+        "id": User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM]),
+        "role": token[CLAIM_ROLE],
+        "is_staff": token[CLAIM_IS_STAFF],
+        "is_active": token[CLAIM_IS_ACTIVE],
+    }
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in _LOADED_FIELDS]
+    user = User.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+    setattr(user, _FROM_CLAIMS_ATTR, True)
+    setattr(user, _THERAPIST_PROFILE_ATTR, token[CLAIM_THERAPIST_PROFILE])
+    if CLAIM_MEMBERSHIPS in token:
+        set_memberships(user, dict(token[CLAIM_MEMBERSHIPS]))
+    return user
+
+
+def load_full_user(user) -> User:
+    """
+    Load the full row of a claims-built user in one query (no-op for full rows). The claimed
+    role, is_staff and is_active are replaced by current values, so the user is safe to save.
+    """
+    if getattr(user, _FROM_CLAIMS_ATTR, False):
+        user.refresh_from_db(fields=[f.attname for f in User._meta.concrete_fields])
+        setattr(user, _FROM_CLAIMS_ATTR, False)
+    elif user.get_deferred_fields():
+        user.refresh_from_db(fields=list(user.get_deferred_fields()))
+    return user
+
+
+def therapist_profile_id(user) -> int | None:
+    """Therapist profile id of user: from the token claims when present, else one query."""
+    if hasattr(user, _THERAPIST_PROFILE_ATTR):
+        return getattr(user, _THERAPIST_PROFILE_ATTR)
+    from directory.models import TherapistProfile
+
+    return TherapistProfile.objects.filter(user_id=user.pk).values_list("id", flat=True).first()
@@ -1,9 +1,50 @@
-"""JWT serializers: use email for login (User.USERNAME_FIELD = email)."""
+"""
+JWT serializers: use email for login (User.USERNAME_FIELD = email); sign authz claims;
+refresh and logout use the Bloom-filtered RefreshToken (accounts.blacklist).
+"""
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .blacklist import RefreshToken
+from .claims import set_user_claims
+from .models import User
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Obtain JWT using email + password. Our User uses email as USERNAME_FIELD."""
 
     username_field = "email"
+    token_class = RefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that re-reads authz claims, so role/membership changes apply on refresh."""
+
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = User.objects.filter(pk=access[api_settings.USER_ID_CLAIM]).first()
+        if user is not None:
+            set_user_claims(access, user)
+            data["access"] = str(access)
+        return data
+
+
+class FilteredTokenBlacklistSerializer(TokenBlacklistSerializer):
+    """Logout through the filtered RefreshToken, so other processes see the blacklist."""
+
+    token_class = RefreshToken
@@ -0,0 +1,28 @@
+"""Delete expired JWT outstanding/blacklisted token rows in short batches."""
+
+from django.core.management.base import BaseCommand
+
+from accounts.blacklist import PURGE_BATCH_SIZE, purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Purge expired OutstandingToken/BlacklistedToken rows in batches (no long locks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=PURGE_BATCH_SIZE, help="Tokens per transaction"
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.0, help="Seconds to sleep between batches"
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Scan the whole table instead of stopping at the first unexpired batch",
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(
+            batch_size=options["batch_size"], pause=options["pause"], full=options["full"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired tokens."))
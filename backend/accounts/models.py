@@ -1,6 +1,7 @@
 """
 User and role models.
 Custom User with email as username. Roles: HELP_SEEKER, THERAPIST, CLINIC_ADMIN, SUPPORT.
+ThrottleCounter backs the shared rate-limit storage when there is no Redis (config.throttling).
 """
 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
@@ -69,3 +70,18 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+    def save(self, *args, **kwargs):
+        # Users built from token claims (accounts.claims) carry role/is_staff as of token issue;
+        # saving one would write those back over the row
+        if getattr(self, "_from_claims", False):
+            raise ValueError("User built from token claims; call load_full_user() before saving.")
+        super().save(*args, **kwargs)
+
+
+class ThrottleCounter(models.Model):
+    """Requests of one client in one rate-limit window (config.throttling.DatabaseStorage)."""
+
+    key = models.CharField(max_length=255, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
@@ -7,6 +7,8 @@ Object-level permission helpers.
 
 from rest_framework import permissions
 
+from .authz import get_authz
+
 
 def user_is_therapist(user):
     """True if user has role THERAPIST."""
@@ -30,20 +32,12 @@ def user_is_support(user):
 
 def user_is_clinic_admin_of(user, clinic):
     """True if user is a clinic admin (membership role) for the given clinic."""
-    from clinics.models import Membership
-
-    return Membership.objects.filter(
-        user=user, clinic=clinic, role=Membership.MemberRole.ADMIN
-    ).exists()
+    return get_authz(user).is_clinic_admin_of(clinic)
 
 
 def user_is_therapist_of(user, clinic):
     """True if user is a therapist (membership) for the given clinic."""
-    from clinics.models import Membership
-
-    return Membership.objects.filter(
-        user=user, clinic=clinic, role=Membership.MemberRole.THERAPIST
-    ).exists()
+    return get_authz(user).is_therapist_of(clinic)
 
 
 class IsClinicAdmin(permissions.BasePermission):
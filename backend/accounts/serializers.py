@@ -2,6 +2,7 @@
 
 from rest_framework import serializers
 
+from .claims import therapist_profile_id
 from .models import User
 
 
@@ -28,10 +29,7 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "is_staff", "date_joined"]
 
     def get_therapist_profile_id(self, obj):
-        try:
-            return obj.therapist_profile.id
-        except Exception:
-            return None
+        return therapist_profile_id(obj)
 
     def create(self, validated_data):
         password = validated_data.pop("password", None)
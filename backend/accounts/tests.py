@@ -1,5 +1,7 @@
 """Account tests: register, login, logout, me."""
 
+import io
+
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework import status
@@ -81,3 +83,261 @@ class TestMe:
         assert resp.status_code == status.HTTP_200_OK
         assert resp.data["email"] == "me@example.com"
         assert resp.data["first_name"] == "Me"
+
+
+@pytest.mark.django_db
+class TestAuthzContext:
+    """Membership checks are served from the per-user authorization context."""
+
+    def test_membership_checks_cached(self, django_assert_num_queries):
+        from accounts.permissions import user_is_clinic_admin_of, user_is_therapist_of
+        from clinics.models import Clinic, Membership
+
+        clinic = Clinic.objects.create(name="C", slug="c")
+        other = Clinic.objects.create(name="D", slug="d")
+        user = User.objects.create_user(email="a@example.com", password="x", role="clinic_admin")
+        Membership.objects.create(user=user, clinic=clinic, role="admin")
+        with django_assert_num_queries(1):
+            assert user_is_clinic_admin_of(user, clinic)
+            assert user_is_clinic_admin_of(user, clinic.id)
+            assert not user_is_therapist_of(user, clinic)
+            assert not user_is_clinic_admin_of(user, other)
+        # Another request (fresh user instance) is served from the cache
+        fresh = User.objects.get(pk=user.pk)
+        with django_assert_num_queries(0):
+            assert user_is_clinic_admin_of(fresh, clinic)
+
+    def test_membership_changes_invalidate(self):
+        from accounts.permissions import user_is_clinic_admin_of, user_is_therapist_of
+        from clinics.models import Clinic, Membership
+
+        clinic = Clinic.objects.create(name="C", slug="c")
+        user = User.objects.create_user(email="a@example.com", password="x", role="therapist")
+        assert not user_is_therapist_of(user, clinic)
+        membership = Membership.objects.create(user=user, clinic=clinic, role="therapist")
+        assert user_is_therapist_of(User.objects.get(pk=user.pk), clinic)
+        assert user_is_therapist_of(user, clinic)
+        membership.role = "admin"
+        membership.save()
+        assert user_is_clinic_admin_of(User.objects.get(pk=user.pk), clinic)
+        Membership.objects.get(pk=membership.pk).delete()
+        assert not user_is_clinic_admin_of(User.objects.get(pk=user.pk), clinic)
+
+    def test_no_cross_request_cache_without_shared_backend(self, settings):
+        from accounts.permissions import user_is_therapist_of
+        from clinics.models import Clinic, Membership
+
+        settings.CACHES = {
+            **settings.CACHES,
+            "authz": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        clinic = Clinic.objects.create(name="C", slug="c")
+        user = User.objects.create_user(email="a@example.com", password="x", role="therapist")
+        assert not user_is_therapist_of(user, clinic)
+        # Bypasses Membership.save, so nothing is invalidated; the next request still sees it
+        Membership.objects.bulk_create([Membership(user=user, clinic=clinic, role="therapist")])
+        assert user_is_therapist_of(User.objects.get(pk=user.pk), clinic)
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+    """Access tokens carry authz claims; requests build the user without loading the row."""
+
+    def _login(self, client, email):
+        resp = client.post(
+            "/api/v1/auth/login/", {"email": email, "password": "secret123"}, format="json"
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        return resp.data
+
+    def test_request_user_built_from_claims(self, django_assert_num_queries):
+        from rest_framework.test import APIRequestFactory
+
+        from accounts.authentication import ClaimsJWTAuthentication
+        from accounts.claims import therapist_profile_id
+        from accounts.permissions import user_is_clinic_admin_of
+        from clinics.models import Clinic, Membership
+        from directory.models import TherapistProfile
+
+        clinic = Clinic.objects.create(name="C", slug="c")
+        user = User.objects.create_user(
+            email="t@example.com", password="secret123", role="therapist"
+        )
+        profile = TherapistProfile.objects.create(user=user, display_name="Dr. T", bio="")
+        Membership.objects.create(user=user, clinic=clinic, role="admin")
+        tokens = self._login(APIClient(), "t@example.com")
+
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        with django_assert_num_queries(0):
+            authed, _ = ClaimsJWTAuthentication().authenticate(request)
+            assert authed.pk == user.pk and authed.role == "therapist"
+            assert therapist_profile_id(authed) == profile.id
+            assert user_is_clinic_admin_of(authed, clinic)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        resp = client.get("/api/v1/me/")
+        assert resp.data["email"] == "t@example.com"
+        assert resp.data["therapist_profile_id"] == profile.id
+
+    def test_inactive_claim_rejected(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        User.objects.create_user(email="i@example.com", password="secret123")
+        tokens = self._login(APIClient(), "i@example.com")
+        access = AccessToken(tokens["access"])
+        assert access["is_active"] is True
+        access["is_active"] = False
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        resp = client.get("/api/v1/me/")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_claims_user_saved_only_after_full_load(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from accounts.claims import load_full_user, user_from_claims
+
+        user = User.objects.create_user(
+            email="s@example.com", password="secret123", role="help_seeker"
+        )
+        tokens = self._login(APIClient(), "s@example.com")
+        User.objects.filter(pk=user.pk).update(role="therapist")
+        claimed = user_from_claims(AccessToken(tokens["access"]))
+        with pytest.raises(ValueError):
+            claimed.save()
+        load_full_user(claimed)
+        assert claimed.role == "therapist"
+        claimed.first_name = "Sam"
+        claimed.save()
+        user.refresh_from_db()
+        assert (user.first_name, user.role) == ("Sam", "therapist")
+
+    def test_refresh_reissues_current_claims(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user = User.objects.create_user(
+            email="r@example.com", password="secret123", role="help_seeker"
+        )
+        client = APIClient()
+        tokens = self._login(client, "r@example.com")
+        assert AccessToken(tokens["access"])["role"] == "help_seeker"
+        User.objects.filter(pk=user.pk).update(role="therapist")
+        resp = client.post("/api/v1/auth/refresh/", {"refresh": tokens["refresh"]}, format="json")
+        assert resp.status_code == status.HTTP_200_OK
+        assert AccessToken(resp.data["access"])["role"] == "therapist"
+
+    def test_tokens_without_claims_fall_back_to_db(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user = User.objects.create_user(email="o@example.com", password="secret123")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        resp = client.get("/api/v1/me/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["email"] == "o@example.com"
+
+
+@pytest.mark.django_db
+class TestTokenBlacklist:
+    """Bloom-filtered refresh-token blacklist checks and expired-token purging."""
+
+    @pytest.fixture(autouse=True)
+    def _filter(self, settings):
+        from accounts.blacklist import blacklist_filter
+
+        settings.JWT_BLACKLIST_FILTER = True
+        blacklist_filter.reset()
+        yield
+        blacklist_filter.reset()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        from accounts.blacklist import BloomFilter
+
+        bloom = BloomFilter(1000)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+        assert sum(f"other-{i}" in bloom for i in range(1000)) < 20
+
+    def test_rotated_refresh_token_rejected(self, django_capture_on_commit_callbacks):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from accounts.blacklist import blacklist_filter
+
+        User.objects.create_user(email="b@example.com", password="secret123")
+        client = APIClient()
+        tokens = client.post(
+            "/api/v1/auth/login/",
+            {"email": "b@example.com", "password": "secret123"},
+            format="json",
+        ).data
+        jti = RefreshToken(tokens["refresh"])["jti"]
+        assert not blacklist_filter.might_contain(jti)
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(
+                "/api/v1/auth/refresh/", {"refresh": tokens["refresh"]}, format="json"
+            )
+        assert resp.status_code == status.HTTP_200_OK
+        assert blacklist_filter.might_contain(jti)
+        reuse = client.post("/api/v1/auth/refresh/", {"refresh": tokens["refresh"]}, format="json")
+        assert reuse.status_code == status.HTTP_401_UNAUTHORIZED
+        fresh = client.post(
+            "/api/v1/auth/refresh/", {"refresh": resp.data["refresh"]}, format="json"
+        )
+        assert fresh.status_code == status.HTTP_200_OK
+
+    def test_blacklist_reaches_other_filters(self, django_capture_on_commit_callbacks):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from accounts.blacklist import BlacklistFilter, RefreshToken
+
+        user = User.objects.create_user(email="w@example.com", password="secret123")
+        token = RefreshToken.for_user(user)
+        # Two workers, each with its own filter, built before the blacklist
+        worker_a, worker_b = BlacklistFilter(), BlacklistFilter()
+        assert not worker_a.might_contain(token["jti"])
+        assert not worker_b.might_contain(token["jti"])
+        with django_capture_on_commit_callbacks(execute=True):
+            token.blacklist()
+        # Worker b learns about it from the shared log, without reading the database
+        with CaptureQueriesContext(connection) as queries:
+            assert worker_b.might_contain(token["jti"])
+        assert len(queries) == 0
+
+    def test_filter_refuses_process_local_cache(self, settings):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from accounts.blacklist import blacklist_filter_enabled
+
+        settings.CACHES = {
+            **settings.CACHES,
+            "jwt_blacklist": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+        with pytest.raises(ImproperlyConfigured):
+            blacklist_filter_enabled()
+
+    def test_purge_expired_tokens(self):
+        from datetime import timedelta
+
+        from django.core.management import call_command
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import (
+            BlacklistedToken,
+            OutstandingToken,
+        )
+
+        now = timezone.now()
+        tokens = [
+            OutstandingToken.objects.create(
+                jti=f"jti-{i}", token="x", expires_at=now + timedelta(days=i - 5, hours=1)
+            )
+            for i in range(10)
+        ]
+        BlacklistedToken.objects.create(token=tokens[0])
+        BlacklistedToken.objects.create(token=tokens[9])
+        call_command("purge_expired_tokens", "--batch-size", "2", stdout=io.StringIO())
+        assert OutstandingToken.objects.count() == 5
+        assert list(BlacklistedToken.objects.values_list("token_id", flat=True)) == [tokens[9].id]
@@ -9,6 +9,7 @@ from rest_framework_simplejwt.views import TokenBlacklistView, TokenObtainPairVi
 from audit.service import log_event
 from config.throttling import AuthEndpointThrottle
 
+from .claims import load_full_user
 from .jwt_serializers import CustomTokenObtainPairSerializer
 from .serializers import RegisterSerializer, UserSerializer
 
@@ -29,7 +30,7 @@ def register(request):
 @permission_classes([IsAuthenticated])
 def me(request):
     """Current user profile. GET /api/v1/me/"""
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(load_full_user(request.user))
     return Response(serializer.data)
 
 
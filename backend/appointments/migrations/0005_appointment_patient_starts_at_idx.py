@@ -0,0 +1,17 @@
+# Patient timeline: (patient, starts_at) index for keyset pagination
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0004_fill_null_patient_and_make_non_nullable"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(fields=["patient", "starts_at"], name="appointment_appt_pat_start_idx"),
+        ),
+    ]
@@ -30,6 +30,8 @@ class Appointment(models.Model):
             models.Index(fields=["therapist"]),
             models.Index(fields=["patient"]),
             models.Index(fields=["starts_at"]),
+            # Patient timeline: keyset scan per patient by time
+            models.Index(fields=["patient", "starts_at"], name="appointment_appt_pat_start_idx"),
         ]
 
 
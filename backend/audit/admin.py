@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 
-from .models import AuditEvent
+from .models import AuditDailyRollup, AuditEvent
 
 
 @admin.register(AuditEvent)
@@ -22,3 +22,11 @@ class AuditEventAdmin(admin.ModelAdmin):
         "user_agent",
         "created_at",
     )
+
+
+@admin.register(AuditDailyRollup)
+class AuditDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "action", "entity_type", "actor", "count")
+    list_filter = ("action", "entity_type")
+    date_hierarchy = "day"
+    readonly_fields = ("day", "action", "entity_type", "actor", "count")
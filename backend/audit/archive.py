@@ -0,0 +1,463 @@
+"""
+Cold storage for old audit events (`manage.py audit_archive`).
+
+Events older than N months leave the database for append-only segment files under
+settings.AUDIT_ARCHIVE_ROOT:
+
+  <name>.ndjson.gz  events in (created_at, id) order, as independent gzip members of
+                    ARCHIVE_BLOCK_ROWS lines each, so any block decompresses on its own
+  <name>.idx        block table (offset, length, first created_at), then one fixed-width entry per
+                    event sorted by (hash of entity_type + entity_id, created_at); memory-mapped
+                    and binary-searched, never loaded
+  manifest.json     the segments with their time bounds, and archived_before: every event older
+                    than it is in the archive, every newer one in the database
+
+Entity lookups binary-search each overlapping segment's index and decompress only the blocks
+holding hits; other filters decompress the blocks overlapping the date range. A month enters the
+manifest only once all its segments are written and fsynced, and its rows are deleted after
+that, so an interrupted run can simply be re-run: rows already behind archived_before are
+deleted without being archived twice.
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import uuid
+from datetime import UTC, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import partitions
+from .models import AuditEvent
+from .query import parse_date_param
+from .user_agents import user_agent_value
+
+ARCHIVE_BLOCK_ROWS = 1000
+ARCHIVE_SEGMENT_ROWS = 1_000_000
+ARCHIVE_READ_CHUNK = 2000
+MANIFEST = "manifest.json"
+INDEX_MAGIC = b"AUDIDX01"
+
+_HEADER = struct.Struct(">8sII")  # magic, blocks, entries
+_BLOCK = struct.Struct(">QQQ")  # data offset, compressed length, first created_at (us)
+_ENTRY = struct.Struct(">QQII")  # entity key hash, created_at (us), block, row in block
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_COLUMNS = (
+    "id",
+    "actor_id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "metadata",
+    "ip",
+    "agent_id",
+    "created_at",
+)
+
+
+def archive_root() -> Path:
+    return Path(settings.AUDIT_ARCHIVE_ROOT)
+
+
+def _micros(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def entity_key(entity_type: str, entity_id: str) -> int:
+    digest = hashlib.blake2b(f"{entity_type}\0{entity_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def load_manifest(root: Path | None = None) -> dict:
+    path = (root or archive_root()) / MANIFEST
+    if not path.exists():
+        return {"archived_before": None, "segments": []}
+    return json.loads(path.read_text())
+
+
+def archived_before(manifest: dict) -> datetime | None:
+    value = manifest["archived_before"]
+    return parse_datetime(value) if value else None
+
+
+def _fsync(path: Path) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _save_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=1))
+    _fsync(tmp)
+    os.replace(tmp, root / MANIFEST)
+
+
+class SegmentWriter:
+    """Writes one segment: blocks of gzipped NDJSON plus the sorted index."""
+
+    def __init__(self, root: Path, name: str):
+        self.root = root
+        self.name = name
+        self.data = open(root / f"{name}.ndjson.gz", "wb")  # noqa: SIM115 (closed in close())
+        self.blocks = []
+        self.entries = []
+        self.pending = []
+        self.first = self.last = None
+        self.rows = 0
+
+    def add(self, row: dict) -> None:
+        created_at = row["created_at"]
+        at = _micros(created_at)
+        self.first = self.first or created_at
+        self.last = created_at
+        key = entity_key(row["entity_type"], row["entity_id"])
+        # Packed big-endian, so sorting the bytes sorts by (key, created_at)
+        self.entries.append(_ENTRY.pack(key, at, len(self.blocks), len(self.pending)))
+        line = {**row, "id": str(row["id"]), "created_at": created_at.isoformat()}
+        self.pending.append(json.dumps(line, cls=DjangoJSONEncoder).encode())
+        self.rows += 1
+        if len(self.pending) >= ARCHIVE_BLOCK_ROWS:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        if not self.pending:
+            return
+        first_at = _ENTRY.unpack(self.entries[-len(self.pending)])[1]
+        data = gzip.compress(b"\n".join(self.pending) + b"\n")
+        self.blocks.append(_BLOCK.pack(self.data.tell(), len(data), first_at))
+        self.data.write(data)
+        self.pending = []
+
+    def close(self) -> dict:
+        self._flush_block()
+        self.data.flush()
+        os.fsync(self.data.fileno())
+        self.data.close()
+        self.entries.sort()
+        index = self.root / f"{self.name}.idx"
+        with open(index, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, len(self.blocks), len(self.entries)))
+            f.writelines(self.blocks)
+            f.writelines(self.entries)
+            f.flush()
+            os.fsync(f.fileno())
+        return {
+            "name": self.name,
+            "first": self.first.isoformat(),
+            "last": self.last.isoformat(),
+            "rows": self.rows,
+        }
+
+
+class Segment:
+    """Read side of a segment; use as a context manager (the index is memory-mapped)."""
+
+    def __init__(self, root: Path, meta: dict):
+        self.data_path = root / f"{meta['name']}.ndjson.gz"
+        self.index_path = root / f"{meta['name']}.idx"
+
+    def __enter__(self):
+        with open(self.index_path, "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.block_count, self.entry_count = _HEADER.unpack_from(self.index, 0)
+        if magic != INDEX_MAGIC:
+            self.index.close()
+            raise ValueError(f"{self.index_path} is not an audit archive index")
+        self.entries_at = _HEADER.size + self.block_count * _BLOCK.size
+        self.data = open(self.data_path, "rb")
+        return self
+
+    def __exit__(self, *exc):
+        self.data.close()
+        self.index.close()
+
+    def _block_meta(self, n: int):
+        return _BLOCK.unpack_from(self.index, _HEADER.size + n * _BLOCK.size)
+
+    def _entry(self, n: int):
+        return _ENTRY.unpack_from(self.index, self.entries_at + n * _ENTRY.size)
+
+    def block(self, n: int) -> list[dict]:
+        offset, length, _ = self._block_meta(n)
+        self.data.seek(offset)
+        return [json.loads(line) for line in gzip.decompress(self.data.read(length)).splitlines()]
+
+    def _blocks_starting_by(self, at: int) -> int:
+        """Number of blocks whose first event is at or before `at` (us)."""
+        first, last = 0, self.block_count
+        while first < last:
+            mid = (first + last) // 2
+            if self._block_meta(mid)[2] <= at:
+                first = mid + 1
+            else:
+                last = mid
+        return first
+
+    def blocks_between(self, lo: int, hi: int) -> range:
+        """Blocks that may hold events with lo <= created_at (us) <= hi."""
+        return range(max(self._blocks_starting_by(lo) - 1, 0), self._blocks_starting_by(hi))
+
+    def entity_hits(self, key: int, lo: int, hi: int) -> list[tuple[int, int]]:
+        """(block, row) of entries for key with lo <= created_at (us) <= hi, in time order."""
+        first, last = 0, self.entry_count
+        while first < last:
+            mid = (first + last) // 2
+            if self._entry(mid)[:2] < (key, lo):
+                first = mid + 1
+            else:
+                last = mid
+        hits = []
+        for n in range(first, self.entry_count):
+            entry_key, at, block, row = self._entry(n)
+            if entry_key != key or at > hi:
+                break
+            hits.append((block, row))
+        return hits
+
+
+def _to_event(row: dict) -> AuditEvent:
+    """Unsaved AuditEvent for serializers (same output as a database row)."""
+    return AuditEvent(
+        id=uuid.UUID(row["id"]),
+        actor_id=row["actor_id"],
+        action=row["action"],
+        entity_type=row["entity_type"],
+        entity_id=row["entity_id"],
+        metadata=row["metadata"],
+        ip=row["ip"] or None,
+        user_agent=row["user_agent"],
+        created_at=parse_datetime(row["created_at"]),
+    )
+
+
+def _matches(row: dict, params) -> bool:
+    actor = params.get("actor")
+    if actor and str(row["actor_id"]) != str(actor):
+        return False
+    for field in ("action", "entity_type", "entity_id"):
+        if params.get(field) and row[field] != params[field]:
+            return False
+    return True
+
+
+def needs_archive(params, manifest: dict, *, unbounded: bool = False) -> bool:
+    """
+    Whether a query with these params reaches into the archive: date_from (or date_to) before
+    archived_before, or no date_from at all when unbounded (entity history, index lookups only).
+    """
+    before = archived_before(manifest)
+    if before is None:
+        return False
+    date_from = parse_date_param(params.get("date_from") or "")
+    date_to = parse_date_param(params.get("date_to") or "")
+    if date_to and date_to < before:
+        return True
+    return date_from < before if date_from else unbounded
+
+
+def _time_range(params) -> tuple[int, int]:
+    """(lo, hi) created_at bounds in microseconds from date_from/date_to."""
+    date_from = parse_date_param(params.get("date_from") or "")
+    date_to = parse_date_param(params.get("date_to") or "")
+    return (_micros(date_from) if date_from else 0, _micros(date_to) if date_to else 2**63)
+
+
+def _overlapping_segments(manifest: dict, lo: int, hi: int) -> list[dict]:
+    """Segments that may hold events in [lo, hi], newest first."""
+    segments = sorted(manifest["segments"], key=lambda s: s["last"], reverse=True)
+    return [
+        meta
+        for meta in segments
+        if _micros(parse_datetime(meta["last"])) >= lo
+        and _micros(parse_datetime(meta["first"])) <= hi
+    ]
+
+
+def _segment_events(root: Path, meta: dict, params, lo: int, hi: int):
+    """Matching events of one segment, newest first."""
+    entity_type, entity_id = params.get("entity_type"), params.get("entity_id")
+    with Segment(root, meta) as segment:
+        if entity_type and entity_id:
+            hits = segment.entity_hits(entity_key(entity_type, entity_id), lo, hi)
+            by_block = {}
+            for block, row in hits:
+                by_block.setdefault(block, []).append(row)
+            blocks = [(n, by_block[n]) for n in sorted(by_block, reverse=True)]
+        else:
+            blocks = [(n, None) for n in reversed(segment.blocks_between(lo, hi))]
+        for n, rows in blocks:
+            decoded = segment.block(n)
+            for row in reversed([decoded[i] for i in rows] if rows else decoded):
+                at = _micros(parse_datetime(row["created_at"]))
+                if lo <= at <= hi and _matches(row, params):
+                    yield _to_event(row)
+
+
+def _rows_if_whole(meta: dict, params, lo: int, hi: int) -> int | None:
+    """
+    Number of matches in a segment known from the manifest alone: its row count when the
+    filters are only a date range that covers the whole segment; otherwise None.
+    """
+    if any(params.get(field) for field in ("actor", "action", "entity_type", "entity_id")):
+        return None
+    first, last = _micros(parse_datetime(meta["first"])), _micros(parse_datetime(meta["last"]))
+    return meta["rows"] if lo <= first and last <= hi else None
+
+
+def archived_events(params, *, manifest: dict | None = None, root: Path | None = None):
+    """Archived AuditEvents matching the query-param filters (audit.query), newest first."""
+    root = root or archive_root()
+    manifest = manifest or load_manifest(root)
+    lo, hi = _time_range(params)
+    for meta in _overlapping_segments(manifest, lo, hi):
+        yield from _segment_events(root, meta, params, lo, hi)
+
+
+class CombinedEvents:
+    """
+    Database events followed by archived ones, as a sequence for DRF pagination. The database
+    part is newer than archived_before.
+
+    Counting takes one pass over the archive, which also keeps the events of `window` (the
+    slice the paginator will ask for), so a page reads the archive once. Segments wholly inside
+    a date-range-only query are counted from the manifest and not read unless the window falls
+    in them. Slices outside the window are re-read lazily.
+    """
+
+    def __init__(self, queryset, params, manifest: dict, *, window=None):
+        self.queryset = queryset.filter(created_at__gte=archived_before(manifest))
+        self.params = params
+        self.manifest = manifest
+        self.window = window
+        self._db_count = None
+        self._count = None
+        self._kept = None
+
+    def _archived(self):
+        return archived_events(self.params, manifest=self.manifest)
+
+    @property
+    def db_count(self) -> int:
+        if self._db_count is None:
+            self._db_count = self.queryset.count()
+        return self._db_count
+
+    def _archive_window(self) -> tuple[int, int]:
+        """The window as positions in the archive part."""
+        if self.window is None:
+            return 0, 0
+        start, stop = self.window
+        return max(start - self.db_count, 0), max(stop - self.db_count, 0)
+
+    def _count_archive(self) -> int:
+        root = archive_root()
+        lo, hi = _time_range(self.params)
+        keep_from, keep_to = self._archive_window()
+        kept = []
+        total = 0
+        for meta in _overlapping_segments(self.manifest, lo, hi):
+            rows = _rows_if_whole(meta, self.params, lo, hi)
+            if rows is not None and not (total < keep_to and keep_from < total + rows):
+                total += rows
+                continue
+            for event in _segment_events(root, meta, self.params, lo, hi):
+                if keep_from <= total < keep_to:
+                    kept.append(event)
+                total += 1
+        self._kept = kept
+        return total
+
+    def count(self) -> int:
+        if self._count is None:
+            self._count = self.db_count + self._count_archive()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+        start, stop = index.start or 0, index.stop if index.stop is not None else self.count()
+        results = []
+        if start < self.db_count:
+            results += list(self.queryset[start : min(stop, self.db_count)])
+        if stop > self.db_count:
+            skip = max(start - self.db_count, 0)
+            keep_from, keep_to = self._archive_window()
+            if self._kept is not None and keep_from <= skip and stop - self.db_count <= keep_to:
+                results += self._kept[skip - keep_from : stop - self.db_count - keep_from]
+            else:
+                results += list(islice(self._archived(), skip, stop - self.db_count))
+        return results
+
+
+def archive_events(*, older_than_months: int, today=None, root: Path | None = None) -> dict:
+    """
+    Move events from months entirely older than `older_than_months` months before the current
+    one into new segments, month by month, then delete them from the database.
+    Returns {"months": [YYYY-MM archived], "events": archived, "deleted": rows deleted}.
+    """
+    root = root or archive_root()
+    root.mkdir(parents=True, exist_ok=True)
+    first_kept = partitions.add_months(
+        partitions.month_start(today or timezone.now().astimezone(UTC)), -older_than_months
+    )
+    cutoff = partitions.month_bound(first_kept)
+    manifest = load_manifest(root)
+    result = {"months": [], "events": 0, "deleted": 0}
+    oldest = AuditEvent.objects.filter(created_at__lt=cutoff).aggregate(m=Min("created_at"))["m"]
+    if oldest is None:
+        return result
+    month = partitions.month_start(oldest.astimezone(UTC))
+    while month < first_kept:
+        upper_month = partitions.add_months(month, 1)
+        upper = partitions.month_bound(upper_month)
+        before = archived_before(manifest)
+        if before is None or upper > before:
+            segments = _write_month(root, month, partitions.month_bound(month), upper)
+            manifest["segments"].extend(segments)
+            manifest["archived_before"] = upper.isoformat()
+            _save_manifest(root, manifest)
+            if segments:
+                result["months"].append(f"{month:%Y-%m}")
+                result["events"] += sum(s["rows"] for s in segments)
+        result["deleted"] += partitions.drop_month(month)
+        month = upper_month
+    return result
+
+
+def _write_month(root: Path, month, lower: datetime, upper: datetime) -> list[dict]:
+    rows = (
+        AuditEvent.objects.filter(created_at__gte=lower, created_at__lt=upper)
+        .order_by("created_at", "id")
+        .values(*_COLUMNS)
+        .iterator(chunk_size=ARCHIVE_READ_CHUNK)
+    )
+    token = uuid.uuid4().hex[:8]
+    segments = []
+    writer = None
+    for row in rows:
+        # Self-contained segments: the agent string and "" for a missing IP, as in the API
+        agent_id = row.pop("agent_id")
+        row["user_agent"] = user_agent_value(agent_id) if agent_id else ""
+        row["ip"] = row["ip"] or ""
+        if writer is None:
+            writer = SegmentWriter(root, f"{month:%Y%m}-{len(segments) + 1:04d}-{token}")
+        writer.add(row)
+        if writer.rows >= ARCHIVE_SEGMENT_ROWS:
+            segments.append(writer.close())
+            writer = None
+    if writer is not None:
+        segments.append(writer.close())
+    return segments
@@ -0,0 +1,143 @@
+"""
+Streaming audit log export (compliance reviews): GET /api/v1/audit/events/export.
+
+Rows are read with QuerySet.iterator() (a server-side cursor on PostgreSQL) in (created_at, id)
+order and encoded one at a time into the response, so memory stays constant however many months
+are exported and no COUNT or page queries run. Every row carries an opaque `cursor`; passing the
+last one received as ?cursor= resumes an interrupted export right after that row.
+
+created_at is stamped when an event is logged, but the event is only written when its request
+finishes (or later, through the background writer; see audit.writer), so a row can become
+visible after later rows were already exported. Exports therefore stop at events older than
+AUDIT_EXPORT_SETTLE_SECONDS: resuming never repeats rows, and skips none as long as every event
+is written within that delay (a request or writer queue stalled for longer can still be missed).
+"""
+
+import csv
+import io
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import BaseRenderer
+
+from config.pagination import decode_cursor, encode_cursor
+
+from .service import sanitize_metadata
+from .user_agents import user_agent_value
+
+EXPORT_CHUNK_SIZE = 2000
+# Events younger than this may still be buffered unwritten, so exports stop before them
+AUDIT_EXPORT_SETTLE_SECONDS = 60
+EXPORT_COLUMNS = [
+    "id",
+    "actor",
+    "action",
+    "entity_type",
+    "entity_id",
+    "metadata",
+    "ip",
+    "user_agent",
+    "created_at",
+    "cursor",
+]
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Selects ?format=ndjson; export rows bypass it (only error bodies are rendered)."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode() + b"\n"
+
+
+class CSVRenderer(NDJSONRenderer):
+    """Selects ?format=csv; error bodies are still rendered as JSON."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+
+def parse_cursor(token: str):
+    """Decode an export cursor to (created_at, id). Raises ValueError if malformed."""
+    values = decode_cursor(token)
+    if len(values) != 2:
+        raise ValueError("Invalid cursor")
+    at = parse_datetime(str(values[0]))
+    if at is None:
+        raise ValueError("Invalid cursor")
+    return at, uuid.UUID(str(values[1]))
+
+
+def settled_before():
+    """Export watermark: events logged before this have been written."""
+    delay = getattr(settings, "AUDIT_EXPORT_SETTLE_SECONDS", AUDIT_EXPORT_SETTLE_SECONDS)
+    return timezone.now() - timedelta(seconds=delay)
+
+
+def export_rows(queryset, cursor=None, *, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield export dicts for queryset in (created_at, id) order, after cursor if given and
+    before until (default: settled_before()).
+    """
+    queryset = queryset.filter(created_at__lt=until or settled_before())
+    if cursor is not None:
+        at, event_id = cursor
+        queryset = queryset.filter(Q(created_at__gt=at) | Q(created_at=at, id__gt=event_id))
+    rows = queryset.order_by("created_at", "id").values(
+        "id",
+        "actor_id",
+        "action",
+        "entity_type",
+        "entity_id",
+        "metadata",
+        "ip",
+        "agent_id",
+        "created_at",
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        created_at = row["created_at"].isoformat()
+        event_id = str(row["id"])
+        yield {
+            "id": event_id,
+            "actor": row["actor_id"],
+            "action": row["action"],
+            "entity_type": row["entity_type"],
+            "entity_id": row["entity_id"],
+            "metadata": sanitize_metadata(row["metadata"]),
+            "ip": row["ip"] or "",
+            "user_agent": user_agent_value(row["agent_id"]) if row["agent_id"] else "",
+            "created_at": created_at,
+            "cursor": encode_cursor([created_at, event_id]),
+        }
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def csv_lines(rows):
+    """CSV with a header row; metadata is a JSON-encoded column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield flush()
+    for row in rows:
+        row["metadata"] = json.dumps(row["metadata"], cls=DjangoJSONEncoder)
+        writer.writerow([row[c] if row[c] is not None else "" for c in EXPORT_COLUMNS])
+        yield flush()
@@ -0,0 +1,28 @@
+"""Move old audit events into compressed archive segments (audit.archive); run monthly."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.archive import archive_events, archive_root
+
+
+class Command(BaseCommand):
+    help = "Archive audit events from months older than --older-than-months, then delete them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-months",
+            type=int,
+            required=True,
+            help="Archive months that ended at least this many months before the current one",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than_months"] < 1:
+            raise CommandError("--older-than-months must be at least 1")
+        result = archive_events(older_than_months=options["older_than_months"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result['events']} events ({', '.join(result['months']) or '-'}) "
+                f"to {archive_root()}; {result['deleted']} rows deleted"
+            )
+        )
@@ -0,0 +1,43 @@
+"""Create upcoming monthly audit partitions and apply retention (run daily)."""
+
+from django.core.management.base import BaseCommand
+
+from audit.partitions import PARTITIONS_AHEAD, apply_retention, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = "Create future audit_auditevent partitions; --retain-months to drop/detach old ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=PARTITIONS_AHEAD, help="Months to create ahead"
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=None,
+            help="Keep this many months (including the current one); older partitions go",
+        )
+        parser.add_argument(
+            "--detach",
+            action="store_true",
+            help="Detach old partitions (keep them as tables to archive) instead of dropping",
+        )
+
+    def handle(self, *args, **options):
+        created = ensure_partitions(ahead=options["ahead"])
+        self.stdout.write(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+        if options["retain_months"] is None:
+            return
+        if options["retain_months"] < 1:
+            self.stderr.write("--retain-months must be at least 1")
+            return
+        result = apply_retention(keep_months=options["retain_months"], drop=not options["detach"])
+        verb = "Detached" if options["detach"] else "Dropped"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {len(result['partitions'])} partitions"
+                f" ({', '.join(result['partitions']) or '-'}); "
+                f"{result['rows_deleted']} rows deleted"
+            )
+        )
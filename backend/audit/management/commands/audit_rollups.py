@@ -0,0 +1,33 @@
+"""Rebuild daily audit rollups from events (backfill after deploy, or repair a date range)."""
+
+from datetime import UTC, date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from audit.models import AuditEvent
+from audit.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute audit rollups for --from..--to (UTC days; default yesterday and today)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None)
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None)
+        parser.add_argument(
+            "--all", action="store_true", help="From the oldest event (initial backfill)"
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().astimezone(UTC).date()
+        date_to = options["date_to"] or today
+        date_from = options["date_from"] or date_to - timedelta(days=1)
+        if options["all"]:
+            oldest = AuditEvent.objects.aggregate(oldest=Min("created_at"))["oldest"]
+            date_from = oldest.astimezone(UTC).date() if oldest else date_to
+        if date_from > date_to:
+            raise CommandError("--from must not be after --to")
+        rows = rebuild_rollups(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollups for {date_from}..{date_to}"))
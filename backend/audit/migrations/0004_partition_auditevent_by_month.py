@@ -0,0 +1,169 @@
+# Convert audit_auditevent into a table range-partitioned by month on created_at
+# (one partition per month plus DEFAULT; see audit.partitions). The primary key becomes
+# (id, created_at), as PostgreSQL requires the partition key in unique constraints.
+# PostgreSQL only; no-op on SQLite (e.g. tests)
+#
+# Locking: rows are copied into a new table in id batches of COPY_BATCH, each in its own
+# transaction, while the old table stays live. Indexes and foreign keys are built on the new
+# table before it replaces the old one. Only the last step holds an EXCLUSIVE lock on
+# audit_auditevent: it copies rows written during the copy and swaps the table names. Reads keep
+# working, and audit writes wait for that short step only, not for a full-table copy. Audit
+# events are insert-only and ids are random (UUIDv4), so the catch-up copies every row created
+# since shortly before the copy started that is not in the new table yet. Rows deleted
+# from the old table during the copy (retention, archiving) survive in the new one: do not run
+# those while migrating. The migration is not atomic. If it stops midway, drop
+# audit_auditevent_new (and its partitions) and run it again.
+
+import re
+from datetime import UTC, date, datetime
+
+from django.db import connection, migrations, transaction
+
+TABLE = "audit_auditevent"
+NEW = "audit_auditevent_new"
+OLD = "audit_auditevent_old"
+PARTITIONS_AHEAD = 3
+COPY_BATCH = 50000
+# The catch-up also re-checks rows created this long before the copy started (transactions
+# that were open when it started commit late)
+CATCHUP_MARGIN = "10 minutes"
+MIN_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def _add_months(d, months):
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=UTC).isoformat()
+
+
+def _definitions(cursor):
+    """Primary key name, index definitions and foreign keys of TABLE."""
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'f')",
+        [TABLE],
+    )
+    constraints = cursor.fetchall()
+    pkey = next(name for name, kind, _ in constraints if kind == "p")
+    foreign_keys = [(name, definition) for name, kind, definition in constraints if kind == "f"]
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+        "AND tablename = %s AND indexname <> %s",
+        [TABLE, pkey],
+    )
+    return pkey, cursor.fetchall(), foreign_keys
+
+
+def _create_new(cursor, *, partitioned):
+    if not partitioned:
+        cursor.execute(
+            f"CREATE TABLE {NEW} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        return "PRIMARY KEY (id)"
+    cursor.execute(
+        f"CREATE TABLE {NEW} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    cursor.execute(f"SELECT min(created_at) FROM {TABLE}")
+    oldest = cursor.fetchone()[0]
+    now = datetime.now(UTC)
+    month = date((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(date(now.year, now.month, 1), PARTITIONS_AHEAD)
+    while month <= last:
+        cursor.execute(
+            f"CREATE TABLE {TABLE}_p{month.year:04d}{month.month:02d} PARTITION OF {NEW} "
+            f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(_add_months(month, 1))}')"
+        )
+        month = _add_months(month, 1)
+    cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {NEW} DEFAULT")
+    return "PRIMARY KEY (id, created_at)"
+
+
+def _copy_batches(cursor) -> None:
+    """Copy TABLE into NEW in id order, one transaction per batch."""
+    last = MIN_UUID
+    while True:
+        with transaction.atomic():
+            cursor.execute(
+                f"SELECT max(id) FROM (SELECT id FROM {TABLE} WHERE id > %s "
+                "ORDER BY id LIMIT %s) batch",
+                [last, COPY_BATCH],
+            )
+            upto = cursor.fetchone()[0]
+            if upto is None:
+                return
+            cursor.execute(
+                f"INSERT INTO {NEW} SELECT * FROM {TABLE} WHERE id > %s AND id <= %s",
+                [last, upto],
+            )
+        last = upto
+
+
+def _rebuild(*, partitioned):
+    """Rebuild TABLE (partitioned or plain) from its current contents, keeping indexes and FKs."""
+    with connection.cursor() as cursor:
+        pkey, indexes, foreign_keys = _definitions(cursor)
+        primary_key = _create_new(cursor, partitioned=partitioned)
+        cursor.execute(f"SELECT now() - interval '{CATCHUP_MARGIN}'")
+        since = cursor.fetchone()[0]
+        _copy_batches(cursor)
+
+        # Build everything on NEW while it is not in use yet, under temporary names
+        cursor.execute(f"ALTER TABLE {NEW} ADD CONSTRAINT {pkey}_new {primary_key}")
+        for name, definition in indexes:
+            # Indexes of a partitioned table are defined "ON ONLY" the parent
+            cursor.execute(
+                re.sub(
+                    rf"^(CREATE (?:UNIQUE )?INDEX) {name} ON (ONLY )?(\S+\.)?{TABLE} ",
+                    rf"\1 {name}_new ON {NEW} ",
+                    definition,
+                )
+            )
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {NEW} ADD CONSTRAINT {name}_new {definition}")
+
+        with transaction.atomic():
+            # Writers wait from here to the swap; readers do not
+            cursor.execute(f"LOCK TABLE {TABLE} IN EXCLUSIVE MODE")
+            cursor.execute(
+                f"INSERT INTO {NEW} SELECT * FROM {TABLE} t WHERE t.created_at >= %s "
+                f"AND NOT EXISTS (SELECT 1 FROM {NEW} n "
+                "WHERE n.id = t.id AND n.created_at = t.created_at)",
+                [since],
+            )
+            cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD}")
+            cursor.execute(f"ALTER TABLE {NEW} RENAME TO {TABLE}")
+            cursor.execute(f"DROP TABLE {OLD} CASCADE")
+            cursor.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {pkey}_new TO {pkey}")
+            for name, _ in indexes:
+                cursor.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+            for name, _ in foreign_keys:
+                cursor.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {name}_new TO {name}")
+
+
+def partition(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+    _rebuild(partitioned=True)
+
+
+def unpartition(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+    _rebuild(partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("audit", "0003_auditevent_created_at_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
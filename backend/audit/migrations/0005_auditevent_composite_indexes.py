@@ -0,0 +1,59 @@
+# Composite (filter column, created_at) indexes for audit.query; they supersede the
+# single-column actor/entity_type/action indexes, including the implicit FK index on actor_id
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_partition_auditevent_by_month"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(
+                fields=["entity_type", "entity_id", "created_at"], name="audit_evt_entity_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["entity_type", "created_at"], name="audit_evt_type_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["actor", "created_at"], name="audit_evt_actor_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditevent",
+            index=models.Index(fields=["action", "created_at"], name="audit_evt_action_time_idx"),
+        ),
+        migrations.RemoveIndex(model_name="auditevent", name="audit_evt_actor_idx"),
+        migrations.RemoveIndex(model_name="auditevent", name="audit_evt_entity_idx"),
+        migrations.AlterField(
+            model_name="auditevent",
+            name="action",
+            field=models.CharField(max_length=32),
+        ),
+        migrations.AlterField(
+            model_name="auditevent",
+            name="entity_type",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="auditevent",
+            name="actor",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="audit_events",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# New audit event ids are time-ordered UUIDv7 (config.uuids); existing v4 ids stay as they are
+
+import config.uuids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0006_auditdailyrollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="auditevent",
+            name="id",
+            field=models.UUIDField(
+                default=config.uuids.uuid7, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Store User-Agents once in audit_useragent (events reference them by integer id) and IPs as a
+# native inet (NULL when missing or invalid). Existing rows are converted in batches, each in its
+# own transaction, so the migration is not atomic.
+
+import hashlib
+import ipaddress
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 5000
+
+
+def _hash(value):
+    return hashlib.sha256(value.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _ip(value):
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _batches(AuditEvent, *fields):
+    last = None
+    while True:
+        qs = AuditEvent.objects.order_by("id")
+        if last is not None:
+            qs = qs.filter(id__gt=last)
+        rows = list(qs.values_list("id", *fields)[:BATCH_SIZE])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def compact(apps, schema_editor):
+    AuditEvent = apps.get_model("audit", "AuditEvent")
+    UserAgent = apps.get_model("audit", "UserAgent")
+    agent_ids = {}
+    for rows in _batches(AuditEvent, "user_agent", "ip"):
+        with transaction.atomic():
+            new = {_hash(ua): ua for _, ua, _ in rows if ua and ua not in agent_ids}
+            if new:
+                UserAgent.objects.bulk_create(
+                    [UserAgent(hash=h, value=v) for h, v in new.items()], ignore_conflicts=True
+                )
+                for agent_id, h in UserAgent.objects.filter(hash__in=new).values_list("id", "hash"):
+                    agent_ids[new[h]] = agent_id
+            AuditEvent.objects.bulk_update(
+                [
+                    AuditEvent(id=pk, agent_id=agent_ids.get(ua), ip_inet=_ip(ip))
+                    for pk, ua, ip in rows
+                ],
+                ["agent", "ip_inet"],
+            )
+
+
+def expand(apps, schema_editor):
+    AuditEvent = apps.get_model("audit", "AuditEvent")
+    UserAgent = apps.get_model("audit", "UserAgent")
+    values = dict(UserAgent.objects.values_list("id", "value"))
+    for rows in _batches(AuditEvent, "agent_id", "ip_inet"):
+        with transaction.atomic():
+            AuditEvent.objects.bulk_update(
+                [
+                    AuditEvent(id=pk, user_agent=values.get(agent_id, ""), ip=ip or "")
+                    for pk, agent_id, ip in rows
+                ],
+                ["user_agent", "ip"],
+            )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("audit", "0007_auditevent_uuid7"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserAgent",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("hash", models.CharField(max_length=64, unique=True)),
+                ("value", models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="auditevent",
+            name="agent",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="audit.useragent",
+            ),
+        ),
+        migrations.AddField(
+            model_name="auditevent",
+            name="ip_inet",
+            field=models.GenericIPAddressField(blank=True, null=True),
+        ),
+        migrations.RunPython(compact, expand),
+        migrations.RemoveField(model_name="auditevent", name="user_agent"),
+        migrations.RemoveField(model_name="auditevent", name="ip"),
+        migrations.RenameField(model_name="auditevent", old_name="ip_inet", new_name="ip"),
+    ]
@@ -1,5 +1,7 @@
 """DRF mixin for audit logging on Patient, Appointment, Referral, SessionNote."""
 
+from rest_framework.response import Response
+
 from .service import (
     ENTITY_APPOINTMENT,
     ENTITY_PATIENT,
@@ -49,15 +51,15 @@ class AuditLogMixin:
         instance.delete()
 
     def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
         instance = self.get_object()
+        serializer = self.get_serializer(instance)
         log_event(
             action="view",
             entity_type=self._audit_entity_type,
             entity_id=self._get_entity_id(instance),
             request=request,
         )
-        return response
+        return Response(serializer.data)
 
 
 class PatientAuditMixin(AuditLogMixin):
@@ -1,32 +1,110 @@
 """Append-only audit log models."""
 
-import uuid
-
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+
+from config.uuids import uuid7
 
 User = get_user_model()
 
 
+class UserAgent(models.Model):
+    """Distinct User-Agent strings, referenced by AuditEvent.agent (see audit.user_agents)."""
+
+    # 4-byte key: what every audit row stores instead of the string
+    id = models.AutoField(primary_key=True)
+    # sha256 of value: unique lookups without indexing arbitrarily long header values
+    hash = models.CharField(max_length=64, unique=True)
+    value = models.TextField()
+
+
 class AuditEvent(models.Model):
     """Append-only audit log event. Sensitive fields (e.g. SessionNote body) never stored in metadata."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Time-ordered (v7): inserts append to the primary-key index; older rows keep v4 ids
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Indexed by (actor, created_at) below
     actor = models.ForeignKey(
-        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="audit_events"
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="audit_events",
+        db_index=False,
     )
-    action = models.CharField(max_length=32, db_index=True)
-    entity_type = models.CharField(max_length=100, db_index=True)
+    action = models.CharField(max_length=32)
+    entity_type = models.CharField(max_length=100)
     entity_id = models.CharField(max_length=100, blank=True)
     metadata = models.JSONField(default=dict)
-    ip = models.CharField(max_length=45, blank=True)
-    user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # inet on PostgreSQL; NULL when the client address is missing or not a valid IP
+    ip = models.GenericIPAddressField(null=True, blank=True)
+    # Deduplicated User-Agent; read and set the string through the user_agent property.
+    # Agents are never deleted, so the column is left unindexed.
+    agent = models.ForeignKey(
+        UserAgent, on_delete=models.PROTECT, null=True, blank=True, related_name="+", db_index=False
+    )
+    # Set when the event is logged, not when the buffered batch is written (audit.writer).
+    # Partition key on PostgreSQL (audit.partitions): filter on it to scan only matching months.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        # Filters in audit.query each map onto one of these, already in created_at order
         indexes = [
-            models.Index(fields=["created_at"]),
-            models.Index(fields=["actor"]),
-            models.Index(fields=["entity_type"]),
+            models.Index(fields=["created_at"], name="audit_evt_created_idx"),
+            models.Index(
+                fields=["entity_type", "entity_id", "created_at"], name="audit_evt_entity_time_idx"
+            ),
+            models.Index(fields=["entity_type", "created_at"], name="audit_evt_type_time_idx"),
+            models.Index(fields=["actor", "created_at"], name="audit_evt_actor_time_idx"),
+            models.Index(fields=["action", "created_at"], name="audit_evt_action_time_idx"),
+        ]
+
+    # Set but not yet resolved to an agent id (resolved on save / by audit.writer)
+    _user_agent = None
+
+    @property
+    def user_agent(self) -> str:
+        if self._user_agent is not None:
+            return self._user_agent
+        if self.agent_id is None:
+            return ""
+        from .user_agents import user_agent_value
+
+        return user_agent_value(self.agent_id)
+
+    @user_agent.setter
+    def user_agent(self, value):
+        self._user_agent = value or ""
+
+    def save(self, *args, **kwargs):
+        if self._user_agent is not None:
+            from .user_agents import user_agent_id
+
+            self.agent_id = user_agent_id(self._user_agent)
+        super().save(*args, **kwargs)
+
+
+class AuditDailyRollup(models.Model):
+    """
+    Event count per UTC day, action, entity type and actor, maintained by audit.rollups as
+    events are written. Stats read these instead of the raw table; they outlive retention.
+    """
+
+    day = models.DateField()
+    action = models.CharField(max_length=32)
+    entity_type = models.CharField(max_length=100)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="audit_rollups"
+    )
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            # Leads with day, so stats over a date range are one index range scan
+            models.UniqueConstraint(
+                fields=["day", "action", "entity_type", "actor"], name="audit_rollup_key_uniq"
+            ),
         ]
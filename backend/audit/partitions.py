@@ -0,0 +1,180 @@
+"""
+Monthly range partitions of audit_auditevent (PostgreSQL; see migration 0004).
+
+Each calendar month (UTC) is its own partition, audit_auditevent_pYYYYMM, plus a DEFAULT
+partition that catches rows outside the created months. ensure_partitions() creates the current
+and upcoming months ahead of time (run `manage.py audit_partitions` daily); retention detaches
+or drops whole partitions, so old events leave without DELETE, table bloat or long vacuums. Only
+the few old rows that landed in DEFAULT (months without a partition) are deleted row by row.
+Queries filtering on created_at only scan the partitions their range overlaps.
+
+On other databases (SQLite in tests) the table is not partitioned: ensure_partitions is a no-op
+and retention deletes old rows in batches.
+"""
+
+import re
+from datetime import UTC, date, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AuditEvent
+
+TABLE = AuditEvent._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+# Months created ahead of the current one
+PARTITIONS_AHEAD = 3
+RETENTION_DELETE_BATCH = 5000
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def month_bound(month: date) -> datetime:
+    """Start of month as an aware UTC datetime (partition bounds)."""
+    return datetime(month.year, month.month, 1, tzinfo=UTC)
+
+
+def _bound(month: date) -> str:
+    return month_bound(month).isoformat()
+
+
+def list_partitions() -> list[date]:
+    """Months that currently have a partition attached, oldest first."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def ensure_partitions(*, ahead: int = PARTITIONS_AHEAD, today=None) -> list[str]:
+    """Create partitions for the current month and `ahead` months after it. Returns new names."""
+    if not is_partitioned():
+        return []
+    first = month_start(today or timezone.now().astimezone(UTC))
+    existing = set(list_partitions())
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(first, offset)
+        if month not in existing:
+            create_partition(month)
+            created.append(partition_name(month))
+    return created
+
+
+def create_partition(month: date) -> None:
+    """Create the partition for month, moving in any of its rows held by the DEFAULT partition."""
+    name = partition_name(month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s LIMIT 1",
+            [lower, upper],
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+            return
+        # A partition cannot be created while DEFAULT holds rows in its range
+        cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [lower, upper],
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+
+
+def apply_retention(*, keep_months: int, drop: bool = True, today=None) -> dict:
+    """
+    Remove partitions entirely older than the last `keep_months` months (the current month
+    counts as one). drop=False detaches them instead, leaving standalone tables to archive.
+    Older rows held by the DEFAULT partition (or an unpartitioned table) are deleted in batches.
+    Returns {"partitions": names removed, "rows_deleted": rows deleted}.
+    """
+    cutoff = add_months(month_start(today or timezone.now().astimezone(UTC)), 1 - keep_months)
+    removed = []
+    for month in list_partitions():
+        if month >= cutoff:
+            break
+        _remove_partition(month, drop=drop)
+        removed.append(partition_name(month))
+    # Remaining partitions start at or after cutoff, so only DEFAULT is scanned
+    return {"partitions": removed, "rows_deleted": _delete_before(cutoff)}
+
+
+def _remove_partition(month: date, *, drop: bool = True) -> None:
+    name = partition_name(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+        if drop:
+            cursor.execute(f"DROP TABLE {name}")
+
+
+def drop_month(month: date) -> int:
+    """
+    Remove every event of month from the database (e.g. once archived): drop its partition when
+    it has one, then delete what remains (rows held by DEFAULT, or an unpartitioned table).
+    Returns the number of rows removed.
+    """
+    removed = 0
+    if is_partitioned() and month in list_partitions():
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {partition_name(month)}")
+            removed = cursor.fetchone()[0]
+        _remove_partition(month)
+    return removed + _delete_before(add_months(month, 1), since=month)
+
+
+def _delete_before(cutoff: date, *, since: date | None = None) -> int:
+    """Batched DELETE of events before month cutoff (and from month since, if given)."""
+    events = AuditEvent.objects.filter(created_at__lt=month_bound(cutoff))
+    if since is not None:
+        events = events.filter(created_at__gte=month_bound(since))
+    deleted = 0
+    while True:
+        ids = list(events.values_list("id", flat=True)[:RETENTION_DELETE_BATCH])
+        if not ids:
+            return deleted
+        AuditEvent.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,105 @@
+"""
+Daily audit rollups: event counts per (UTC day, action, entity_type, actor).
+
+write_events() adds each batch's counts in the same transaction as the insert (one UPDATE per
+distinct key, usually one or two per request), so stats stay current without scanning events and
+reads cost one row per day and key rather than one per event. The nullable actor makes anonymous
+keys non-unique in the database, so readers always sum counts rather than assuming one row per
+key. rebuild_rollups() recomputes days from the raw events (backfill, repair); only rebuild days
+whose events have not been removed by retention.
+"""
+
+from collections import Counter
+from datetime import UTC, datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from .models import AuditDailyRollup, AuditEvent
+
+GROUP_BY_FIELDS = ("day", "action", "entity_type", "actor")
+STATS_MAX_DAYS = 366
+STATS_MAX_ROWS = 1000
+
+
+def count_events(events) -> Counter:
+    """Counter of (day, action, entity_type, actor_id) for unsaved or saved events."""
+    return Counter(
+        (e.created_at.astimezone(UTC).date(), e.action, e.entity_type, e.actor_id) for e in events
+    )
+
+
+def add_counts(counts: Counter) -> None:
+    """Increment rollup rows by counts, creating missing rows."""
+    # Fixed key order, so concurrent writers lock rows in the same order
+    for (day, action, entity_type, actor_id), n in sorted(
+        counts.items(), key=lambda item: (item[0][:3], item[0][3] or 0)
+    ):
+        key = {"day": day, "action": action, "entity_type": entity_type, "actor_id": actor_id}
+        if AuditDailyRollup.objects.filter(**key).update(count=F("count") + n):
+            continue
+        try:
+            with transaction.atomic():
+                AuditDailyRollup.objects.create(count=n, **key)
+        except IntegrityError:
+            # Created concurrently by another writer
+            AuditDailyRollup.objects.filter(**key).update(count=F("count") + n)
+
+
+def _day_bounds(date_from, date_to):
+    return (
+        datetime.combine(date_from, time.min, tzinfo=UTC),
+        datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=UTC),
+    )
+
+
+def rebuild_rollups(date_from, date_to) -> int:
+    """Recompute rollups for days date_from..date_to (inclusive) from events. Returns rows."""
+    start, end = _day_bounds(date_from, date_to)
+    groups = (
+        AuditEvent.objects.filter(created_at__gte=start, created_at__lt=end)
+        .annotate(day=TruncDate("created_at", tzinfo=UTC))
+        .values("day", "action", "entity_type", "actor_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        AuditDailyRollup.objects.filter(day__gte=date_from, day__lte=date_to).delete()
+        rows = AuditDailyRollup.objects.bulk_create(
+            [
+                AuditDailyRollup(
+                    day=g["day"],
+                    action=g["action"],
+                    entity_type=g["entity_type"],
+                    actor_id=g["actor_id"],
+                    count=g["n"],
+                )
+                for g in groups.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def rollup_stats(date_from, date_to, group_by, *, filters=None, limit=STATS_MAX_ROWS) -> list:
+    """
+    Summed counts over days date_from..date_to grouped by group_by (subset of GROUP_BY_FIELDS).
+    Ordered by day when grouped by day, else by count descending (e.g. top actors).
+    filters: optional {"action"|"entity_type"|"actor": value}.
+    """
+    qs = AuditDailyRollup.objects.filter(day__gte=date_from, day__lte=date_to)
+    for field, value in (filters or {}).items():
+        qs = qs.filter(**{"actor_id" if field == "actor" else field: value})
+    columns = ["actor_id" if field == "actor" else field for field in group_by]
+    qs = qs.values(*columns).annotate(total=Sum("count"))
+    if "day" in group_by:
+        qs = qs.order_by("day", "-total", *columns)
+    else:
+        qs = qs.order_by("-total", *columns)
+    results = []
+    for row in qs[:limit]:
+        item = {field: row["actor_id" if field == "actor" else field] for field in group_by}
+        item["count"] = row["total"]
+        results.append(item)
+    return results
@@ -29,4 +29,6 @@ class AuditEventSerializer(serializers.ModelSerializer):
         # Defence in depth: strip any sensitive keys that might exist in DB
         if isinstance(data.get("metadata"), dict):
             data["metadata"] = sanitize_metadata(data["metadata"])
+        # Missing IPs are NULL in the database but "" in the API, as before
+        data["ip"] = data["ip"] or ""
         return data
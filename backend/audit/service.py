@@ -1,11 +1,15 @@
 """
 Audit service: append-only event logging.
 Sensitive fields (e.g. SessionNote body) are NEVER stored in metadata.
+Events logged during a request are buffered and written in one batch (see audit.writer).
 """
 
+import ipaddress
+
 from django.contrib.auth import get_user_model
 
 from .models import AuditEvent
+from .writer import enqueue
 
 User = get_user_model()
 
@@ -14,6 +18,8 @@ ENTITY_PATIENT = "patient"
 ENTITY_APPOINTMENT = "appointment"
 ENTITY_REFERRAL = "referral"
 ENTITY_SESSION_NOTE = "session_note"
+ENTITY_CLINIC = "clinic"
+ENTITY_AUDIT_LOG = "audit_log"
 
 # Metadata keys that must NEVER be stored (sensitive content)
 FORBIDDEN_METADATA_KEYS = frozenset(
@@ -48,6 +54,14 @@ def get_client_ip(request):
     return request.META.get("REMOTE_ADDR", "")
 
 
+def normalize_ip(value):
+    """Canonical IP string, or None when value is empty or not an IP address (stored as inet)."""
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except (AttributeError, ValueError):
+        return None
+
+
 def get_user_agent(request):
     """Extract User-Agent from request."""
     if not request:
@@ -72,7 +86,7 @@ def sanitize_metadata(metadata):
     return result
 
 
-def log_event(
+def _build_event(
     *,
     action: str,
     entity_type: str,
@@ -80,10 +94,8 @@ def log_event(
     metadata: dict | None = None,
     request=None,
     actor=None,
-):
-    """
-    Append an audit event. Metadata is sanitized; sensitive fields (e.g. body) are never stored.
-    """
+) -> AuditEvent:
+    """Build an unsaved AuditEvent. Metadata is sanitized; actor defaults to request.user."""
     if metadata is None:
         metadata = {}
     metadata = sanitize_metadata(metadata)
@@ -97,12 +109,46 @@ def log_event(
     ):
         actor_id = request.user.id
 
-    AuditEvent.objects.create(
+    return AuditEvent(
         actor_id=actor_id,
         action=action,
         entity_type=entity_type,
         entity_id=str(entity_id) if entity_id else "",
         metadata=metadata,
-        ip=get_client_ip(request) if request else "",
+        ip=normalize_ip(get_client_ip(request)) if request else None,
         user_agent=get_user_agent(request) if request else "",
     )
+
+
+def log_event(
+    *,
+    action: str,
+    entity_type: str,
+    entity_id: str = "",
+    metadata: dict | None = None,
+    request=None,
+    actor=None,
+):
+    """
+    Append an audit event. Metadata is sanitized; sensitive fields (e.g. body) are never stored.
+    """
+    enqueue(
+        [
+            _build_event(
+                action=action,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                metadata=metadata,
+                request=request,
+                actor=actor,
+            )
+        ]
+    )
+
+
+def log_events(events, *, request=None, actor=None):
+    """
+    Append many audit events with a single bulk insert.
+    Each item is a dict of log_event kwargs (action, entity_type, entity_id, metadata).
+    """
+    enqueue([_build_event(request=request, actor=actor, **event) for event in events])
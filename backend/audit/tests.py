@@ -267,8 +267,565 @@ class TestAuditAPI:
         resp = client.get("/api/v1/audit/events/", {"actor": str(therapist_user.id)})
         assert resp.status_code == status.HTTP_200_OK
 
+    def test_support_can_filter_by_entity_id_and_action(self, support_user):
+        for entity_id, action in (("1", "view"), ("1", "update"), ("2", "view")):
+            AuditEvent.objects.create(action=action, entity_type="patient", entity_id=entity_id)
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get(
+            "/api/v1/audit/events/",
+            {"entity_type": "patient", "entity_id": "1", "action": "view"},
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        results = resp.data["results"]
+        assert [(e["entity_id"], e["action"]) for e in results] == [("1", "view")]
+
+    def test_entity_id_requires_entity_type(self, support_user):
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get("/api/v1/audit/events/", {"entity_id": "1"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "entity_id" in resp.data
+        resp = client.get("/api/v1/audit/events/export/", {"entity_id": "1"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_entity_history_newest_first(self, support_user, therapist_user):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        now = timezone.now()
+        for days, action in ((2, "create"), (1, "update"), (0, "view")):
+            AuditEvent.objects.create(
+                action=action,
+                entity_type="patient",
+                entity_id="7",
+                created_at=now - timedelta(days=days),
+            )
+        AuditEvent.objects.create(action="view", entity_type="patient", entity_id="8")
+        AuditEvent.objects.create(action="view", entity_type="referral", entity_id="7")
+        url = "/api/v1/audit/entities/patient/7/history/"
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+        assert [e["action"] for e in resp.data["results"]] == ["view", "update", "create"]
+        resp = client.get(url, {"action": "update"})
+        assert [e["action"] for e in resp.data["results"]] == ["update"]
+        client.force_authenticate(user=therapist_user)
+        assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
     def test_therapist_cannot_list_events(self, therapist_user):
         client = APIClient()
         client.force_authenticate(user=therapist_user)
         resp = client.get("/api/v1/audit/events/")
         assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestAuditExport:
+    """GET /api/v1/audit/events/export - streamed NDJSON/CSV, filtered, sanitized, resumable."""
+
+    URL = "/api/v1/audit/events/export/"
+
+    def _events(self, n=5):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        start = timezone.now() - timedelta(days=1)
+        for i in range(n):
+            AuditEvent.objects.create(
+                action="view",
+                entity_type="patient",
+                entity_id=str(i),
+                metadata={"i": i, "body": "secret"},
+                created_at=start + timedelta(minutes=i),
+            )
+
+    def _lines(self, resp):
+        import json
+
+        assert resp.streaming
+        return [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+
+    def test_ndjson_filtered_sanitized_and_resumable(self, support_user):
+        self._events()
+        AuditEvent.objects.create(action="view", entity_type="referral", entity_id="9")
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get(self.URL, {"format": "ndjson", "entity_type": "patient"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"] == "application/x-ndjson"
+        rows = self._lines(resp)
+        assert [r["entity_id"] for r in rows] == ["0", "1", "2", "3", "4"]
+        assert rows[0]["metadata"] == {"i": 0}
+
+        resp = client.get(
+            self.URL, {"format": "ndjson", "entity_type": "patient", "cursor": rows[2]["cursor"]}
+        )
+        assert [r["entity_id"] for r in self._lines(resp)] == ["3", "4"]
+        assert AuditEvent.objects.filter(action="export", entity_type="audit_log").count() == 2
+
+    def test_recent_events_left_for_a_later_resume(self, support_user):
+        self._events(2)
+        AuditEvent.objects.create(action="view", entity_type="patient", entity_id="new")
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        rows = self._lines(client.get(self.URL, {"entity_type": "patient"}))
+        assert [r["entity_id"] for r in rows] == ["0", "1"]
+
+    def test_csv(self, support_user):
+        import csv
+        import io
+
+        self._events(2)
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get(self.URL, {"format": "csv", "entity_type": "patient"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"] == "text/csv"
+        content = b"".join(resp.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert [r["entity_id"] for r in rows] == ["0", "1"]
+        assert rows[1]["metadata"] == '{"i": 1}'
+
+    def test_invalid_cursor_and_permission(self, support_user, therapist_user):
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get(self.URL, {"cursor": "not-a-cursor"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        client.force_authenticate(user=therapist_user)
+        assert client.get(self.URL).status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestAuditStats:
+    """Daily rollups kept by the writer; GET /api/v1/audit/stats reads them."""
+
+    def _log(self, actor=None, action="view", entity_type="patient", day=None):
+        from datetime import UTC, datetime
+
+        from audit.writer import write_events
+
+        created_at = datetime.combine(day, datetime.min.time(), tzinfo=UTC) if day else None
+        event = AuditEvent(actor=actor, action=action, entity_type=entity_type)
+        if created_at:
+            event.created_at = created_at
+        write_events([event])
+
+    def test_writer_maintains_rollups_and_rebuild_matches(self, therapist_user):
+        from datetime import date
+
+        from audit.models import AuditDailyRollup
+        from audit.rollups import rebuild_rollups
+
+        day = date(2025, 3, 4)
+        for _ in range(3):
+            self._log(therapist_user, day=day)
+        self._log(None, action="login", entity_type="user", day=day)
+        counts = {(r.action, r.actor_id): r.count for r in AuditDailyRollup.objects.filter(day=day)}
+        assert counts == {("view", therapist_user.id): 3, ("login", None): 1}
+
+        AuditDailyRollup.objects.update(count=0)
+        assert rebuild_rollups(day, day) == 2
+        assert AuditDailyRollup.objects.get(day=day, action="view").count == 3
+
+    def test_stats_grouping_and_validation(self, support_user, therapist_user):
+        from datetime import date
+
+        for day in (date(2025, 3, 1), date(2025, 3, 2)):
+            self._log(therapist_user, day=day)
+            self._log(support_user, day=day)
+        self._log(therapist_user, action="update", day=date(2025, 3, 2))
+        self._log(therapist_user, day=date(2025, 2, 1))
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get(
+            "/api/v1/audit/stats/", {"from": "2025-03-01", "to": "2025-03-07", "group_by": "actor"}
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["results"] == [
+            {"actor": therapist_user.id, "count": 3},
+            {"actor": support_user.id, "count": 2},
+        ]
+        resp = client.get(
+            "/api/v1/audit/stats/",
+            {"from": "2025-03-01", "to": "2025-03-02", "group_by": "day,action"},
+        )
+        assert resp.data["results"] == [
+            {"day": date(2025, 3, 1), "action": "view", "count": 2},
+            {"day": date(2025, 3, 2), "action": "view", "count": 2},
+            {"day": date(2025, 3, 2), "action": "update", "count": 1},
+        ]
+        resp = client.get("/api/v1/audit/stats/", {"from": "2025-03-09", "to": "2025-03-01"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        resp = client.get("/api/v1/audit/stats/", {"group_by": "ip"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        client.force_authenticate(user=therapist_user)
+        assert client.get("/api/v1/audit/stats/").status_code == status.HTTP_403_FORBIDDEN
+
+    def test_rollup_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        self._log()
+        out = StringIO()
+        call_command("audit_rollups", "--all", stdout=out)
+        assert "Rebuilt 1 rollups" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestAuditArchive:
+    """Old events move to compressed segments; list/history read them back transparently."""
+
+    @pytest.fixture(autouse=True)
+    def _archive_root(self, settings, tmp_path, monkeypatch):
+        from audit import archive
+
+        settings.AUDIT_ARCHIVE_ROOT = tmp_path
+        # Several blocks per segment and several segments per month
+        monkeypatch.setattr(archive, "ARCHIVE_BLOCK_ROWS", 3)
+        monkeypatch.setattr(archive, "ARCHIVE_SEGMENT_ROWS", 7)
+
+    def _seed(self, therapist_user):
+        from datetime import UTC, datetime, timedelta
+
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        for i in range(20):
+            AuditEvent.objects.create(
+                actor=therapist_user if i % 2 else None,
+                action="update" if i % 5 == 0 else "view",
+                entity_type="patient",
+                entity_id=str(i % 4),
+                metadata={"i": i},
+                created_at=start + timedelta(days=3 * i, microseconds=i),
+            )
+        AuditEvent.objects.create(action="view", entity_type="patient", entity_id="1")
+
+    def _archive(self):
+        from datetime import date
+
+        from audit.archive import archive_events
+
+        return archive_events(older_than_months=3, today=date(2024, 6, 15))
+
+    def test_archive_moves_old_months_and_is_rerunnable(self, settings, therapist_user):
+        from audit.archive import load_manifest
+
+        self._seed(therapist_user)
+        result = self._archive()
+        # Events every 3 days from 2024-01-01 span January and February; cutoff is 2024-03-01
+        assert result["months"] == ["2024-01", "2024-02"]
+        assert result["events"] == result["deleted"] == 20
+        assert AuditEvent.objects.count() == 1
+        manifest = load_manifest()
+        assert manifest["archived_before"].startswith("2024-03-01")
+        assert sum(s["rows"] for s in manifest["segments"]) == 20
+        assert len(list(settings.AUDIT_ARCHIVE_ROOT.glob("*.ndjson.gz"))) == 4
+        assert self._archive() == {"months": [], "events": 0, "deleted": 0}
+
+    def test_history_and_list_read_archive(self, support_user, therapist_user):
+        self._seed(therapist_user)
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        url = "/api/v1/audit/entities/patient/1/history/"
+        before = client.get(url, {"page_size": 100}).data["results"]
+        self._archive()
+
+        after = client.get(url, {"page_size": 100})
+        assert after.status_code == status.HTTP_200_OK
+        assert after.data["count"] == 6
+        assert after.data["results"] == before
+        page = client.get(url, {"page_size": 4, "page": 2}).data["results"]
+        assert page == before[4:]
+        resp = client.get(url, {"action": "update", "page_size": 100})
+        assert [e["metadata"] for e in resp.data["results"]] == [{"i": 5}]
+
+        events = "/api/v1/audit/events/"
+        assert client.get(events).data["count"] == 1
+        resp = client.get(
+            events,
+            {
+                "date_from": "2024-02-01T00:00:00Z",
+                "actor": str(therapist_user.id),
+                "page_size": 100,
+            },
+        )
+        # Feb 2024 events with an actor: i = 11, 13, 15, 17, 19
+        assert resp.data["count"] == 5
+        results = resp.data["results"]
+        assert [e["metadata"] for e in results] == [{"i": i} for i in (19, 17, 15, 13, 11)]
+        assert {e["actor"] for e in results} == {therapist_user.id}
+
+    def test_pages_read_the_archive_once(self, support_user, therapist_user, monkeypatch):
+        from collections import Counter
+
+        from audit import archive
+
+        self._seed(therapist_user)
+        self._archive()
+        reads = Counter()
+        block = archive.Segment.block
+
+        def counting_block(segment, n):
+            reads[(segment.data_path.name, n)] += 1
+            return block(segment, n)
+
+        monkeypatch.setattr(archive.Segment, "block", counting_block)
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        resp = client.get("/api/v1/audit/entities/patient/1/history/", {"page_size": 2, "page": 2})
+        assert resp.data["count"] == 6
+        assert reads and max(reads.values()) == 1
+
+        # Date range only: whole segments before the page are counted from the manifest
+        reads.clear()
+        resp = client.get(
+            "/api/v1/audit/events/",
+            {
+                "date_from": "2024-01-01T00:00:00Z",
+                "date_to": "2024-02-29T23:59:59Z",
+                "page_size": 2,
+            },
+        )
+        assert resp.data["count"] == 20
+        assert [e["metadata"] for e in resp.data["results"]] == [{"i": 19}, {"i": 18}]
+        assert {name.split("-")[0] for name, _ in reads} == {"202402"}
+        assert max(reads.values()) == 1
+
+    def test_command(self, therapist_user):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        AuditEvent.objects.create(action="view", entity_type="patient", entity_id="1")
+        out = StringIO()
+        call_command("audit_archive", "--older-than-months", "1", stdout=out)
+        assert "Archived 0 events" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestBufferedWriter:
+    """Events of a request are written in one batch; background mode drains on stop."""
+
+    def test_request_events_written_in_one_insert(self):
+        from django.db import connection
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from django.test.utils import CaptureQueriesContext
+
+        from audit.service import log_event
+        from audit.writer import AuditBufferMiddleware
+
+        def view(request):
+            for i in range(3):
+                log_event(action="view", entity_type="patient", entity_id=i)
+            assert not AuditEvent.objects.exists()
+            return HttpResponse()
+
+        with CaptureQueriesContext(connection) as ctx:
+            AuditBufferMiddleware(view)(RequestFactory().get("/"))
+        inserts = [
+            q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "audit_auditevent"')
+        ]
+        assert len(inserts) == 1
+        assert AuditEvent.objects.filter(action="view").count() == 3
+
+    def test_rolled_back_block_drops_its_events(self, django_capture_on_commit_callbacks):
+        from django.db import transaction
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from audit.service import log_event
+        from audit.writer import AuditBufferMiddleware
+
+        def view(request):
+            log_event(action="view", entity_type="patient", entity_id=1)
+            try:
+                with transaction.atomic():
+                    log_event(action="update", entity_type="patient", entity_id=2)
+                    raise ValueError("rolled back")
+            except ValueError:
+                pass
+            with transaction.atomic():
+                log_event(action="update", entity_type="patient", entity_id=3)
+            return HttpResponse()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            AuditBufferMiddleware(view)(RequestFactory().get("/"))
+        written = AuditEvent.objects.order_by("entity_id").values_list("entity_id", flat=True)
+        assert list(written) == ["1", "3"]
+
+    def test_failed_write_does_not_replace_response(self, monkeypatch, caplog):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from audit import writer
+        from audit.service import log_event
+
+        def fail(events):
+            raise RuntimeError("audit database down")
+
+        monkeypatch.setattr(writer, "write_events", fail)
+
+        def view(request):
+            log_event(action="view", entity_type="patient", entity_id=1)
+            return HttpResponse(status=201)
+
+        def failing_view(request):
+            log_event(action="view", entity_type="patient", entity_id=1)
+            raise ValueError("view error")
+
+        assert writer.AuditBufferMiddleware(view)(RequestFactory().get("/")).status_code == 201
+        with pytest.raises(ValueError, match="view error"):
+            writer.AuditBufferMiddleware(failing_view)(RequestFactory().get("/"))
+        assert caplog.text.count("Failed to write 1 audit events") == 2
+
+    def test_retrieve_fetches_object_once(self, therapist_user, patient):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(f"/api/v1/patients/{patient.id}/")
+        patient_selects = [
+            q for q in ctx.captured_queries if q["sql"].startswith('SELECT "patients_patient"')
+        ]
+        assert len(patient_selects) == 1
+
+    def test_events_outside_request_written_immediately(self):
+        from audit.service import log_event
+
+        log_event(action="export", entity_type="clinic", entity_id=1)
+        assert AuditEvent.objects.filter(action="export").count() == 1
+
+    def test_background_writer_backpressure_and_flush(self):
+        import threading
+
+        from audit.writer import BackgroundWriter
+
+        written = []
+        release = threading.Event()
+
+        def write(events):
+            release.wait(5)
+            written.append(list(events))
+
+        writer = BackgroundWriter(write, maxsize=1, timeout=0.05)
+        writer.submit(["a"])  # taken by the thread, blocked in write
+        while not writer.queue.empty():
+            pass
+        writer.submit(["b"])  # fills the queue
+        writer.submit(["c"])  # queue full: written inline after the timeout
+        release.set()
+        writer.stop(timeout=5)
+        assert sorted(e for batch in written for e in batch) == ["a", "b", "c"]
+        assert ["c"] in written
+
+
+@pytest.mark.django_db
+class TestPartitionRetention:
+    """Monthly partition helpers; retention falls back to batched deletes when unpartitioned."""
+
+    def test_month_helpers(self):
+        from datetime import date
+
+        from audit.partitions import add_months, partition_name
+
+        assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+        assert partition_name(date(2025, 2, 1)) == "audit_auditevent_p202502"
+
+    def test_retention_deletes_old_events_in_batches(self, monkeypatch):
+        from datetime import UTC, date, datetime
+
+        from audit import partitions
+
+        monkeypatch.setattr(partitions, "RETENTION_DELETE_BATCH", 2)
+        for month in (1, 2, 3, 4):
+            AuditEvent.objects.create(
+                action="view",
+                entity_type="patient",
+                created_at=datetime(2025, month, 15, tzinfo=UTC),
+            )
+        AuditEvent.objects.create(
+            action="view", entity_type="patient", created_at=datetime(2024, 12, 31, tzinfo=UTC)
+        )
+        assert partitions.ensure_partitions() == []
+        result = partitions.apply_retention(keep_months=2, today=date(2025, 4, 20))
+        assert result == {"partitions": [], "rows_deleted": 3}
+        months = sorted(e.created_at.month for e in AuditEvent.objects.all())
+        assert months == [3, 4]
+
+    def test_command_runs(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("audit_partitions", "--retain-months", "12", stdout=out)
+        assert "Created 0 partitions" in out.getvalue()
+        assert "0 rows deleted" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestCompactRowFormat:
+    """User agents are stored once and IPs as inet; the API output is unchanged."""
+
+    def _request_events(self, user_agent, ip, n=2):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from audit.service import log_event
+        from audit.writer import AuditBufferMiddleware
+
+        def view(request):
+            for i in range(n):
+                log_event(action="view", entity_type="patient", entity_id=i, request=request)
+            return HttpResponse()
+
+        request = RequestFactory().get("/", HTTP_USER_AGENT=user_agent, REMOTE_ADDR=ip)
+        AuditBufferMiddleware(view)(request)
+
+    def test_agents_deduplicated_and_output_unchanged(self, support_user):
+        from audit.models import UserAgent
+
+        self._request_events("Mozilla/5.0 (X11)", "10.0.0.7")
+        self._request_events("Mozilla/5.0 (X11)", "2001:db8::1")
+        AuditEvent.objects.create(action="login", entity_type="user", user_agent="curl/8.4")
+        assert UserAgent.objects.count() == 2
+        client = APIClient()
+        client.force_authenticate(user=support_user)
+        results = client.get("/api/v1/audit/events/", {"action": "view"}).data["results"]
+        assert {(e["ip"], e["user_agent"]) for e in results} == {
+            ("10.0.0.7", "Mozilla/5.0 (X11)"),
+            ("2001:db8::1", "Mozilla/5.0 (X11)"),
+        }
+        login = client.get("/api/v1/audit/events/", {"action": "login"}).data["results"][0]
+        assert (login["ip"], login["user_agent"]) == ("", "curl/8.4")
+
+    def test_invalid_ip_stored_as_null(self):
+        from audit.service import normalize_ip
+
+        assert normalize_ip(" 10.0.0.1 ") == "10.0.0.1"
+        assert normalize_ip("unknown") is None
+        assert normalize_ip("") is None
+        self._request_events("", "not-an-ip", n=1)
+        event = AuditEvent.objects.get()
+        assert event.ip is None and event.agent_id is None and event.user_agent == ""
+
+    def test_known_agents_resolved_from_cache(self, django_capture_on_commit_callbacks):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from audit.user_agents import user_agent_id, user_agent_value
+
+        with django_capture_on_commit_callbacks(execute=True):
+            agent_id = user_agent_id("Mozilla/5.0")
+        with CaptureQueriesContext(connection) as ctx:
+            assert user_agent_id("Mozilla/5.0") == agent_id
+            assert user_agent_value(agent_id) == "Mozilla/5.0"
+        assert len(ctx.captured_queries) == 0
@@ -1,11 +1,19 @@
-"""Audit URLs: GET /api/v1/audit/events."""
+"""Audit URLs: GET /api/v1/audit/events, /entities/{type}/{id}/history, /stats."""
 
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import AuditEventViewSet
+from .views import AuditEntityHistoryView, AuditEventViewSet, AuditStatsView
 
 router = DefaultRouter()
 router.register("events", AuditEventViewSet, basename="audit-event")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "entities/<str:entity_type>/<str:entity_id>/history/",
+        AuditEntityHistoryView.as_view(),
+        name="audit-entity-history",
+    ),
+    path("stats/", AuditStatsView.as_view(), name="audit-stats"),
+    path("", include(router.urls)),
+]
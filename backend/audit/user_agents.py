@@ -0,0 +1,86 @@
+"""
+Deduplicated User-Agent strings for audit events.
+
+A handful of agents account for nearly every event, so each distinct string is stored once in
+UserAgent and events reference it by integer id. Known agents are kept in a per-process cache in
+both directions, so resolving them on write or rendering them on read needs no query.
+A newly created agent is only cached for lookup by value once its transaction has committed,
+so a rolled-back batch never leaves the cache pointing at a missing row.
+"""
+
+import hashlib
+import threading
+
+from django.db import transaction
+
+from .models import UserAgent
+
+AGENT_CACHE_SIZE = 10_000
+
+_lock = threading.Lock()
+_ids: dict[str, int] = {}
+_values: dict[int, str] = {}
+
+
+def agent_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _remember(agent_id: int, value: str, *, by_value: bool = True) -> None:
+    with _lock:
+        if len(_values) >= AGENT_CACHE_SIZE:
+            _ids.clear()
+            _values.clear()
+        _values[agent_id] = value
+        if by_value:
+            _ids[value] = agent_id
+
+
+def clear_cache() -> None:
+    with _lock:
+        _ids.clear()
+        _values.clear()
+
+
+def user_agent_ids(values) -> dict[str, int]:
+    """Agent id for each non-empty value, creating unknown agents (one query each way)."""
+    result = {}
+    missing = {}
+    for value in values:
+        if not value or value in result:
+            continue
+        agent_id = _ids.get(value)
+        if agent_id is None:
+            missing[agent_hash(value)] = value
+        else:
+            result[value] = agent_id
+    if missing:
+        UserAgent.objects.bulk_create(
+            [UserAgent(hash=h, value=v) for h, v in missing.items()], ignore_conflicts=True
+        )
+        for agent_id, h in UserAgent.objects.filter(hash__in=missing).values_list("id", "hash"):
+            value = missing[h]
+            result[value] = agent_id
+            _remember(agent_id, value, by_value=False)
+            transaction.on_commit(lambda a=agent_id, v=value: _remember(a, v))
+    return result
+
+
+def user_agent_id(value: str) -> int | None:
+    return user_agent_ids([value]).get(value) if value else None
+
+
+def user_agent_value(agent_id: int) -> str:
+    value = _values.get(agent_id)
+    if value is None:
+        value = UserAgent.objects.values_list("value", flat=True).get(id=agent_id)
+        _remember(agent_id, value, by_value=False)
+    return value
+
+
+def resolve_user_agents(events) -> None:
+    """Set agent_id on unsaved events from the user_agent strings they were built with."""
+    pending = [e for e in events if e._user_agent is not None]
+    ids = user_agent_ids(e._user_agent for e in pending)
+    for event in pending:
+        event.agent_id = ids.get(event._user_agent)
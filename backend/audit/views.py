@@ -1,14 +1,27 @@
-"""Audit views. Support role only. Filters: actor, date range, entity_type."""
+"""Audit views. Support role only. Filters: actor, action, entity_type, entity_id, date range."""
 
+from datetime import UTC, timedelta
+
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.utils.dateparse import parse_datetime
-from rest_framework import viewsets
+from django.utils.dateparse import parse_date
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import ListAPIView
 from rest_framework.permissions import BasePermission
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.permissions import user_is_support
 
+from .archive import CombinedEvents, load_manifest, needs_archive
+from .export import CSVRenderer, NDJSONRenderer, csv_lines, export_rows, ndjson_lines, parse_cursor
 from .models import AuditEvent
+from .query import FILTER_PARAMS, event_queryset, filter_events
+from .rollups import GROUP_BY_FIELDS, STATS_MAX_DAYS, STATS_MAX_ROWS, rollup_stats
 from .serializers import AuditEventSerializer
+from .service import ENTITY_AUDIT_LOG, log_event
 
 
 class IsSupportOnly(BasePermission):
@@ -20,37 +33,155 @@ class IsSupportOnly(BasePermission):
         )
 
 
-class AuditEventViewSet(viewsets.ReadOnlyModelViewSet):
-    """GET /api/v1/audit/events - support-only. Filters: actor, date range, entity_type."""
+class ArchiveAwareListMixin:
+    """
+    List that continues into archived events (audit.archive) when the requested date range
+    reaches before the archive watermark.
+    """
+
+    # Also when no date_from is given (lookups that the archive index serves cheaply)
+    archive_unbounded = False
+
+    def archive_params(self):
+        return self.request.query_params
+
+    def page_window(self):
+        """(start, stop) of the requested page, so the archive is read once for it."""
+        try:
+            number = int(self.request.query_params.get(self.paginator.page_query_param, 1))
+        except ValueError:
+            return None
+        size = self.paginator.get_page_size(self.request)
+        return ((number - 1) * size, number * size) if size and number > 0 else None
+
+    def list(self, request, *args, **kwargs):
+        params = self.archive_params()
+        manifest = load_manifest()
+        if not needs_archive(params, manifest, unbounded=self.archive_unbounded):
+            return super().list(request, *args, **kwargs)
+        events = CombinedEvents(self.get_queryset(), params, manifest, window=self.page_window())
+        page = self.paginate_queryset(events)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class AuditEventViewSet(ArchiveAwareListMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    GET /api/v1/audit/events - support-only.
+    Filters: actor, action, entity_type, entity_id, date range (see audit.query).
+    date_from/date_to filter created_at, the partition key, so only those months are scanned.
+    """
 
     permission_classes = [IsSupportOnly]
     serializer_class = AuditEventSerializer
 
     def get_queryset(self):
-        qs = AuditEvent.objects.select_related("actor").order_by("-created_at")
-
-        actor = self.request.query_params.get("actor")
-        if actor:
-            qs = qs.filter(actor_id=actor)
-
-        entity_type = self.request.query_params.get("entity_type")
-        if entity_type:
-            qs = qs.filter(entity_type=entity_type)
-
-        date_from = self.request.query_params.get("date_from")
-        if date_from:
-            dt = parse_datetime(date_from)
-            if dt and timezone.is_naive(dt):
-                dt = timezone.make_aware(dt)
-            if dt:
-                qs = qs.filter(created_at__gte=dt)
-
-        date_to = self.request.query_params.get("date_to")
-        if date_to:
-            dt = parse_datetime(date_to)
-            if dt and timezone.is_naive(dt):
-                dt = timezone.make_aware(dt)
-            if dt:
-                qs = qs.filter(created_at__lte=dt)
-
-        return qs
+        return filter_events(event_queryset(), self.request.query_params)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer, JSONRenderer],
+    )
+    def export(self, request):
+        """
+        GET /api/v1/audit/events/export?format=ndjson|csv - stream every matching event, oldest
+        first (same filters as the list), up to the settle watermark (audit.export).
+        ?cursor= (from the last row received) resumes.
+        """
+        fmt = "csv" if request.accepted_renderer.format == "csv" else "ndjson"
+        token = request.query_params.get("cursor", "").strip()
+        try:
+            cursor = parse_cursor(token) if token else None
+        except ValueError:
+            return Response({"cursor": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        qs = filter_events(AuditEvent.objects.all(), request.query_params)
+        filters = {k: v for k, v in request.query_params.items() if k in FILTER_PARAMS}
+        log_event(
+            action="export",
+            entity_type=ENTITY_AUDIT_LOG,
+            metadata={"format": fmt, "filters": filters, "resumed": cursor is not None},
+            request=request,
+        )
+        rows = export_rows(qs, cursor)
+        if fmt == "csv":
+            response = StreamingHttpResponse(csv_lines(rows), content_type="text/csv")
+        else:
+            response = StreamingHttpResponse(
+                ndjson_lines(rows), content_type="application/x-ndjson"
+            )
+        response["Content-Disposition"] = f'attachment; filename="audit-events.{fmt}"'
+        return response
+
+
+class AuditEntityHistoryView(ArchiveAwareListMixin, ListAPIView):
+    """
+    GET /api/v1/audit/entities/{entity_type}/{entity_id}/history - support-only.
+    All events for one entity, newest first, archived ones included. Filters: actor, action,
+    date range.
+    """
+
+    permission_classes = [IsSupportOnly]
+    serializer_class = AuditEventSerializer
+    archive_unbounded = True
+
+    def archive_params(self):
+        return {
+            **self.request.query_params.dict(),
+            "entity_type": self.kwargs["entity_type"],
+            "entity_id": self.kwargs["entity_id"],
+        }
+
+    def get_queryset(self):
+        qs = event_queryset().filter(
+            entity_type=self.kwargs["entity_type"], entity_id=self.kwargs["entity_id"]
+        )
+        return filter_events(qs, self.request.query_params)
+
+
+def _parse_day(value):
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
+class AuditStatsView(APIView):
+    """
+    GET /api/v1/audit/stats?from=&to=&group_by=&action=&entity_type=&actor=&limit= - support-only.
+    Event counts from the daily rollups, e.g. group_by=day,action,entity_type (default) or
+    group_by=actor for top actors. from/to are inclusive UTC dates (default: the last 7 days).
+    """
+
+    permission_classes = [IsSupportOnly]
+
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+        date_to = _parse_day(params.get("to")) or timezone.now().astimezone(UTC).date()
+        date_from = _parse_day(params.get("from")) or date_to - timedelta(days=6)
+        for key in ("from", "to"):
+            if params.get(key) and _parse_day(params[key]) is None:
+                errors[key] = "Expected YYYY-MM-DD."
+        if not 0 <= (date_to - date_from).days < STATS_MAX_DAYS:
+            errors["from"] = f"Must be on or before 'to', at most {STATS_MAX_DAYS} days earlier."
+        group_by = list(
+            dict.fromkeys(
+                g.strip()
+                for g in params.get("group_by", "day,action,entity_type").split(",")
+                if g.strip()
+            )
+        )
+        if not group_by or any(g not in GROUP_BY_FIELDS for g in group_by):
+            errors["group_by"] = f"Comma-separated subset of {list(GROUP_BY_FIELDS)}."
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(params.get("limit", STATS_MAX_ROWS)), 1), STATS_MAX_ROWS)
+        except ValueError:
+            limit = STATS_MAX_ROWS
+        filters = {f: params[f] for f in ("action", "entity_type", "actor") if params.get(f)}
+        results = rollup_stats(date_from, date_to, group_by, filters=filters, limit=limit)
+        return Response(
+            {"from": date_from, "to": date_to, "group_by": group_by, "results": results}
+        )
@@ -0,0 +1,198 @@
+"""
+Buffered audit writer.
+
+During a request (AuditBufferMiddleware) log_event/log_events only collect events; they are
+written with one bulk_create when the request finishes, including requests that fail, so a
+retrieve costs no extra round trip per event. Events logged inside a transaction.atomic block
+join the buffer only when that transaction commits, so a rolled-back block drops its events
+just as an immediate write would have been rolled back. Outside a request (management commands,
+shell) events are written immediately, as before.
+
+With settings.AUDIT_WRITER = "thread" the request's batch is handed to a background thread
+instead, through a bounded queue of AUDIT_QUEUE_SIZE batches. When the queue is full the request
+waits up to AUDIT_QUEUE_TIMEOUT seconds (backpressure) and then writes the batch itself, so
+events are never dropped. The queue is drained when the worker process exits.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AuditEvent
+from .rollups import add_counts, count_events
+from .user_agents import resolve_user_agents
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = 1000
+AUDIT_QUEUE_TIMEOUT = 2.0
+# Queued batches merged into one insert by the background thread
+AUDIT_WRITE_BATCH = 500
+
+_buffer: ContextVar[list | None] = ContextVar("audit_buffer", default=None)
+# Atomic blocks already open when the request started (e.g. a test's transaction)
+_base_depth: ContextVar[int] = ContextVar("audit_base_depth", default=0)
+_STOP = object()
+
+
+def write_events(events) -> None:
+    """Insert events and add them to the daily rollups (audit.rollups) atomically."""
+    with transaction.atomic():
+        resolve_user_agents(events)
+        AuditEvent.objects.bulk_create(events)
+        add_counts(count_events(events))
+
+
+class BackgroundWriter:
+    """Daemon thread draining a bounded queue of event batches into bulk inserts."""
+
+    def __init__(
+        self,
+        write=write_events,
+        *,
+        maxsize=AUDIT_QUEUE_SIZE,
+        timeout=AUDIT_QUEUE_TIMEOUT,
+        batch_size=AUDIT_WRITE_BATCH,
+    ):
+        self.write = write
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                atexit.register(self.stop)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, events) -> None:
+        self._ensure_started()
+        try:
+            self.queue.put(list(events), timeout=self.timeout)
+        except queue.Full:
+            logger.warning("Audit queue full; writing %d events inline", len(events))
+            self.write(events)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = []
+            taken = 0
+            item = self.queue.get()
+            while True:
+                taken += 1
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.extend(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self.write(batch)
+            except Exception:
+                logger.exception("Failed to write %d audit events", len(batch))
+            finally:
+                close_old_connections()
+                for _ in range(taken):
+                    self.queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every submitted batch has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+    def stop(self, timeout=None) -> None:
+        """Write everything queued so far, then stop the thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def background_writer() -> BackgroundWriter:
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = BackgroundWriter(
+                maxsize=getattr(settings, "AUDIT_QUEUE_SIZE", AUDIT_QUEUE_SIZE),
+                timeout=getattr(settings, "AUDIT_QUEUE_TIMEOUT", AUDIT_QUEUE_TIMEOUT),
+            )
+        return _background
+
+
+def dispatch(events) -> None:
+    """Write a finished batch, directly or through the background thread."""
+    if not events:
+        return
+    if getattr(settings, "AUDIT_WRITER", "sync") == "thread":
+        background_writer().submit(events)
+    else:
+        write_events(events)
+
+
+def enqueue(events) -> None:
+    """
+    Buffer events for the current request, or write them now outside a request. Inside an
+    atomic block opened during the request they are buffered on commit (dropped on rollback).
+    """
+    buffer = _buffer.get()
+    if buffer is None:
+        write_events(events)
+    elif len(transaction.get_connection().atomic_blocks) > _base_depth.get():
+        transaction.on_commit(lambda: _add_committed(buffer, events))
+    else:
+        buffer.extend(events)
+
+
+def _dispatch_after_response(events) -> None:
+    """
+    dispatch() for events of a request whose response (or exception) is already decided: a
+    failed audit write is logged rather than replacing it with a 500 or masking the view's error.
+    """
+    try:
+        dispatch(events)
+    except Exception:
+        logger.exception("Failed to write %d audit events", len(events))
+
+
+def _add_committed(buffer, events) -> None:
+    """Buffer events of a committed transaction; write them if their request already finished."""
+    if _buffer.get() is buffer:
+        buffer.extend(events)
+    else:
+        _dispatch_after_response(events)
+
+
+class AuditBufferMiddleware:
+    """Collect audit events for the request and write them in one batch at the end."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _buffer.set([])
+        depth_token = _base_depth.set(len(transaction.get_connection().atomic_blocks))
+        try:
+            return self.get_response(request)
+        finally:
+            events = _buffer.get()
+            _buffer.reset(token)
+            _base_depth.reset(depth_token)
+            _dispatch_after_response(events)
@@ -5,6 +5,7 @@ Membership links User <-> Clinic with role: therapist or admin.
 
 from django.db import models
 
+from accounts.authz import invalidate_authz
 from accounts.models import User
 
 
@@ -47,3 +48,27 @@ class Membership(models.Model):
             models.Index(fields=["clinic"]),
             models.Index(fields=["user"]),
         ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    def _invalidate_authz(self):
+        user = self.user if Membership.user.is_cached(self) else None
+        invalidate_authz(self.user_id, user)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # A reassigned membership also changes the previous user's map
+        previous_user_id = getattr(self, "_loaded_user_id", None)
+        if previous_user_id and previous_user_id != self.user_id:
+            invalidate_authz(previous_user_id)
+        self._loaded_user_id = self.user_id
+        self._invalidate_authz()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._invalidate_authz()
+        return result
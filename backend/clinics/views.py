@@ -2,9 +2,9 @@
 
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import AnonRateThrottle
 
 from accounts.permissions import IsClinicAdmin
+from config.throttling import AnonThrottle, UserRoleThrottle
 
 from .models import Clinic, Membership
 from .serializers import ClinicSerializer, MembershipSerializer
@@ -16,7 +16,7 @@ class ClinicViewSet(viewsets.ModelViewSet):
     queryset = Clinic.objects.all()
     serializer_class = ClinicSerializer
     lookup_field = "slug"
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonThrottle, UserRoleThrottle]
 
     def get_permissions(self):
         if self.action in ("list", "retrieve"):
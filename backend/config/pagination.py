@@ -1,4 +1,8 @@
-"""Custom pagination. Default page_size=20, max_page_size=100."""
+"""Custom pagination. Default page_size=20, max_page_size=100. Opaque cursors for keyset pages."""
+
+import base64
+import binascii
+import json
 
 from rest_framework.pagination import PageNumberPagination
 
@@ -7,3 +11,20 @@ class StandardPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+def encode_cursor(values) -> str:
+    """Opaque, URL-safe token for a keyset position (list of JSON-serializable values)."""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    """Inverse of encode_cursor. Raises ValueError on a malformed token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,35 @@
+"""Request parsers: NDJSON (one JSON object per line) for bulk endpoints."""
+
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse application/x-ndjson into a list of objects.
+    Reads the stream line by line; blank lines are skipped.
+    A view may set ``ndjson_max_items``: parsing stops after one item past that limit, so an
+    oversized body is rejected by the view's size check without being read in full.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        max_items = getattr(parser_context.get("view"), "ndjson_max_items", None)
+        items = []
+        for lineno, raw in enumerate(stream, start=1):
+            line = raw.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise ParseError(f"NDJSON parse error on line {lineno}: {e}") from e
+            if max_items is not None and len(items) > max_items:
+                break
+        return items
@@ -55,6 +55,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "config.middleware.SecurityHeadersMiddleware",
+    "audit.writer.AuditBufferMiddleware",
 ]
 
 # django-daisy: modals instead of popups
@@ -152,6 +153,13 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 FIXTURE_DIRS = [BASE_DIR / "config" / "fixtures"]
+
+# Generated data exports (patients.export): local storage, served via /api/v1/exports/{id}/download
+EXPORT_ROOT = Path(env("EXPORT_ROOT", default=str(BASE_DIR / "exports")))
+# "command": jobs wait for `manage.py run_exports`; "thread": run in-process after commit
+EXPORT_RUNNER = env("EXPORT_RUNNER", default="command")
+# Running export jobs claimed longer ago than this are taken as abandoned (worker died) and failed
+EXPORT_STALE_SECONDS = env.int("EXPORT_STALE_SECONDS", default=6 * 60 * 60)
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "accounts.User"
@@ -160,7 +168,7 @@ AUTH_USER_MODEL = "accounts.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -172,9 +180,54 @@ REST_FRAMEWORK = {
         "anon": "100/minute",
         "public": "60/minute",
         "auth": "20/minute",
+        # Authenticated users, per role ("user_<role>"), else "user" (config.throttling)
+        "user": "600/minute",
+        "user_help_seeker": "120/minute",
     },
 }
 
+# Audit events are written once per request (audit.writer): "sync" at the end of the request,
+# or "thread" to hand the batch to a background thread with a bounded queue.
+AUDIT_WRITER = env("AUDIT_WRITER", default="sync")
+AUDIT_QUEUE_SIZE = env.int("AUDIT_QUEUE_SIZE", default=1000)
+AUDIT_QUEUE_TIMEOUT = env.float("AUDIT_QUEUE_TIMEOUT", default=2.0)
+# Audit exports leave out events younger than this, which may not be written yet (audit.export)
+AUDIT_EXPORT_SETTLE_SECONDS = env.int("AUDIT_EXPORT_SETTLE_SECONDS", default=60)
+# Compressed segments of archived audit events (audit.archive, `manage.py audit_archive`)
+AUDIT_ARCHIVE_ROOT = Path(env("AUDIT_ARCHIVE_ROOT", default=str(BASE_DIR / "audit_archive")))
+
+# Throttle counters (config.throttling) are shared by all workers: in Redis when REDIS_URL is
+# set, otherwise in the database (accounts.ThrottleCounter).
+REDIS_URL = env("REDIS_URL", default="")
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "throttle": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    ),
+    # Membership maps shared across workers (accounts.authz). Without Redis there is no
+    # cross-request cache: a per-process one could not be invalidated on other workers.
+    "authz": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    ),
+    # Refresh-token blacklist log (accounts.blacklist). The filter refuses a per-process or
+    # dummy cache, so JWT_BLACKLIST_FILTER needs REDIS_URL.
+    "jwt_blacklist": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    ),
+}
+THROTTLE_STORAGE = (
+    "config.throttling.CacheStorage" if REDIS_URL else "config.throttling.DatabaseStorage"
+)
+THROTTLE_CACHE = "throttle"
+AUTHZ_CACHE = "authz"
+JWT_BLACKLIST_CACHE = "jwt_blacklist"
+
 # drf-spectacular OpenAPI schema
 SPECTACULAR_SETTINGS = {
     "TITLE": "TherapyCare API",
@@ -189,8 +242,12 @@ CORS_ALLOWED_ORIGINS = env.list(
     default=["http://localhost:5173", "http://localhost:3000"],
 )
 
-# SimpleJWT: token lifetimes, blacklist for logout
+# SimpleJWT: token lifetimes, blacklist for logout. Access tokens carry authz claims
+# (accounts.claims), so the access lifetime bounds how stale role/membership claims can be.
 SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.jwt_serializers.CustomTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.jwt_serializers.ClaimsTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "accounts.jwt_serializers.FilteredTokenBlacklistSerializer",
     "ACCESS_TOKEN_LIFETIME": timedelta(
         minutes=env.int("JWT_ACCESS_TOKEN_LIFETIME_MINUTES", default=60)
     ),
@@ -198,3 +255,7 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
 }
+# Bloom filter in front of refresh-token blacklist checks (accounts.blacklist). Processes sync
+# through the JWT_BLACKLIST_CACHE alias, which must be shared (Redis): enabling it without
+# REDIS_URL raises ImproperlyConfigured.
+JWT_BLACKLIST_FILTER = env.bool("JWT_BLACKLIST_FILTER", default=False)
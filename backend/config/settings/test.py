@@ -3,6 +3,9 @@ Test settings: SQLite for running tests without Postgres.
 Use: DJANGO_SETTINGS_MODULE=config.settings.test pytest
 """
 
+import os
+import tempfile
+
 from .base import *  # noqa: F401, F403
 
 DATABASES = {
@@ -11,3 +14,21 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+
+# In-process stand-in for the shared throttle store (reset per test in conftest)
+THROTTLE_STORAGE = "config.throttling.MemoryStorage"
+
+# In-process stand-ins for the shared (Redis) authz and throttle caches. The blacklist filter refuses
+# per-process caches, so its log goes to a file-based cache (one directory per test run)
+CACHES = {
+    **CACHES,  # noqa: F405
+    "authz": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "authz"},
+    "throttle": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "throttle",
+    },
+    "jwt_blacklist": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), f"therapycare-jwt-blacklist-{os.getpid()}"),
+    },
+}
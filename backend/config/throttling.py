@@ -1,15 +1,228 @@
-"""Rate limiting for public endpoints."""
+"""
+Rate limiting for public and auth endpoints.
 
-from rest_framework.throttling import AnonRateThrottle
+Sliding-window counter: each client key keeps one counter per fixed window, and the request
+rate is estimated as previous_count * (unexpired share of the previous window) + current_count.
+That is two O(1) storage reads (plus one increment when allowed) per request, instead of a
+timestamp list per client. Only allowed requests are counted, so a client that keeps retrying
+while throttled does not extend its own lockout. Concurrent requests may each read the count
+before the other's increment, so a burst can overshoot the limit by the number of workers.
 
+Counters live in pluggable storage (settings.THROTTLE_STORAGE), shared by all workers:
+- CacheStorage: a Django cache (settings.THROTTLE_CACHE), Redis when REDIS_URL is set.
+- DatabaseStorage: accounts.ThrottleCounter rows, the default without REDIS_URL. Each increment
+  is one INSERT ... ON CONFLICT DO UPDATE, so concurrent increments are never lost.
+- MemoryStorage: in-process dict, for tests only (limits would be per worker).
 
-class PublicEndpointThrottle(AnonRateThrottle):
-    """Stricter rate for unauthenticated requests to public endpoints."""
+Authenticated users are limited per user, at the "<scope>_<role>" rate when one is configured
+(e.g. "user_help_seeker"), else at the scope's rate.
+"""
 
-    rate = "60/minute"
+import threading
+import time
+from datetime import timedelta
+from functools import cache as memoize
 
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
 
-class AuthEndpointThrottle(AnonRateThrottle):
+THROTTLE_KEY = "throttle:{scope}:{ident}:{window}"
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+class CacheStorage:
+    """Counters in a Django cache; atomic when the backend's incr is (Redis, Memcached, locmem)."""
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or getattr(settings, "THROTTLE_CACHE", "default")]
+
+    def get(self, key: str) -> int:
+        return self.cache.get(key, 0)
+
+    def incr(self, key: str, ttl: int) -> int:
+        if self.cache.add(key, 1, ttl):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(key, 1, ttl)
+            return 1
+
+
+class DatabaseStorage:
+    """Counters in the database table of accounts.ThrottleCounter (no Redis)."""
+
+    # Expired rows are deleted at most this often (seconds) per process
+    PURGE_INTERVAL = 60
+
+    def __init__(self):
+        self._purged_at = 0.0
+
+    def get(self, key: str) -> int:
+        from accounts.models import ThrottleCounter
+
+        rows = ThrottleCounter.objects.filter(key=key, expires_at__gt=timezone.now())
+        return rows.values_list("count", flat=True).first() or 0
+
+    def incr(self, key: str, ttl: int) -> int:
+        from accounts.models import ThrottleCounter
+
+        now = timezone.now()
+        qn = connection.ops.quote_name
+        adapt = connection.ops.adapt_datetimefield_value
+        table = qn(ThrottleCounter._meta.db_table)
+        key_col, count_col, expires_col = qn("key"), qn("count"), qn("expires_at")
+        # An expired row left for the key restarts at 1 instead of counting on
+        expired = f"{table}.{expires_col} <= %s"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({key_col}, {count_col}, {expires_col}) VALUES (%s, 1, %s) "
+                f"ON CONFLICT ({key_col}) DO UPDATE SET "
+                f"{count_col} = CASE WHEN {expired} THEN 1 ELSE {table}.{count_col} + 1 END, "
+                f"{expires_col} = CASE WHEN {expired} "
+                f"THEN excluded.{expires_col} ELSE {table}.{expires_col} END "
+                f"RETURNING {count_col}",
+                [key, adapt(now + timedelta(seconds=ttl)), adapt(now), adapt(now)],
+            )
+            (count,) = cursor.fetchone()
+        if time.monotonic() - self._purged_at > self.PURGE_INTERVAL:
+            self._purged_at = time.monotonic()
+            ThrottleCounter.objects.filter(expires_at__lte=now).delete()
+        return count
+
+
+class MemoryStorage:
+    """Process-local counters (tests only)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def _live(self, key: str, now: float):
+        entry = self._counts.get(key)
+        if entry and entry[1] <= now:
+            del self._counts[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            return entry[0] if entry else 0
+
+    def incr(self, key: str, ttl: int) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(key, now)
+            count = entry[0] + 1 if entry else 1
+            self._counts[key] = (count, entry[1] if entry else now + ttl)
+            return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+@memoize
+def _storage(path: str):
+    return import_string(path)()
+
+
+def get_storage():
+    return _storage(getattr(settings, "THROTTLE_STORAGE", "config.throttling.DatabaseStorage"))
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """'100/minute' -> (100, 60)."""
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Sliding-window-counter throttle for `scope`, with per-role rates for authenticated users."""
+
+    scope = None
+    timer = time.time
+
+    def get_rate(self, request) -> str | None:
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        role = getattr(request.user, "role", None)
+        if request.user.is_authenticated and role and f"{self.scope}_{role}" in rates:
+            return rates[f"{self.scope}_{role}"]
+        return rates.get(self.scope)
+
+    def get_ident_key(self, request) -> str | None:
+        """Client identity, or None to skip throttling this request."""
+        if request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(request)
+        ident = self.get_ident_key(request)
+        if rate is None or ident is None:
+            return True
+        self.num_requests, self.duration = parse_rate(rate)
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        storage = get_storage()
+        key = THROTTLE_KEY.format(scope=self.scope, ident=ident, window="{}")
+        self.current = storage.get(key.format(window))
+        self.previous = storage.get(key.format(window - 1))
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current + 1 > self.num_requests:
+            return False
+        storage.incr(key.format(window), ttl=2 * self.duration)
+        return True
+
+    def wait(self):
+        """Seconds until one more request fits under the limit."""
+        if self.current >= self.num_requests:
+            # Rest of this window, then until this window's weight has decayed enough
+            rest = self.duration - self.elapsed
+            return rest + self.duration * (1 - (self.num_requests - 1) / self.current)
+        if not self.previous:
+            return None
+        needed = 1 - (self.num_requests - self.current - 1) / self.previous
+        return max(self.duration * needed - self.elapsed, 0)
+
+
+class AnonThrottle(SlidingWindowThrottle):
+    """Unauthenticated requests, per client IP (replaces DRF AnonRateThrottle)."""
+
+    scope = "anon"
+
+    def get_ident_key(self, request):
+        if request.user.is_authenticated:
+            return None
+        return super().get_ident_key(request)
+
+
+class UserRoleThrottle(SlidingWindowThrottle):
+    """Authenticated requests, per user at the role's rate ("user_<role>", else "user")."""
+
+    scope = "user"
+
+    def get_ident_key(self, request):
+        if not request.user.is_authenticated:
+            return None
+        return super().get_ident_key(request)
+
+
+class PublicEndpointThrottle(SlidingWindowThrottle):
+    """Public endpoints: per IP when anonymous, per user (role rate) when authenticated."""
+
+    scope = "public"
+
+
+class AuthEndpointThrottle(AnonThrottle):
     """Rate limit for login/register to prevent brute force."""
 
-    rate = "20/minute"
+    scope = "auth"
@@ -2,4 +2,23 @@
 
 import os
 
+import pytest
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Caches (match index, caseloads, throttle counters, user agents) are per-process; start cold."""
+    from django.core.cache import caches
+
+    from audit.user_agents import clear_cache as clear_user_agents
+    from config.throttling import get_storage
+
+    for alias in caches:
+        caches[alias].clear()
+    storage = get_storage()
+    if hasattr(storage, "clear"):
+        storage.clear()
+    clear_user_agents()
+    yield
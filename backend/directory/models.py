@@ -4,6 +4,7 @@ Full-text search on display_name + bio + specialties.
 """
 
 from django.db import models
+from django.utils import timezone
 
 from accounts.models import User
 from clinics.models import Clinic
@@ -26,6 +27,30 @@ class Location(models.Model):
         ]
 
 
+class TherapistProfileQuerySet(models.QuerySet):
+    """
+    Bulk writes stamp updated_at like save() does: the referral match index is versioned on
+    (count, max(updated_at)), so a queryset write that left it untouched would serve a stale index.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        if "updated_at" not in fields:
+            objs = list(objs)
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields = [*fields, "updated_at"]
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+    bulk_update.alters_data = True
+
+
 class TherapistProfile(models.Model):
     """
     Therapist profile in directory.
@@ -49,6 +74,8 @@ class TherapistProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TherapistProfileQuerySet.as_manager()
+
     class Meta:
         ordering = ["display_name"]
         indexes = [
@@ -57,6 +84,24 @@ class TherapistProfile(models.Model):
             models.Index(fields=["price_min", "price_max"], name="directory_th_price_idx"),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        user_changed = not self._state.adding and self.user_id != getattr(
+            self, "_loaded_user_id", None
+        )
+        super().save(*args, **kwargs)
+        if user_changed:
+            # Owner ACL entries are keyed by user: move them from the old user to the new one
+            from patients.acl import rebuild_entries
+
+            rebuild_entries(list(self.owned_patients.values_list("id", flat=True)))
+        self._loaded_user_id = self.user_id
+
 
 class AvailabilitySlot(models.Model):
     """Therapist availability: weekday, start/end time, timezone."""
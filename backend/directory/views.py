@@ -10,10 +10,10 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from accounts.permissions import user_is_therapist
+from config.throttling import AnonThrottle, UserRoleThrottle
 
 from .models import TherapistProfile
 from .search import search_therapists
@@ -31,7 +31,7 @@ class TherapistProfileViewSet(ReadOnlyModelViewSet):
     """
 
     permission_classes = [AllowAny]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonThrottle, UserRoleThrottle]
     ordering_fields = ["display_name", "price_min", "price_max", "created_at"]
     ordering = ["display_name"]
     serializer_class = TherapistProfileListSerializer
@@ -0,0 +1,76 @@
+"""
+Patient access-control list (PatientACL), precomputed from Patient.owner_therapist and
+PatientAccess so that list scoping is one indexed semi-join and an object check is one
+unique-index probe.
+
+Entries are rebuilt per patient whenever the owner or a grant changes (Patient.save,
+PatientAccess.save/delete, TherapistProfile.save when its user changes, bulk patient creation). Writes that bypass those paths (queryset
+update/delete, raw SQL) are caught by `manage.py check_patient_acl --fix`.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Patient, PatientAccess, PatientAccessType, PatientACL
+
+SOURCE_OWNER = PatientACL.SOURCE_OWNER
+GRANT_SOURCES = tuple(PatientAccessType.values)
+
+
+def expected_entries(patient_ids) -> set[tuple[int, int, str]]:
+    """(user_id, patient_id, source) rows implied by owners and grants of the given patients."""
+    owners = Patient.objects.filter(id__in=patient_ids).values_list(
+        "owner_therapist__user_id", "id"
+    )
+    grants = PatientAccess.objects.filter(patient_id__in=patient_ids).values_list(
+        "user_id", "patient_id", "access_type"
+    )
+    return {(u, p, SOURCE_OWNER) for u, p in owners if u} | set(grants)
+
+
+def stored_entries(patient_ids) -> set[tuple[int, int, str]]:
+    return set(
+        PatientACL.objects.filter(patient_id__in=patient_ids).values_list(
+            "user_id", "patient_id", "source"
+        )
+    )
+
+
+def apply_diff(missing, stale) -> None:
+    """Insert missing and delete stale (user_id, patient_id, source) rows."""
+    if stale:
+        match = Q()
+        for user_id, patient_id, source in stale:
+            match |= Q(user_id=user_id, patient_id=patient_id, source=source)
+        PatientACL.objects.filter(match).delete()
+    PatientACL.objects.bulk_create(
+        [PatientACL(user_id=u, patient_id=p, source=s) for u, p, s in missing],
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_entries(patient_ids) -> None:
+    """Bring ACL rows of the given patients in line with their owner and grants."""
+    patient_ids = [pid for pid in patient_ids if pid]
+    if not patient_ids:
+        return
+    with transaction.atomic():
+        expected = expected_entries(patient_ids)
+        stored = stored_entries(patient_ids)
+        apply_diff(expected - stored, stored - expected)
+
+
+def patient_ids_for(user, sources=None):
+    """Subquery of patient ids the user has an entry for (optionally only from sources)."""
+    entries = PatientACL.objects.filter(user_id=user.id)
+    if sources is not None:
+        entries = entries.filter(source__in=sources)
+    return entries.values("patient_id")
+
+
+def has_entry(user, patient_id, sources=None) -> bool:
+    """One unique-index probe: does the user have an entry for this patient?"""
+    entries = PatientACL.objects.filter(user_id=user.id, patient_id=patient_id)
+    if sources is not None:
+        entries = entries.filter(source__in=sources)
+    return entries.exists()
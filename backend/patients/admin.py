@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 
-from .models import Consent, Patient, PatientAccess, PatientProfile
+from .models import Consent, DataExport, Patient, PatientAccess, PatientACL, PatientProfile
 
 
 @admin.register(Patient)
@@ -19,6 +19,21 @@ class PatientAccessAdmin(admin.ModelAdmin):
     search_fields = ("patient__name", "user__email")
 
 
+@admin.register(PatientACL)
+class PatientACLAdmin(admin.ModelAdmin):
+    list_display = ("patient", "user", "source")
+    list_filter = ("source",)
+    search_fields = ("patient__name", "user__email")
+    readonly_fields = ("patient", "user", "source")
+
+
+@admin.register(DataExport)
+class DataExportAdmin(admin.ModelAdmin):
+    list_display = ("id", "scope", "patient", "clinic", "status", "requested_by", "created_at")
+    list_filter = ("scope", "status")
+    readonly_fields = ("row_counts", "size_bytes", "file_name", "error", "completed_at")
+
+
 @admin.register(PatientProfile)
 class PatientProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "date_of_birth", "created_at")
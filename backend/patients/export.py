@@ -0,0 +1,285 @@
+"""
+Per-patient / per-clinic data export (data-subject requests, clinic migrations).
+
+Each table is streamed straight into its own NDJSON member of a zip file on local storage
+(settings.EXPORT_ROOT): rows come from QuerySet.iterator(), which uses a server-side cursor on
+PostgreSQL, and are compressed as they are written, so memory stays constant regardless of size.
+On PostgreSQL all tables are read in one REPEATABLE READ transaction for a consistent snapshot
+(when the export is not already running inside a transaction).
+Each export is audited as a single event.
+
+Jobs are created pending by the API and run out of band: `manage.py run_exports` (cron or a
+worker loop) claims and runs pending jobs, or with settings.EXPORT_RUNNER = "thread" a job is
+started in a background thread once the creating transaction commits. Clients poll the job.
+A claimed job records claimed_at. The export reads inside one read-only transaction and cannot
+heartbeat, so run_exports fails jobs still running settings.EXPORT_STALE_SECONDS after their claim
+(the runner died mid-export) and removes their partial file.
+"""
+
+import json
+import logging
+import os
+import threading
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Case, F, Q, TextField, Value, When
+from django.utils import timezone
+
+from appointments.models import Appointment, SessionNote
+from audit.service import ENTITY_CLINIC, ENTITY_PATIENT, log_event
+from referrals.models import Questionnaire, Referral, ReferralNote, ReferralStatusChange
+from referrals.scoring import answers_from_responses
+
+from .models import DataExport, Patient
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMAT_VERSION = 1
+
+# Derived columns that are not part of the record (rebuilt on import)
+EXCLUDED_COLUMNS = {
+    Referral: {"search_vector", "identity_hash"},
+    Questionnaire: {"responses", "raw_answers"},
+    SessionNote: {"body"},
+}
+
+REDACTED = "REDACTED"
+
+
+def export_root() -> Path:
+    return Path(settings.EXPORT_ROOT)
+
+
+def export_path(job: DataExport) -> Path:
+    return export_root() / job.file_name
+
+
+def _columns(model) -> list[str]:
+    excluded = EXCLUDED_COLUMNS.get(model, set())
+    return [f.attname for f in model._meta.concrete_fields if f.attname not in excluded]
+
+
+def _questionnaire_row(row):
+    """Emit answers in API (dict) form instead of the storage columns."""
+    responses = row.pop("stored_responses")
+    raw = row.pop("stored_raw_answers")
+    row["answers"] = answers_from_responses(responses) if responses is not None else raw or {}
+    return row
+
+
+def _session_note_row(row):
+    row["body"] = row.pop("note_body")
+    return row
+
+
+def _tables(job: DataExport):
+    """(member name, queryset of dicts, row transform) for every table in the export."""
+    if job.scope == DataExport.Scope.PATIENT:
+        patients = Patient.objects.filter(id=job.patient_id)
+        referrals = Referral.objects.filter(id__in=patients.values("referral_id"))
+    else:
+        patients = Patient.objects.filter(clinic_id=job.clinic_id)
+        referrals = Referral.objects.filter(clinic_id=job.clinic_id)
+    appointments = Appointment.objects.filter(patient__in=patients)
+
+    tables = [
+        ("patients", patients.values(*_columns(Patient)), None),
+        ("referrals", referrals.values(*_columns(Referral)), None),
+        (
+            "referral_status_changes",
+            ReferralStatusChange.objects.filter(referral__in=referrals).values(
+                *_columns(ReferralStatusChange)
+            ),
+            None,
+        ),
+        (
+            "referral_notes",
+            ReferralNote.objects.filter(referral__in=referrals).values(*_columns(ReferralNote)),
+            None,
+        ),
+        (
+            "questionnaires",
+            Questionnaire.objects.filter(referral__in=referrals)
+            .annotate(stored_responses=F("responses"), stored_raw_answers=F("raw_answers"))
+            .values(*_columns(Questionnaire), "stored_responses", "stored_raw_answers"),
+            _questionnaire_row,
+        ),
+        ("appointments", appointments.values(*_columns(Appointment)), None),
+    ]
+    if job.include_session_notes:
+        # Bodies only for notes the requester authored (same rule as appointment detail)
+        body = Case(
+            When(author__user_id=job.requested_by_id, then=F("body")),
+            default=Value(REDACTED),
+            output_field=TextField(),
+        )
+        tables.append(
+            (
+                "session_notes",
+                SessionNote.objects.filter(appointment__in=appointments)
+                .annotate(note_body=body)
+                .values(*_columns(SessionNote), "note_body"),
+                _session_note_row,
+            )
+        )
+    return [(name, qs.order_by("id"), transform) for name, qs, transform in tables]
+
+
+def _write_ndjson(zf: zipfile.ZipFile, name: str, queryset, transform) -> int:
+    """Stream a queryset into one NDJSON zip member. Returns row count."""
+    count = 0
+    with zf.open(f"{name}.ndjson", "w", force_zip64=True) as out:
+        for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            if transform:
+                row = transform(row)
+            out.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")).encode())
+            out.write(b"\n")
+            count += 1
+    return count
+
+
+def _write_archive(job: DataExport, path: Path) -> dict[str, int]:
+    counts = {}
+    # Isolation can only be set by the statement that opens the transaction
+    snapshot = connection.vendor == "postgresql" and not connection.in_atomic_block
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with transaction.atomic():
+            if snapshot:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            for name, queryset, transform in _tables(job):
+                counts[name] = _write_ndjson(zf, name, queryset, transform)
+        manifest = {
+            "format_version": EXPORT_FORMAT_VERSION,
+            "export_id": job.id,
+            "scope": job.scope,
+            "patient": job.patient_id,
+            "clinic": job.clinic_id,
+            "include_session_notes": job.include_session_notes,
+            "created_at": timezone.now(),
+            "row_counts": counts,
+        }
+        zf.writestr("manifest.json", json.dumps(manifest, cls=DjangoJSONEncoder, indent=2))
+    return counts
+
+
+def run_export(job: DataExport, *, request=None) -> DataExport:
+    """
+    Write the export archive for job (written to a .part file, then renamed) and record the
+    outcome on the job. Completed exports are audited as one "export" event.
+    """
+    job.status = DataExport.Status.RUNNING
+    job.claimed_at = job.claimed_at or timezone.now()
+    target = job.patient_id if job.scope == DataExport.Scope.PATIENT else job.clinic_id
+    job.file_name = f"{job.scope}-{target}-export-{job.id}.zip"
+    job.save(update_fields=["status", "claimed_at", "file_name"])
+
+    root = export_root()
+    root.mkdir(parents=True, exist_ok=True)
+    path = export_path(job)
+    partial = path.with_name(path.name + ".part")
+    try:
+        counts = _write_archive(job, partial)
+        os.replace(partial, path)
+    except Exception as e:
+        partial.unlink(missing_ok=True)
+        job.status = DataExport.Status.FAILED
+        job.error = str(e)[:1000]
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error", "completed_at"])
+        return job
+
+    job.status = DataExport.Status.COMPLETED
+    job.row_counts = counts
+    job.size_bytes = path.stat().st_size
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "row_counts", "size_bytes", "completed_at"])
+    log_event(
+        action="export",
+        entity_type=ENTITY_PATIENT if job.scope == DataExport.Scope.PATIENT else ENTITY_CLINIC,
+        entity_id=target,
+        request=request,
+        actor=None if request else job.requested_by,
+        metadata={
+            "export_id": job.id,
+            "rows": counts,
+            "include_session_notes": job.include_session_notes,
+        },
+    )
+    return job
+
+
+def claim_export(job_id) -> DataExport | None:
+    """Mark a pending job running; None if it is gone or another runner claimed it first."""
+    claimed = DataExport.objects.filter(pk=job_id, status=DataExport.Status.PENDING).update(
+        status=DataExport.Status.RUNNING, claimed_at=timezone.now()
+    )
+    return DataExport.objects.get(pk=job_id) if claimed else None
+
+
+def fail_stale_exports() -> list[DataExport]:
+    """
+    Fail running jobs claimed more than settings.EXPORT_STALE_SECONDS ago and remove their
+    partial files: their runner died (a live export never outlasts the timeout). Returns them.
+    """
+    stale_after = getattr(settings, "EXPORT_STALE_SECONDS", 6 * 60 * 60)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    running = DataExport.objects.filter(status=DataExport.Status.RUNNING)
+    failed = []
+    for job in running.filter(Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True)):
+        # Conditional on the claim we saw, so a job reclaimed meanwhile is left alone
+        if not running.filter(pk=job.pk, claimed_at=job.claimed_at).update(
+            status=DataExport.Status.FAILED,
+            error="Export runner stopped before the export finished.",
+            completed_at=timezone.now(),
+        ):
+            continue
+        if job.file_name:
+            path = export_path(job)
+            path.with_name(path.name + ".part").unlink(missing_ok=True)
+        job.refresh_from_db()
+        failed.append(job)
+    return failed
+
+
+def run_pending_exports(limit=None) -> list[DataExport]:
+    """Claim and run pending jobs, oldest first. Returns the jobs that were run."""
+    pending = DataExport.objects.filter(status=DataExport.Status.PENDING).order_by("created_at")
+    ids = list(pending.values_list("id", flat=True)[:limit])
+    done = []
+    for job_id in ids:
+        job = claim_export(job_id)
+        if job is not None:
+            done.append(run_export(job))
+    return done
+
+
+def _run_in_thread(job_id) -> None:
+    try:
+        job = claim_export(job_id)
+        if job is not None:
+            run_export(job)
+    except Exception:
+        logger.exception("Export %s failed to start; left for run_exports", job_id)
+    finally:
+        close_old_connections()
+
+
+def start_export(job: DataExport) -> None:
+    """
+    Schedule job after the current transaction commits. With EXPORT_RUNNER = "thread" it runs in
+    a daemon thread; otherwise it stays pending until `manage.py run_exports` picks it up.
+    """
+    if getattr(settings, "EXPORT_RUNNER", "command") != "thread":
+        return
+    transaction.on_commit(
+        lambda: threading.Thread(
+            target=_run_in_thread, args=(job.pk,), name=f"export-{job.pk}", daemon=True
+        ).start()
+    )
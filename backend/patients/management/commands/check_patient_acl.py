@@ -0,0 +1,52 @@
+"""Verify (and optionally repair) the precomputed PatientACL against owners and grants."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from patients.acl import apply_diff, expected_entries, stored_entries
+from patients.models import Patient
+
+
+class Command(BaseCommand):
+    help = "Compare PatientACL with Patient.owner_therapist + PatientAccess; --fix to repair"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="Patients per batch")
+        parser.add_argument(
+            "--fix", action="store_true", help="Insert missing and delete stale entries"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        totals = {"patients": 0, "missing": 0, "stale": 0}
+        batch = []
+        ids = Patient.objects.order_by("id").values_list("id", flat=True)
+        for pid in ids.iterator(chunk_size=batch_size):
+            batch.append(pid)
+            if len(batch) >= batch_size:
+                self._check_batch(batch, totals, options["fix"])
+                batch = []
+        if batch:
+            self._check_batch(batch, totals, options["fix"])
+
+        summary = (
+            f"Checked {totals['patients']} patients: {totals['missing']} missing, "
+            f"{totals['stale']} stale entries"
+        )
+        if not totals["missing"] and not totals["stale"]:
+            self.stdout.write(self.style.SUCCESS(f"{summary}. ACL is consistent."))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"{summary} (repaired)."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{summary}. Run with --fix to repair."))
+
+    def _check_batch(self, patient_ids, totals, fix):
+        with transaction.atomic():
+            expected = expected_entries(patient_ids)
+            stored = stored_entries(patient_ids)
+            missing, stale = expected - stored, stored - expected
+            if fix and (missing or stale):
+                apply_diff(missing, stale)
+        totals["patients"] += len(patient_ids)
+        totals["missing"] += len(missing)
+        totals["stale"] += len(stale)
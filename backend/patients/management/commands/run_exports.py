@@ -0,0 +1,27 @@
+"""Run pending data export jobs (patients.export). Schedule it, or loop it in a worker."""
+
+from django.core.management.base import BaseCommand
+
+from patients.export import fail_stale_exports, run_pending_exports
+from patients.models import DataExport
+
+
+class Command(BaseCommand):
+    help = (
+        "Fail abandoned running exports, then claim and run pending patient/clinic data exports, "
+        "oldest first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Run at most this many jobs")
+
+    def handle(self, *args, **options):
+        for job in fail_stale_exports():
+            self.stdout.write(
+                self.style.WARNING(f"Export {job.id}: abandoned since {job.claimed_at}, failed")
+            )
+        jobs = run_pending_exports(options["limit"])
+        failed = sum(1 for job in jobs if job.status == DataExport.Status.FAILED)
+        for job in jobs:
+            self.stdout.write(f"Export {job.id}: {job.status}")
+        self.stdout.write(self.style.SUCCESS(f"Ran {len(jobs)} exports ({failed} failed)."))
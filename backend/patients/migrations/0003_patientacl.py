@@ -0,0 +1,63 @@
+# Precomputed patient access list, backfilled from owner_therapist + PatientAccess
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_BATCH = 2000
+
+
+def backfill_acl(apps, schema_editor):
+    Patient = apps.get_model("patients", "Patient")
+    PatientAccess = apps.get_model("patients", "PatientAccess")
+    PatientACL = apps.get_model("patients", "PatientACL")
+
+    def insert(patient_ids):
+        entries = [
+            PatientACL(user_id=user_id, patient_id=pid, source="owner")
+            for user_id, pid in Patient.objects.filter(id__in=patient_ids).values_list(
+                "owner_therapist__user_id", "id"
+            )
+            if user_id
+        ] + [
+            PatientACL(user_id=user_id, patient_id=pid, source=access_type)
+            for user_id, pid, access_type in PatientAccess.objects.filter(
+                patient_id__in=patient_ids
+            ).values_list("user_id", "patient_id", "access_type")
+        ]
+        PatientACL.objects.bulk_create(entries, ignore_conflicts=True)
+
+    batch = []
+    for pid in Patient.objects.order_by("id").values_list("id", flat=True).iterator(
+        chunk_size=BACKFILL_BATCH
+    ):
+        batch.append(pid)
+        if len(batch) >= BACKFILL_BATCH:
+            insert(batch)
+            batch = []
+    if batch:
+        insert(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0002_patient_and_patientaccess"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientACL",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("source", models.CharField(max_length=20)),
+                ("patient", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="acl_entries", to="patients.patient")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("user", "patient", "source"), name="patients_acl_user_patient_source_uniq")],
+            },
+        ),
+        migrations.RunPython(backfill_acl, migrations.RunPython.noop),
+    ]
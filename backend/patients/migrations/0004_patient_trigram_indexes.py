@@ -0,0 +1,36 @@
+# Trigram GIN indexes for patient search (?q=): prefix/substring ILIKE and word similarity.
+# Indexed on UPPER(column) to match Django's case-insensitive lookups.
+# PostgreSQL only; no-op on SQLite (e.g. tests)
+
+from django.db import connection, migrations
+
+COLUMNS = ("name", "email", "phone")
+
+
+def add_trigram_indexes(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for column in COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS patients_pa_{column}_trgm "
+            f"ON patients_patient USING GIN (UPPER({column}) gin_trgm_ops);"
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+    for column in COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS patients_pa_{column}_trgm;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0003_patientacl"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -0,0 +1,18 @@
+# When a runner claimed an export job, so run_exports can fail jobs whose runner died
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0005_dataexport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataexport",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -65,6 +65,23 @@ class Patient(models.Model):
             models.Index(fields=["owner_therapist"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_owner_therapist_id = instance.__dict__.get("owner_therapist_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        owner_changed = self._state.adding or self.owner_therapist_id != getattr(
+            self, "_loaded_owner_therapist_id", None
+        )
+        super().save(*args, **kwargs)
+        if owner_changed:
+            from .acl import rebuild_entries
+
+            rebuild_entries([self.pk])
+            self._loaded_owner_therapist_id = self.owner_therapist_id
+
 
 class PatientAccessType(models.TextChoices):
     """Who can access patient record."""
@@ -94,3 +111,88 @@ class PatientAccess(models.Model):
             models.Index(fields=["patient"]),
             models.Index(fields=["user"]),
         ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_patient_id = instance.__dict__.get("patient_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .acl import rebuild_entries
+
+        # A grant moved to another patient also leaves the old patient's entry stale
+        loaded_patient_id = getattr(self, "_loaded_patient_id", None)
+        rebuild_entries({self.patient_id, loaded_patient_id})
+        self._loaded_patient_id = self.patient_id
+
+    def delete(self, *args, **kwargs):
+        patient_id = self.patient_id
+        result = super().delete(*args, **kwargs)
+        from .acl import rebuild_entries
+
+        rebuild_entries([patient_id])
+        return result
+
+
+class PatientACL(models.Model):
+    """
+    Materialized patient access list: one row per (user, patient, source), where source is
+    "owner" (Patient.owner_therapist.user) or the PatientAccess access_type. Derived data,
+    maintained by patients.acl; verify/repair with the check_patient_acl command.
+    """
+
+    SOURCE_OWNER = "owner"
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="acl_entries")
+    source = models.CharField(max_length=20)
+
+    class Meta:
+        constraints = [
+            # Also serves list scoping (user -> patient ids) and object checks (user, patient)
+            models.UniqueConstraint(
+                fields=["user", "patient", "source"], name="patients_acl_user_patient_source_uniq"
+            )
+        ]
+
+
+class DataExport(models.Model):
+    """Export job: zip of NDJSON files for one patient or one clinic (see patients.export)."""
+
+    class Scope(models.TextChoices):
+        PATIENT = "patient", "Patient"
+        CLINIC = "clinic", "Clinic"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    scope = models.CharField(max_length=20, choices=Scope.choices)
+    patient = models.ForeignKey(
+        Patient, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    clinic = models.ForeignKey(
+        Clinic, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    include_session_notes = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file_name = models.CharField(max_length=255, blank=True)  # relative to EXPORT_ROOT
+    size_bytes = models.BigIntegerField(null=True, blank=True)
+    row_counts = models.JSONField(default=dict)  # e.g. {"patients": 1, "appointments": 12}
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # when a runner started it
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["requested_by", "created_at"], name="patients_export_user_idx"),
+        ]
@@ -1,22 +1,50 @@
 """Patient permissions: role-filtered access."""
 
+from django.db.models import Q
 from rest_framework import permissions
 
+from accounts.authz import get_authz
 from accounts.permissions import user_is_clinic_admin, user_is_help_seeker, user_is_therapist
+from clinics.models import Clinic, Membership
+
+from .acl import GRANT_SOURCES, has_entry, patient_ids_for
+from .models import Patient, PatientAccessType
 
 
 def user_has_patient_access(user, patient):
-    """True if user can view this patient."""
+    """True if user can view this patient. One PatientACL lookup (see patients.acl)."""
     if user_is_clinic_admin(user) or user.is_staff:
         return True
     if user_is_therapist(user):
-        return (
-            patient.owner_therapist.user_id == user.id
-            or patient.access_grants.filter(user=user).exists()
-        )
+        return has_entry(user, patient.pk)
     if user_is_help_seeker(user):
-        return patient.access_grants.filter(user=user).exists()
-    return patient.access_grants.filter(user=user, access_type="support_readonly").exists()
+        return has_entry(user, patient.pk, GRANT_SOURCES)
+    return has_entry(user, patient.pk, [PatientAccessType.SUPPORT_READONLY])
+
+
+def _admin_clinic_ids(user):
+    memberships = get_authz(user).memberships
+    return [cid for cid, role in memberships.items() if role == Membership.MemberRole.ADMIN]
+
+
+def exportable_patients(user):
+    """
+    Patients the user may export: staff, an admin member of the patient's clinic, or a therapist
+    with access to the patient. Missing and inaccessible ids look the same to the caller.
+    """
+    if user.is_staff:
+        return Patient.objects.all()
+    allowed = Q(clinic_id__in=_admin_clinic_ids(user))
+    if user_is_therapist(user):
+        allowed |= Q(id__in=patient_ids_for(user))
+    return Patient.objects.filter(allowed)
+
+
+def exportable_clinics(user):
+    """Whole-clinic export: staff or an admin member of that clinic."""
+    if user.is_staff:
+        return Clinic.objects.all()
+    return Clinic.objects.filter(id__in=_admin_clinic_ids(user))
 
 
 class PatientPermission(permissions.BasePermission):
@@ -0,0 +1,51 @@
+"""
+Patient search (?q= on /api/v1/patients).
+Postgres: prefix and trigram word-similarity matching on name and email, substring on phone,
+all served by GIN trigram indexes on UPPER(column) (see migration 0004). Applied to the
+already access-scoped queryset, so scope and search run as one query; ranked and bounded.
+On SQLite (tests) search falls back to icontains.
+"""
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+PATIENT_SEARCH_LIMIT = 50
+MAX_QUERY_LENGTH = 100
+# Trigram matching needs at least one full trigram; shorter queries are prefix-only
+MIN_FUZZY_LENGTH = 3
+
+
+def search_patients(queryset, query: str):
+    """Filter an (already access-scoped) patient queryset by ?q=, best matches first."""
+    q = (query or "").strip()[:MAX_QUERY_LENGTH]
+    if not q:
+        return queryset
+    prefix = Q(name__istartswith=q) | Q(email__istartswith=q)
+    prefix_boost = Case(
+        When(prefix, then=Value(1.0)), default=Value(0.0), output_field=FloatField()
+    )
+
+    if connection.vendor != "postgresql":
+        # Fallback for SQLite (e.g. tests)
+        match = prefix | Q(name__icontains=q) | Q(email__icontains=q) | Q(phone__icontains=q)
+        rank = prefix_boost
+    else:
+        needle = q.upper()
+        queryset = queryset.alias(name_upper=Upper("name"), email_upper=Upper("email"))
+        match = prefix | Q(phone__icontains=q)
+        if len(q) >= MIN_FUZZY_LENGTH:
+            match |= Q(name_upper__trigram_word_similar=needle) | Q(
+                email_upper__trigram_word_similar=needle
+            )
+        rank = prefix_boost + Greatest(
+            TrigramWordSimilarity(Value(needle), "name_upper"),
+            TrigramWordSimilarity(Value(needle), "email_upper"),
+        )
+
+    return (
+        queryset.filter(match)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "name", "id")[:PATIENT_SEARCH_LIMIT]
+    )
@@ -2,7 +2,11 @@
 
 from rest_framework import serializers
 
-from .models import Patient
+from clinics.models import Clinic
+
+from .models import DataExport, Patient
+from .permissions import exportable_clinics, exportable_patients
+from .timeline import SUMMARY_LIMIT
 
 
 class PatientListSerializer(serializers.ModelSerializer):
@@ -32,6 +36,7 @@ class ReferralTimelineSerializer(serializers.Serializer):
     status = serializers.CharField()
     created_at = serializers.DateTimeField()
     questionnaires = serializers.ListField(child=serializers.DictField())
+    questionnaire_count = serializers.IntegerField()
     note_count = serializers.IntegerField()
 
 
@@ -46,8 +51,14 @@ class AppointmentTimelineSerializer(serializers.Serializer):
 
 
 class PatientDetailSerializer(serializers.ModelSerializer):
+    """
+    Bounded summary: latest SUMMARY_LIMIT appointments and questionnaires plus counts.
+    Full history is paginated at /patients/{id}/timeline.
+    """
+
     referral_timeline = serializers.SerializerMethodField()
     appointments_timeline = serializers.SerializerMethodField()
+    appointment_count = serializers.SerializerMethodField()
     clinic_name = serializers.CharField(source="clinic.name", read_only=True)
     owner_therapist_name = serializers.CharField(
         source="owner_therapist.display_name", read_only=True
@@ -69,24 +80,40 @@ class PatientDetailSerializer(serializers.ModelSerializer):
             "created_at",
             "referral_timeline",
             "appointments_timeline",
+            "appointment_count",
         ]
 
     def get_referral_timeline(self, obj):
         if not obj.referral_id:
             return None
         ref = obj.referral
+        recent = getattr(ref, "recent_questionnaires", None)
+        if recent is None:
+            recent = list(ref.questionnaires.order_by("-created_at")[:SUMMARY_LIMIT])
+        note_count = getattr(obj, "note_count", None)
+        questionnaire_count = getattr(obj, "questionnaire_count", None)
         return {
             "id": ref.id,
             "status": ref.status,
             "created_at": ref.created_at,
             "questionnaires": [
                 {"id": q.id, "type": q.type, "score": q.score, "created_at": q.created_at}
-                for q in ref.questionnaires.all()
+                for q in reversed(recent)
             ],
-            "note_count": ref.notes.count(),
+            "questionnaire_count": (
+                questionnaire_count
+                if questionnaire_count is not None
+                else ref.questionnaires.count()
+            ),
+            "note_count": note_count if note_count is not None else ref.notes.count(),
         }
 
     def get_appointments_timeline(self, obj):
+        recent = getattr(obj, "recent_appointments", None)
+        if recent is None:
+            recent = list(
+                obj.appointments.select_related("therapist").order_by("-starts_at")[:SUMMARY_LIMIT]
+            )
         return [
             {
                 "id": a.id,
@@ -95,5 +122,50 @@ class PatientDetailSerializer(serializers.ModelSerializer):
                 "status": a.status,
                 "therapist_name": a.therapist.display_name,
             }
-            for a in obj.appointments.all().order_by("starts_at")
+            for a in reversed(recent)
+        ]
+
+    def get_appointment_count(self, obj):
+        count = getattr(obj, "appointment_count", None)
+        return count if count is not None else obj.appointments.count()
+
+
+class DataExportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DataExport
+        fields = [
+            "id",
+            "scope",
+            "patient",
+            "clinic",
+            "include_session_notes",
+            "status",
+            "size_bytes",
+            "row_counts",
+            "error",
+            "created_at",
+            "completed_at",
         ]
+
+
+class DataExportCreateSerializer(serializers.Serializer):
+    """
+    POST /exports: exactly one of patient or clinic. Both are looked up among what the request
+    user may export, so an inaccessible id fails exactly like a missing one.
+    """
+
+    patient = serializers.PrimaryKeyRelatedField(queryset=Patient.objects.none(), required=False)
+    clinic = serializers.PrimaryKeyRelatedField(queryset=Clinic.objects.none(), required=False)
+    include_session_notes = serializers.BooleanField(default=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is not None:
+            self.fields["patient"].queryset = exportable_patients(request.user)
+            self.fields["clinic"].queryset = exportable_clinics(request.user)
+
+    def validate(self, data):
+        if bool(data.get("patient")) == bool(data.get("clinic")):
+            raise serializers.ValidationError("Provide exactly one of patient or clinic.")
+        return data
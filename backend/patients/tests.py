@@ -94,3 +94,363 @@ class TestPatientDetail:
         resp = client.get(f"/api/v1/patients/{patient.id}/")
         assert resp.status_code == status.HTTP_200_OK
         assert resp.data["name"] == "John Doe"
+
+
+@pytest.mark.django_db
+class TestPatientTimeline:
+    """GET /api/v1/patients/{id}/timeline/ and bounded detail summary."""
+
+    def _history(self, patient, therapist_profile, appointments=3):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from appointments.models import Appointment
+        from referrals.models import Questionnaire, ReferralNote
+
+        now = timezone.now()
+        for i in range(appointments):
+            Appointment.objects.create(
+                patient=patient,
+                therapist=therapist_profile,
+                starts_at=now + timedelta(days=i),
+                ends_at=now + timedelta(days=i, hours=1),
+            )
+        Questionnaire.objects.create(referral=patient.referral, type="phq9", score=9)
+        ReferralNote.objects.create(
+            referral=patient.referral, author=therapist_profile.user, body="Note"
+        )
+
+    def test_timeline_pages_merge_all_kinds(self, therapist_user, therapist_profile, patient):
+        self._history(patient, therapist_profile)
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        seen, cursor = [], None
+        while True:
+            params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+            resp = client.get(f"/api/v1/patients/{patient.id}/timeline/", params)
+            assert resp.status_code == status.HTTP_200_OK
+            seen += resp.data["results"]
+            cursor = resp.data["next_cursor"]
+            if not cursor:
+                break
+        # 3 appointments + questionnaire + note + referral created, no duplicates
+        assert len(seen) == 6
+        assert len({(e["kind"], e["id"]) for e in seen}) == 6
+        assert {e["kind"] for e in seen} == {
+            "appointment",
+            "questionnaire",
+            "referral_note",
+            "referral_created",
+        }
+        times = [e["occurred_at"] for e in seen]
+        assert times == sorted(times, reverse=True)
+
+    def test_invalid_cursor(self, therapist_user, patient):
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        resp = client.get(f"/api/v1/patients/{patient.id}/timeline/", {"cursor": "nope"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_detail_is_bounded(
+        self, therapist_user, therapist_profile, patient, django_assert_max_num_queries
+    ):
+        from patients.timeline import SUMMARY_LIMIT
+
+        self._history(patient, therapist_profile, appointments=SUMMARY_LIMIT + 2)
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        with django_assert_max_num_queries(12):
+            resp = client.get(f"/api/v1/patients/{patient.id}/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["appointments_timeline"]) == SUMMARY_LIMIT
+        assert resp.data["appointment_count"] == SUMMARY_LIMIT + 2
+        assert resp.data["referral_timeline"]["note_count"] == 1
+
+
+@pytest.mark.django_db
+class TestPatientACL:
+    """Precomputed PatientACL drives list scoping and object checks."""
+
+    def test_grant_and_revoke(self, patient):
+        from patients.models import PatientAccess, PatientAccessType
+
+        seeker = User.objects.create_user(email="seek@test.com", password="x", role="help_seeker")
+        client = APIClient()
+        client.force_authenticate(user=seeker)
+        assert client.get(f"/api/v1/patients/{patient.id}/").status_code == 404
+        access = PatientAccess.objects.create(
+            patient=patient, user=seeker, access_type=PatientAccessType.THERAPIST
+        )
+        resp = client.get("/api/v1/patients/")
+        assert [p["id"] for p in resp.data["results"]] == [patient.id]
+        assert client.get(f"/api/v1/patients/{patient.id}/").status_code == 200
+        access.delete()
+        assert client.get("/api/v1/patients/").data["results"] == []
+
+    def test_owner_change_moves_access(self, therapist_user, patient):
+        other_user = User.objects.create_user(email="t2@test.com", password="x", role="therapist")
+        other = TherapistProfile.objects.create(user=other_user, display_name="Dr. Two", bio="")
+        patient.owner_therapist = other
+        patient.save()
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        assert client.get("/api/v1/patients/").data["results"] == []
+        client.force_authenticate(user=other_user)
+        assert client.get(f"/api/v1/patients/{patient.id}/").status_code == 200
+
+    def test_profile_user_change_moves_owner_entries(
+        self, therapist_user, therapist_profile, patient
+    ):
+        from patients.models import PatientACL
+
+        new_user = User.objects.create_user(email="t3@test.com", password="x", role="therapist")
+        therapist_profile.user = new_user
+        therapist_profile.save()
+        owners = PatientACL.objects.filter(patient=patient, source=PatientACL.SOURCE_OWNER)
+        assert list(owners.values_list("user_id", flat=True)) == [new_user.id]
+
+    def test_grant_moved_to_other_patient_clears_old_entry(
+        self, clinic, therapist_profile, patient
+    ):
+        from patients.models import PatientAccess, PatientACL
+
+        other = Patient.objects.create(
+            clinic=clinic, owner_therapist=therapist_profile, name="Other", email="o@example.com"
+        )
+        seeker = User.objects.create_user(email="s3@test.com", password="x", role="help_seeker")
+        PatientAccess.objects.create(patient=patient, user=seeker)
+        access = PatientAccess.objects.get(user=seeker)
+        access.patient = other
+        access.save()
+        granted = PatientACL.objects.filter(user=seeker).values_list("patient_id", flat=True)
+        assert list(granted) == [other.id]
+
+    def test_check_command_repairs_drift(self, patient):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from patients.models import PatientAccess, PatientACL
+
+        seeker = User.objects.create_user(email="s2@test.com", password="x", role="help_seeker")
+        # Queryset writes bypass model hooks and leave the ACL out of date
+        PatientACL.objects.filter(patient=patient).delete()
+        PatientAccess.objects.bulk_create([PatientAccess(patient=patient, user=seeker)])
+        out = StringIO()
+        call_command("check_patient_acl", stdout=out)
+        assert "2 missing" in out.getvalue()
+        call_command("check_patient_acl", "--fix", stdout=StringIO())
+        out = StringIO()
+        call_command("check_patient_acl", stdout=out)
+        assert "consistent" in out.getvalue()
+        assert PatientACL.objects.filter(patient=patient).count() == 2
+
+
+@pytest.mark.django_db
+class TestPatientSearch:
+    """GET /api/v1/patients/?q= - searched within the caller's access scope."""
+
+    def test_search_by_name_email_and_phone(
+        self, clinic, therapist_user, therapist_profile, patient
+    ):
+        Patient.objects.create(
+            clinic=clinic, owner_therapist=therapist_profile, name="Mary Major", phone="555-0100"
+        )
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        by_name = client.get("/api/v1/patients/", {"q": "joh"})
+        assert [p["id"] for p in by_name.data["results"]] == [patient.id]
+        by_email = client.get("/api/v1/patients/", {"q": "john@example"})
+        assert [p["id"] for p in by_email.data["results"]] == [patient.id]
+        by_phone = client.get("/api/v1/patients/", {"q": "0100"})
+        assert [p["name"] for p in by_phone.data["results"]] == ["Mary Major"]
+
+    def test_search_respects_access_scope(self, clinic, patient):
+        other_user = User.objects.create_user(email="t3@test.com", password="x", role="therapist")
+        other = TherapistProfile.objects.create(user=other_user, display_name="Dr. Three", bio="")
+        Patient.objects.create(clinic=clinic, owner_therapist=other, name="John Other")
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+        resp = client.get("/api/v1/patients/", {"q": "john"})
+        assert [p["name"] for p in resp.data["results"]] == ["John Other"]
+
+    def test_prefix_matches_rank_first(self, clinic, clinic_admin, therapist_profile, patient):
+        Patient.objects.create(clinic=clinic, owner_therapist=therapist_profile, name="Al Johnson")
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.get("/api/v1/patients/", {"q": "john"})
+        assert [p["name"] for p in resp.data["results"]] == ["John Doe", "Al Johnson"]
+
+
+@pytest.mark.django_db
+class TestDataExport:
+    """POST /api/v1/exports, GET /api/v1/exports/{id}/download"""
+
+    @pytest.fixture(autouse=True)
+    def _export_root(self, settings, tmp_path):
+        settings.EXPORT_ROOT = tmp_path
+
+    def _run_pending(self, client, resp):
+        """Jobs are accepted pending and run out of band; run them and poll the job."""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        assert resp.status_code == status.HTTP_202_ACCEPTED
+        assert resp.data["status"] == "pending"
+        call_command("run_exports", stdout=StringIO())
+        return client.get(f"/api/v1/exports/{resp.data['id']}/")
+
+    def _members(self, resp):
+        import io
+        import json
+        import zipfile
+
+        body = b"".join(resp.streaming_content)
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            return {
+                name: [json.loads(line) for line in zf.read(name).splitlines()]
+                for name in zf.namelist()
+                if name.endswith(".ndjson")
+            }
+
+    def test_patient_export_streams_ndjson_zip(self, therapist_user, therapist_profile, patient):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from appointments.models import Appointment, SessionNote
+        from audit.models import AuditEvent
+        from referrals.models import Questionnaire
+
+        appt = Appointment.objects.create(
+            patient=patient,
+            therapist=therapist_profile,
+            starts_at=timezone.now(),
+            ends_at=timezone.now() + timedelta(hours=1),
+        )
+        SessionNote.objects.create(appointment=appt, author=therapist_profile, body="Private")
+        Questionnaire.objects.create(
+            referral=patient.referral, type="gad7", answers={f"q{i}": 1 for i in range(1, 8)}
+        )
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        resp = client.post(
+            "/api/v1/exports/",
+            {"patient": patient.id, "include_session_notes": True},
+            format="json",
+        )
+        resp = self._run_pending(client, resp)
+        assert resp.data["status"] == "completed"
+        assert resp.data["row_counts"]["appointments"] == 1
+        assert AuditEvent.objects.filter(action="export", entity_id=patient.id).count() == 1
+
+        download = client.get(f"/api/v1/exports/{resp.data['id']}/download/")
+        assert download.status_code == status.HTTP_200_OK
+        members = self._members(download)
+        assert [r["id"] for r in members["patients.ndjson"]] == [patient.id]
+        assert members["session_notes.ndjson"][0]["body"] == "Private"
+        assert members["questionnaires.ndjson"][0]["answers"]["q7"] == 1
+
+    def test_other_authors_session_notes_redacted(self, clinic, therapist_profile, patient):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from appointments.models import Appointment, SessionNote
+        from clinics.models import Membership
+
+        admin = User.objects.create_user(email="ca@test.com", password="x", role="clinic_admin")
+        Membership.objects.create(user=admin, clinic=clinic, role=Membership.MemberRole.ADMIN)
+        appt = Appointment.objects.create(
+            patient=patient,
+            therapist=therapist_profile,
+            starts_at=timezone.now(),
+            ends_at=timezone.now() + timedelta(hours=1),
+        )
+        SessionNote.objects.create(appointment=appt, author=therapist_profile, body="Private")
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        resp = client.post(
+            "/api/v1/exports/", {"clinic": clinic.id, "include_session_notes": True}, format="json"
+        )
+        self._run_pending(client, resp)
+        members = self._members(client.get(f"/api/v1/exports/{resp.data['id']}/download/"))
+        assert members["session_notes.ndjson"][0]["body"] == "REDACTED"
+        assert len(members["referrals.ndjson"]) == 1
+
+    def test_export_permissions(self, clinic, clinic_admin, patient):
+        seeker = User.objects.create_user(email="hs@test.com", password="x", role="help_seeker")
+        client = APIClient()
+        client.force_authenticate(user=seeker)
+        resp = client.post("/api/v1/exports/", {"patient": patient.id}, format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        # An inaccessible id is indistinguishable from a missing one
+        missing = client.post("/api/v1/exports/", {"patient": patient.id + 1000}, format="json")
+        assert missing.status_code == status.HTTP_400_BAD_REQUEST
+        assert resp.data["patient"][0].code == missing.data["patient"][0].code == "does_not_exist"
+        # Clinic export needs an admin membership of that clinic
+        client.force_authenticate(user=clinic_admin)
+        resp = client.post("/api/v1/exports/", {"clinic": clinic.id}, format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        resp = client.post("/api/v1/exports/", {}, format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_clinic_admin_limited_to_own_clinic_patients(self, clinic, patient):
+        from clinics.models import Clinic, Membership
+
+        admin = User.objects.create_user(email="ca2@test.com", password="x", role="clinic_admin")
+        other = Clinic.objects.create(name="Other", slug="other")
+        Membership.objects.create(user=admin, clinic=other, role=Membership.MemberRole.ADMIN)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        resp = client.post("/api/v1/exports/", {"patient": patient.id}, format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        Membership.objects.create(user=admin, clinic=clinic, role=Membership.MemberRole.ADMIN)
+        resp = client.post("/api/v1/exports/", {"patient": patient.id}, format="json")
+        assert resp.status_code == status.HTTP_202_ACCEPTED
+
+    def test_run_exports_fails_abandoned_jobs(self, settings, therapist_user, patient):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from .models import DataExport
+
+        settings.EXPORT_STALE_SECONDS = 60
+        job = DataExport.objects.create(
+            requested_by=therapist_user,
+            scope=DataExport.Scope.PATIENT,
+            patient=patient,
+            status=DataExport.Status.RUNNING,
+            file_name="patient-export.zip",
+            claimed_at=timezone.now() - timedelta(minutes=5),
+        )
+        live = DataExport.objects.create(
+            requested_by=therapist_user,
+            scope=DataExport.Scope.PATIENT,
+            patient=patient,
+            status=DataExport.Status.RUNNING,
+            claimed_at=timezone.now(),
+        )
+        partial = settings.EXPORT_ROOT / "patient-export.zip.part"
+        partial.write_bytes(b"PK")
+        call_command("run_exports", stdout=StringIO())
+        job.refresh_from_db()
+        live.refresh_from_db()
+        assert job.status == DataExport.Status.FAILED
+        assert job.completed_at is not None
+        assert not partial.exists()
+        assert live.status == DataExport.Status.RUNNING
+
+    def test_download_limited_to_requester(self, therapist_user, clinic_admin, patient):
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        resp = client.post("/api/v1/exports/", {"patient": patient.id}, format="json")
+        self._run_pending(client, resp)
+        client.force_authenticate(user=clinic_admin)
+        download = client.get(f"/api/v1/exports/{resp.data['id']}/download/")
+        assert download.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,190 @@
+"""
+Patient timeline (GET /api/v1/patients/{id}/timeline).
+
+Appointments, questionnaires and referral events (creation, status changes, notes) are merged into
+one newest-first stream by a single UNION ALL query. Pages are keyset-paginated on
+(occurred_at, kind, id): the cursor predicate is applied inside every branch, so each branch is an
+index range scan on its (parent, time) index no matter how long the history is. Where the backend
+allows ORDER BY/LIMIT inside compound queries (PostgreSQL), each branch is also limited to one page.
+"""
+
+from django.db import connection
+from django.db.models import (
+    CharField,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+
+from appointments.models import Appointment
+from config.pagination import decode_cursor, encode_cursor
+from referrals.models import Questionnaire, Referral, ReferralNote, ReferralStatusChange
+
+# Items of each kind embedded in patient detail (the full history is in the timeline)
+SUMMARY_LIMIT = 10
+
+TIMELINE_PAGE_SIZE = 50
+MAX_TIMELINE_PAGE_SIZE = 200
+
+KIND_APPOINTMENT = "appointment"
+KIND_QUESTIONNAIRE = "questionnaire"
+KIND_REFERRAL_CREATED = "referral_created"
+KIND_REFERRAL_NOTE = "referral_note"
+KIND_REFERRAL_STATUS = "referral_status"
+
+# Selected columns, in UNION order (names must not clash with model fields)
+COLUMNS = ("event_at", "event_kind", "event_id", "event_status", "event_detail", "event_score")
+
+
+def _before(kind: str, time_field: str, cursor) -> Q:
+    """Rows of one branch strictly after cursor in (occurred_at, kind, id) DESC order."""
+    at, cursor_kind, cursor_id = cursor
+    if kind < cursor_kind:
+        return Q(**{f"{time_field}__lte": at})
+    if kind > cursor_kind:
+        return Q(**{f"{time_field}__lt": at})
+    return Q(**{f"{time_field}__lt": at}) | Q(**{time_field: at, "id__lt": cursor_id})
+
+
+def _branch(qs, kind, time_field, cursor, limit, *, status=None, detail=None, score=None):
+    """One UNION branch projected to COLUMNS."""
+    if cursor:
+        qs = qs.filter(_before(kind, time_field, cursor))
+    qs = qs.annotate(
+        event_at=F(time_field),
+        event_kind=Value(kind, output_field=CharField()),
+        event_id=F("id"),
+        event_status=status if status is not None else Value("", output_field=CharField()),
+        event_detail=detail if detail is not None else Value("", output_field=CharField()),
+        event_score=score if score is not None else Value(None, output_field=IntegerField()),
+    ).values(*COLUMNS)
+    if connection.features.supports_slicing_ordering_in_compound:
+        return qs.order_by("-event_at", "-event_id")[:limit]
+    return qs.order_by()
+
+
+def parse_cursor(token: str):
+    """Decode a timeline cursor to (occurred_at, kind, id). Raises ValueError if malformed."""
+    values = decode_cursor(token)
+    if len(values) != 3:
+        raise ValueError("Invalid cursor")
+    at = parse_datetime(str(values[0]))
+    if at is None or not isinstance(values[1], str) or not isinstance(values[2], int):
+        raise ValueError("Invalid cursor")
+    return at, values[1], values[2]
+
+
+def patient_timeline(patient, *, cursor=None, page_size=TIMELINE_PAGE_SIZE) -> dict:
+    """
+    One page of the patient's merged timeline, newest first.
+    Returns {"results": [...], "next_cursor": token or None}.
+    """
+    limit = page_size + 1
+    branches = [
+        _branch(
+            Appointment.objects.filter(patient_id=patient.id),
+            KIND_APPOINTMENT,
+            "starts_at",
+            cursor,
+            limit,
+            status=F("status"),
+            detail=F("therapist__display_name"),
+        )
+    ]
+    if patient.referral_id:
+        rid = patient.referral_id
+        branches += [
+            _branch(
+                Referral.objects.filter(id=rid), KIND_REFERRAL_CREATED, "created_at", cursor, limit
+            ),
+            _branch(
+                ReferralStatusChange.objects.filter(referral_id=rid),
+                KIND_REFERRAL_STATUS,
+                "changed_at",
+                cursor,
+                limit,
+                status=F("to_status"),
+                detail=F("from_status"),
+            ),
+            _branch(
+                ReferralNote.objects.filter(referral_id=rid),
+                KIND_REFERRAL_NOTE,
+                "created_at",
+                cursor,
+                limit,
+            ),
+            _branch(
+                Questionnaire.objects.filter(referral_id=rid),
+                KIND_QUESTIONNAIRE,
+                "created_at",
+                cursor,
+                limit,
+                status=F("severity"),
+                detail=F("type"),
+                score=F("score"),
+            ),
+        ]
+    first, *rest = branches
+    rows = list(
+        first.union(*rest, all=True).order_by("-event_at", "-event_kind", "-event_id")[:limit]
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    results = [
+        {
+            "kind": r["event_kind"],
+            "id": r["event_id"],
+            "occurred_at": r["event_at"],
+            "status": r["event_status"],
+            "detail": r["event_detail"],
+            "score": r["event_score"],
+        }
+        for r in rows
+    ]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [last["event_at"].isoformat(), last["event_kind"], last["event_id"]]
+        )
+    return {"results": results, "next_cursor": next_cursor}
+
+
+def _count(queryset, key: str):
+    """Correlated COUNT(*) subquery over queryset grouped by key (0 when no rows)."""
+    counts = queryset.order_by().values(key).annotate(n=Count("id")).values("n")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def with_summary(queryset):
+    """
+    Patient queryset for the detail view: counts as subqueries and only the latest SUMMARY_LIMIT
+    appointments/questionnaires prefetched, so detail size and query count are bounded.
+    """
+    return queryset.annotate(
+        appointment_count=_count(Appointment.objects.filter(patient=OuterRef("pk")), "patient"),
+        questionnaire_count=_count(
+            Questionnaire.objects.filter(referral=OuterRef("referral")), "referral"
+        ),
+        note_count=_count(ReferralNote.objects.filter(referral=OuterRef("referral")), "referral"),
+    ).prefetch_related(
+        Prefetch(
+            "appointments",
+            queryset=Appointment.objects.select_related("therapist").order_by("-starts_at")[
+                :SUMMARY_LIMIT
+            ],
+            to_attr="recent_appointments",
+        ),
+        Prefetch(
+            "referral__questionnaires",
+            queryset=Questionnaire.objects.order_by("-created_at")[:SUMMARY_LIMIT],
+            to_attr="recent_questionnaires",
+        ),
+    )
@@ -1,11 +1,12 @@
-"""Patient URLs: /api/v1/patients."""
+"""Patient URLs: /api/v1/patients, /api/v1/exports."""
 
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import PatientViewSet
+from .views import DataExportViewSet, PatientViewSet
 
 router = DefaultRouter()
 router.register("patients", PatientViewSet, basename="patient")
+router.register("exports", DataExportViewSet, basename="export")
 
 urlpatterns = [path("", include(router.urls))]
@@ -1,44 +1,143 @@
-"""Patient views: GET list (role-filtered), GET detail."""
+"""Patient views: GET list (role-filtered), GET detail, GET timeline; data exports."""
 
-from rest_framework.viewsets import ReadOnlyModelViewSet
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
 
 from accounts.permissions import user_is_clinic_admin, user_is_therapist
 from audit.mixins import PatientAuditMixin
+from audit.service import ENTITY_PATIENT, log_event
 
-from .models import Patient
+from .acl import GRANT_SOURCES, patient_ids_for
+from .export import export_path, start_export
+from .models import DataExport, Patient
 from .permissions import PatientPermission
-from .serializers import PatientDetailSerializer, PatientListSerializer
+from .search import search_patients
+from .serializers import (
+    DataExportCreateSerializer,
+    DataExportSerializer,
+    PatientDetailSerializer,
+    PatientListSerializer,
+)
+from .timeline import (
+    MAX_TIMELINE_PAGE_SIZE,
+    TIMELINE_PAGE_SIZE,
+    parse_cursor,
+    patient_timeline,
+    with_summary,
+)
 
 
 class PatientViewSet(PatientAuditMixin, ReadOnlyModelViewSet):
     """
-    GET /api/v1/patients - list (role-filtered)
-    GET /api/v1/patients/{id} - detail
+    GET /api/v1/patients - list (role-filtered; ?q= name/email/phone search)
+    GET /api/v1/patients/{id} - detail (bounded summary)
+    GET /api/v1/patients/{id}/timeline - merged history, keyset-paginated
     """
 
     permission_classes = [PatientPermission]
 
     def get_queryset(self):
-        qs = (
-            Patient.objects.select_related("clinic", "owner_therapist", "referral")
-            .prefetch_related(
-                "appointments",
-                "appointments__therapist",
-                "referral__notes",
-                "referral__questionnaires",
-            )
-            .order_by("name")
+        qs = Patient.objects.select_related("clinic", "owner_therapist", "referral").order_by(
+            "name"
         )
+        if self.action == "retrieve":
+            qs = with_summary(qs)
         if user_is_clinic_admin(self.request.user) or self.request.user.is_staff:
-            return qs
-        if user_is_therapist(self.request.user):
-            return (
-                qs.filter(owner_therapist__user=self.request.user)
-                | qs.filter(access_grants__user=self.request.user)
-            ).distinct()
-        return qs.filter(access_grants__user=self.request.user).distinct()
+            pass
+        # Semi-join on the precomputed ACL: no OR across joins, no DISTINCT
+        elif user_is_therapist(self.request.user):
+            qs = qs.filter(id__in=patient_ids_for(self.request.user))
+        else:
+            qs = qs.filter(id__in=patient_ids_for(self.request.user, GRANT_SOURCES))
+
+        # Text query: prefix/fuzzy on name and email within the access scope (ranked, bounded)
+        query = self.request.query_params.get("q", "").strip()
+        if query and self.action == "list":
+            qs = search_patients(qs, query)
+        return qs
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return PatientDetailSerializer
         return PatientListSerializer
+
+    @action(detail=True, methods=["get"], url_path="timeline")
+    def timeline(self, request, pk=None):
+        """
+        GET /api/v1/patients/{id}/timeline?cursor=&page_size=
+        Appointments, questionnaires and referral events, newest first. Follow next_cursor.
+        """
+        patient = self.get_object()
+        token = request.query_params.get("cursor", "").strip()
+        try:
+            cursor = parse_cursor(token) if token else None
+        except ValueError:
+            return Response({"cursor": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page_size = int(request.query_params.get("page_size", TIMELINE_PAGE_SIZE))
+        except ValueError:
+            page_size = TIMELINE_PAGE_SIZE
+        page_size = min(max(page_size, 1), MAX_TIMELINE_PAGE_SIZE)
+        log_event(
+            action="view",
+            entity_type=ENTITY_PATIENT,
+            entity_id=patient.id,
+            request=request,
+            metadata={"timeline": True},
+        )
+        return Response(patient_timeline(patient, cursor=cursor, page_size=page_size))
+
+
+class DataExportViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+    """
+    POST /api/v1/exports - {"patient": id} or {"clinic": id}, optional include_session_notes;
+        202 with the pending job, which runs out of band (patients.export) - poll until completed;
+        an id the user may not export is a 400, the same as a missing one
+    GET /api/v1/exports - own exports (staff: all)
+    GET /api/v1/exports/{id}
+    GET /api/v1/exports/{id}/download - zip of NDJSON files
+    """
+
+    serializer_class = DataExportSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        qs = DataExport.objects.order_by("-created_at")
+        if self.request.user.is_staff:
+            return qs
+        return qs.filter(requested_by=self.request.user)
+
+    def create(self, request):
+        serializer = DataExportCreateSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        patient = serializer.validated_data.get("patient")
+        clinic = serializer.validated_data.get("clinic")
+        job = DataExport.objects.create(
+            requested_by=request.user,
+            scope=DataExport.Scope.PATIENT if patient else DataExport.Scope.CLINIC,
+            patient=patient,
+            clinic=clinic,
+            include_session_notes=serializer.validated_data["include_session_notes"],
+        )
+        start_export(job)
+        return Response(DataExportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"], url_path="download")
+    def download(self, request, pk=None):
+        job = self.get_object()
+        path = export_path(job)
+        if job.status != DataExport.Status.COMPLETED or not path.is_file():
+            return Response(
+                {"detail": "Export is not available."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return FileResponse(
+            path.open("rb"),
+            as_attachment=True,
+            filename=job.file_name,
+            content_type="application/zip",
+        )
@@ -2,7 +2,8 @@
 
 from django.contrib import admin
 
-from .models import Questionnaire, Referral, ReferralNote
+from .models import Questionnaire, Referral, ReferralNote, ReferralStatusChange
+from .search import refresh_search_vectors
 
 
 @admin.register(Referral)
@@ -18,6 +19,10 @@ class ReferralAdmin(admin.ModelAdmin):
     list_filter = ("status", "clinic")
     search_fields = ("patient_name", "patient_email")
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_search_vectors([obj.id])
+
 
 @admin.register(ReferralNote)
 class ReferralNoteAdmin(admin.ModelAdmin):
@@ -30,3 +35,18 @@ class QuestionnaireAdmin(admin.ModelAdmin):
     list_display = ("referral", "type", "score", "created_at")
     list_filter = ("type",)
     search_fields = ("referral__patient_name",)
+
+
+@admin.register(ReferralStatusChange)
+class ReferralStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ("referral", "from_status", "to_status", "changed_by", "changed_at")
+    list_filter = ("to_status", "clinic")
+    readonly_fields = (
+        "referral",
+        "clinic",
+        "from_status",
+        "to_status",
+        "from_entered_at",
+        "changed_by",
+        "changed_at",
+    )
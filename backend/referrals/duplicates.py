@@ -0,0 +1,61 @@
+"""
+Duplicate-referral detection.
+identity_hash = sha256(normalized email | normalized name), indexed with created_at, so finding an
+earlier referral for the same person within the window is a single index range lookup.
+Referrals without an email are never hashed: a name alone does not identify a person.
+New referrals that match are flagged with duplicate_of (the earliest original), not merged.
+duplicate_of links to someone else's referral, so it is only shown to clinic admins and staff.
+"""
+
+import hashlib
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.utils import timezone
+
+DUPLICATE_WINDOW_DAYS = 30
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode()
+    return " ".join(_NON_ALNUM_RE.sub(" ", text.lower()).split())
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def identity_hash(email: str, name: str) -> str:
+    """Hex sha256 of normalized identity; empty without an email (nothing reliable to match)."""
+    email, name = normalize_email(email), normalize_name(name)
+    if not email:
+        return ""
+    return hashlib.sha256(f"{email}|{name}".encode()).hexdigest()
+
+
+def find_originals(hashes, *, now=None, window_days=DUPLICATE_WINDOW_DAYS) -> dict[str, int]:
+    """
+    Map identity hash -> id of the earliest non-duplicate referral created within the window.
+    One query for any number of hashes.
+    """
+    from .models import Referral
+
+    hashes = {h for h in hashes if h}
+    if not hashes:
+        return {}
+    cutoff = (now or timezone.now()) - timedelta(days=window_days)
+    originals = {}
+    rows = (
+        Referral.objects.filter(
+            identity_hash__in=hashes, created_at__gte=cutoff, duplicate_of__isnull=True
+        )
+        .order_by("created_at")
+        .values_list("identity_hash", "id")
+    )
+    for h, pk in rows:
+        originals.setdefault(h, pk)
+    return originals
@@ -0,0 +1,41 @@
+"""
+Model fields for referrals.
+SmallIntArrayField is a native smallint[] on PostgreSQL. Other backends (SQLite in tests) store
+the same list as JSON text, so the Python value is a list of ints everywhere.
+"""
+
+import json
+
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+
+class SmallIntArrayField(ArrayField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault("base_field", models.SmallIntegerField())
+        super().__init__(**kwargs)
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return super().db_type(connection)
+        return "text"
+
+    def cast_db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return super().cast_db_type(connection)
+        return "text"
+
+    def get_placeholder(self, value, compiler, connection):
+        if connection.vendor == "postgresql":
+            return super().get_placeholder(value, compiler, connection)
+        return "%s"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if connection.vendor == "postgresql":
+            return super().get_db_prep_value(value, connection, prepared)
+        return None if value is None else json.dumps([int(v) for v in value])
+
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
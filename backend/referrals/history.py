@@ -0,0 +1,145 @@
+"""
+Referral status history and time-in-state analytics.
+ReferralStatusChange rows are written in the same transaction as the status change.
+SLA breaches are index range scans on (clinic, status, status_entered_at); time-to-stage
+percentiles read (clinic, to_status, changed_at) and aggregate in SQL on PostgreSQL.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection
+from django.db.models import DurationField, ExpressionWrapper, F
+from django.utils import timezone
+
+from .models import Referral, ReferralStatusChange
+
+# Max days a referral may stay in a status before it breaches SLA
+SLA_DAYS = {
+    "new": 2,
+    "needs_info": 7,
+    "approved": 14,
+}
+
+# Stages reported for time-from-creation percentiles
+STAGES = ("approved", "scheduled", "closed")
+PERCENTILES = (50, 90, 95)
+SLA_SAMPLE_SIZE = 20
+
+
+def record_status_changes(rows, to_status, *, changed_at, request=None, user=None):
+    """
+    Bulk-insert history rows. rows are dicts with id, clinic_id, from_status, from_entered_at
+    (as returned by triage._conditional_update).
+    """
+    if user is None and request and request.user.is_authenticated:
+        user = request.user
+    ReferralStatusChange.objects.bulk_create(
+        [
+            ReferralStatusChange(
+                referral_id=row["id"],
+                clinic_id=row["clinic_id"],
+                from_status=row["from_status"],
+                to_status=to_status,
+                from_entered_at=row["from_entered_at"],
+                changed_by=user,
+                changed_at=changed_at,
+            )
+            for row in rows
+        ]
+    )
+
+
+def sla_breaches(*, clinic_id=None, now=None, sample_size=SLA_SAMPLE_SIZE):
+    """Per status in SLA_DAYS: count of referrals over threshold and the oldest few."""
+    now = now or timezone.now()
+    result = {}
+    for status, days in SLA_DAYS.items():
+        qs = Referral.objects.filter(
+            status=status, status_entered_at__lt=now - timedelta(days=days)
+        )
+        if clinic_id:
+            qs = qs.filter(clinic_id=clinic_id)
+        oldest = qs.order_by("status_entered_at").values("id", "status_entered_at")[:sample_size]
+        result[status] = {"threshold_days": days, "breached": qs.count(), "oldest": list(oldest)}
+    return result
+
+
+def _percentiles_postgres(stage, start_column, date_from, date_to, clinic_id):
+    """Count + percentile_cont of (changed_at - start) in hours, computed in one SQL aggregate."""
+    qn = connection.ops.quote_name
+    sc = qn(ReferralStatusChange._meta.db_table)
+    ref = qn(Referral._meta.db_table)
+    start = (
+        f"{ref}.{qn('created_at')}" if start_column == "created_at" else f"{sc}.{qn(start_column)}"
+    )
+    fractions = ", ".join(str(p / 100) for p in PERCENTILES)
+    sql = (
+        f"SELECT COUNT(*), percentile_cont(ARRAY[{fractions}]) WITHIN GROUP "
+        f"(ORDER BY EXTRACT(EPOCH FROM {sc}.{qn('changed_at')} - {start}) / 3600.0) "
+        f"FROM {sc} JOIN {ref} ON {ref}.{qn('id')} = {sc}.{qn('referral_id')} "
+        f"WHERE {sc}.{qn('to_status')} = %s "
+        f"AND {sc}.{qn('changed_at')} >= %s AND {sc}.{qn('changed_at')} < %s"
+    )
+    params = [stage, date_from, date_to]
+    if clinic_id:
+        sql += f" AND {sc}.{qn('clinic_id')} = %s"
+        params.append(clinic_id)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        count, values = cursor.fetchone()
+    return count, list(values or [])
+
+
+def _percentiles_python(stage, start_column, date_from, date_to, clinic_id):
+    """Fallback for other backends: fetch durations and use NumPy."""
+    start = F("referral__created_at") if start_column == "created_at" else F(start_column)
+    qs = ReferralStatusChange.objects.filter(
+        to_status=stage, changed_at__gte=date_from, changed_at__lt=date_to
+    )
+    if clinic_id:
+        qs = qs.filter(clinic_id=clinic_id)
+    durations = qs.annotate(
+        duration=ExpressionWrapper(F("changed_at") - start, output_field=DurationField())
+    ).values_list("duration", flat=True)
+    hours = np.array([d.total_seconds() / 3600 for d in durations])
+    if not len(hours):
+        return 0, []
+    return len(hours), list(np.percentile(hours, PERCENTILES))
+
+
+def duration_percentiles(stage, *, start_column, date_from, date_to, clinic_id=None):
+    """
+    Percentiles (hours) of changed_at - start for transitions into stage within the window.
+    start_column: "created_at" (time from referral creation) or "from_entered_at" (time spent
+    in the previous status).
+    """
+    compute = _percentiles_postgres if connection.vendor == "postgresql" else _percentiles_python
+    count, values = compute(stage, start_column, date_from, date_to, clinic_id)
+    return {
+        "count": count,
+        **{
+            f"p{p}_hours": round(float(v), 2) if v is not None else None
+            for p, v in zip(PERCENTILES, values or [None] * len(PERCENTILES), strict=True)
+        },
+    }
+
+
+def pipeline_stats(*, clinic_id=None, date_from=None, date_to=None):
+    """SLA breaches now, plus time-to-stage and time-in-previous-state percentiles in a window."""
+    date_to = date_to or timezone.now()
+    date_from = date_from or date_to - timedelta(days=90)
+    window = {"date_from": date_from, "date_to": date_to, "clinic_id": clinic_id}
+    return {
+        "sla": sla_breaches(clinic_id=clinic_id),
+        "time_to_stage": {
+            stage: duration_percentiles(stage, start_column="created_at", **window)
+            for stage in STAGES
+        },
+        "time_in_previous_state": {
+            stage: duration_percentiles(stage, start_column="from_entered_at", **window)
+            for stage in STAGES
+        },
+        "date_from": date_from,
+        "date_to": date_to,
+    }
@@ -0,0 +1,125 @@
+"""
+Batched referral intake for partner systems (POST /api/v1/referrals/batch).
+Items are validated up front (clinic ids checked with one query), then valid items are inserted
+with bulk_create in chunks inside one transaction. Invalid items are reported, not inserted.
+"""
+
+from django.db import transaction
+
+from audit.service import ENTITY_REFERRAL, log_events
+from clinics.models import Clinic
+
+from .duplicates import find_originals, identity_hash
+from .models import Questionnaire, Referral
+from .search import refresh_search_vectors
+from .serializers import ReferralBatchItemSerializer
+
+MAX_BATCH_ITEMS = 1000
+BATCH_CHUNK_SIZE = 200
+
+
+def validate_batch(items):
+    """
+    Validate raw items. Returns (valid, errors): valid is [(index, validated_data)],
+    errors is {index: error_dict}.
+    """
+    valid = []
+    errors = {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[i] = {"non_field_errors": ["Expected an object."]}
+            continue
+        serializer = ReferralBatchItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((i, serializer.validated_data))
+        else:
+            errors[i] = serializer.errors
+
+    clinic_ids = {data["clinic"] for _, data in valid if data.get("clinic")}
+    known = set(Clinic.objects.filter(id__in=clinic_ids).values_list("id", flat=True))
+    checked = []
+    for i, data in valid:
+        if data.get("clinic") and data["clinic"] not in known:
+            errors[i] = {"clinic": [f'Invalid pk "{data["clinic"]}" - object does not exist.']}
+        else:
+            checked.append((i, data))
+    return checked, errors
+
+
+def create_referrals_batch(items, *, request=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Validate and insert a batch of referrals (+ optional questionnaire each).
+    Returns per-item results in input order: {"index", "status": "created"|"invalid", "id"|"errors"}.
+    """
+    valid, errors = validate_batch(items)
+    requester = request.user if request and request.user.is_authenticated else None
+    hashes = [identity_hash(d.get("patient_email", ""), d["patient_name"]) for _, d in valid]
+    # hash -> original referral id: recent ones from the DB, then first occurrence in this batch
+    originals = find_originals(hashes)
+
+    created = {}
+    flagged = {}  # referral id -> duplicate_of id
+    with transaction.atomic():
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start : start + chunk_size]
+            chunk_hashes = hashes[start : start + chunk_size]
+            referrals = [
+                Referral(
+                    clinic_id=data.get("clinic"),
+                    requester_user=requester,
+                    patient_name=data["patient_name"],
+                    patient_email=data.get("patient_email", ""),
+                    reason=data.get("reason", ""),
+                    identity_hash=h,
+                    duplicate_of_id=originals.get(h),
+                )
+                for (_, data), h in zip(chunk, chunk_hashes, strict=True)
+            ]
+            Referral.objects.bulk_create(referrals)
+            # Repeats within the same chunk only get the original's id after insert
+            late = []
+            for referral, h in zip(referrals, chunk_hashes, strict=True):
+                if h and h not in originals:
+                    originals[h] = referral.id
+                elif h and referral.duplicate_of_id is None:
+                    referral.duplicate_of_id = originals[h]
+                    late.append(referral)
+                if referral.duplicate_of_id:
+                    flagged[referral.id] = referral.duplicate_of_id
+            if late:
+                Referral.objects.bulk_update(late, ["duplicate_of"])
+            Questionnaire.objects.bulk_create(
+                [
+                    Questionnaire(referral=referral, **data["questionnaire"])
+                    for (_, data), referral in zip(chunk, referrals, strict=True)
+                    if data.get("questionnaire")
+                ]
+            )
+            for (i, _), referral in zip(chunk, referrals, strict=True):
+                created[i] = referral.id
+
+        refresh_search_vectors(created.values())
+        if created:
+            log_events(
+                [
+                    {
+                        "action": "create",
+                        "entity_type": ENTITY_REFERRAL,
+                        "entity_id": referral_id,
+                        "metadata": {"batch": True},
+                    }
+                    for referral_id in created.values()
+                ],
+                request=request,
+            )
+
+    results = []
+    for i in range(len(items)):
+        if i in created:
+            result = {"index": i, "status": "created", "id": created[i]}
+            if created[i] in flagged:
+                result["duplicate_of"] = flagged[created[i]]
+            results.append(result)
+        else:
+            results.append({"index": i, "status": "invalid", "errors": errors[i]})
+    return results
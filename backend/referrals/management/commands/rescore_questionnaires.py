@@ -0,0 +1,79 @@
+"""Recompute score, severity and risk flag for stored questionnaires (e.g. after scoring rule changes)."""
+
+from django.core.management.base import BaseCommand
+
+from referrals.models import Questionnaire, QuestionnaireType
+from referrals.scoring import responses_matrix, score_matrix
+
+
+class Command(BaseCommand):
+    help = "Rescore stored PHQ-9/GAD-7 questionnaires in vectorized batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per batch")
+        parser.add_argument(
+            "--type", choices=QuestionnaireType.values, help="Only rescore one questionnaire type"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Compute changes without writing them"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        types = [options["type"]] if options["type"] else QuestionnaireType.values
+        totals = {"scanned": 0, "updated": 0, "invalid": 0}
+        for qtype in types:
+            counts = self._rescore_type(qtype, batch_size, options["dry_run"])
+            for k, v in counts.items():
+                totals[k] += v
+            self.stdout.write(
+                f"{qtype}: scanned {counts['scanned']}, updated {counts['updated']}, "
+                f"invalid {counts['invalid']}"
+            )
+        verb = "Would update" if options["dry_run"] else "Updated"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {totals['updated']} of {totals['scanned']} questionnaires "
+                f"({totals['invalid']} with invalid answers left unchanged)."
+            )
+        )
+
+    def _rescore_type(self, qtype, batch_size, dry_run):
+        """Stream rows of one type from the DB and rescore them batch by batch."""
+        counts = {"scanned": 0, "updated": 0, "invalid": 0}
+        rows = (
+            Questionnaire.objects.filter(type=qtype)
+            .order_by("id")
+            .values_list("id", "responses", "score", "severity", "risk_flag")
+            .iterator(chunk_size=batch_size)
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self._rescore_batch(qtype, batch, counts, dry_run)
+                batch = []
+        if batch:
+            self._rescore_batch(qtype, batch, counts, dry_run)
+        return counts
+
+    def _rescore_batch(self, qtype, batch, counts, dry_run):
+        """Score one batch with NumPy and bulk-update only rows whose result changed."""
+        ids, responses, old_scores, old_severities, old_risk = zip(*batch, strict=True)
+        valid, scores, severities, risk_flags = score_matrix(
+            qtype, responses_matrix(qtype, responses)
+        )
+        counts["scanned"] += len(batch)
+        counts["invalid"] += int((~valid).sum())
+
+        changed = []
+        for i in valid.nonzero()[0]:
+            score, severity, risk = int(scores[i]), severities[i], bool(risk_flags[i])
+            if (old_scores[i], old_severities[i], old_risk[i]) == (score, severity, risk):
+                continue
+            changed.append(Questionnaire(id=ids[i], score=score, severity=severity, risk_flag=risk))
+        counts["updated"] += len(changed)
+        if changed and not dry_run:
+            Questionnaire.objects.bulk_update(
+                changed, ["score", "severity", "risk_flag"], batch_size=1000
+            )
@@ -0,0 +1,219 @@
+"""
+Referral -> therapist matching (GET /api/v1/referrals/{id}/matches).
+
+Therapist features are precomputed into an in-memory index: specialties and languages become
+bitsets over a shared vocabulary, so ranking a candidate is a few integer ops instead of a query.
+The index is cached under a version derived from (count, max(updated_at)) of TherapistProfile, so
+any profile change rebuilds it; TherapistProfile's queryset stamps updated_at on update() and
+bulk_update() (admin actions included), so bulk writes bump the version too. Caseload counters (open assigned referrals) are cached separately
+with a short TTL.
+"""
+
+import re
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from directory.models import TherapistProfile
+
+from .models import Referral, ReferralStatus
+
+INDEX_CACHE_KEY = "referrals:match_index:{version}"
+INDEX_TTL = 60 * 60
+CASELOAD_CACHE_KEY = "referrals:match_caseloads"
+CASELOAD_TTL = 60
+
+# Referral statuses that count towards a therapist's caseload
+OPEN_STATUSES = (ReferralStatus.APPROVED, ReferralStatus.SCHEDULED, ReferralStatus.ONGOING)
+
+# Questionnaire type -> specialty term implied by a non-minimal result
+SEVERITY_TERMS = {
+    "phq9": "depression",
+    "gad7": "anxiety",
+}
+
+# Weight of a questionnaire-derived term relative to a term found in the reason text (1.0)
+SEVERITY_WEIGHTS = {
+    "mild": 1.0,
+    "moderate": 1.5,
+    "moderately_severe": 2.0,
+    "severe": 2.0,
+}
+
+# Score component weights (sum of positive weights = 1.0)
+WEIGHT_SPECIALTY = 0.55
+WEIGHT_LANGUAGE = 0.15
+WEIGHT_LOCATION = 0.15
+WEIGHT_PRICE = 0.15
+WEIGHT_CASELOAD = 0.2  # penalty, scaled by caseload relative to the busiest candidate
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(term: str) -> str:
+    return " ".join(str(term).lower().split())
+
+
+def _words(text: str) -> set[str]:
+    """Lower-cased words of text, plus naive singulars ("phobias" -> "phobia")."""
+    words = set(_WORD_RE.findall(text.lower()))
+    return words | {w[:-1] for w in words if len(w) > 3 and w.endswith("s")}
+
+
+class TherapistMatchIndex:
+    """Bitset features for all therapist profiles. Build with TherapistMatchIndex.load()."""
+
+    def __init__(self, profiles):
+        self.specialty_bits = {}  # normalized term -> bit position
+        self.language_bits = {}
+        self.entries = []
+        for p in profiles:
+            self.entries.append(
+                {
+                    "id": p["id"],
+                    "display_name": p["display_name"],
+                    "clinic_id": p["clinic_id"],
+                    "city": _normalize(p["city"]),
+                    "remote_available": p["remote_available"],
+                    "is_accepting": p["is_accepting"],
+                    "price_min": float(p["price_min"]) if p["price_min"] is not None else None,
+                    "specialties": self._mask(self.specialty_bits, p["specialties"]),
+                    "languages": self._mask(self.language_bits, p["languages"]),
+                }
+            )
+        self.specialty_terms = {bit: term for term, bit in self.specialty_bits.items()}
+        self.specialty_words = {term: set(term.split()) for term in self.specialty_bits}
+
+    @staticmethod
+    def _mask(vocab, terms, add=True):
+        mask = 0
+        for term in terms if isinstance(terms, list) else []:
+            key = _normalize(term)
+            if key not in vocab:
+                if not add:
+                    continue
+                vocab[key] = len(vocab)
+            mask |= 1 << vocab[key]
+        return mask
+
+    @classmethod
+    def load(cls):
+        """Return the cached index for the current TherapistProfile version (1 query if warm)."""
+        stats = TherapistProfile.objects.aggregate(n=Count("id"), last=Max("updated_at"))
+        last = stats["last"].isoformat() if stats["last"] else ""
+        key = INDEX_CACHE_KEY.format(version=f"{stats['n']}:{last}")
+        index = cache.get(key)
+        if index is None:
+            profiles = TherapistProfile.objects.values(
+                "id",
+                "display_name",
+                "clinic_id",
+                "city",
+                "remote_available",
+                "is_accepting",
+                "price_min",
+                "specialties",
+                "languages",
+            )
+            index = cls(list(profiles))
+            cache.set(key, index, INDEX_TTL)
+        return index
+
+    def referral_terms(self, referral) -> dict[int, float]:
+        """Specialty bits wanted by a referral (reason text + questionnaire severity) -> weight."""
+        wanted = {}
+        words = _words(referral.reason or "")
+        for term, term_words in self.specialty_words.items():
+            if term_words <= words:
+                wanted[self.specialty_bits[term]] = 1.0
+        for q in referral.questionnaires.all():
+            term = SEVERITY_TERMS.get(q.type)
+            weight = SEVERITY_WEIGHTS.get(q.severity)
+            if term in self.specialty_bits and weight:
+                bit = self.specialty_bits[term]
+                wanted[bit] = max(wanted.get(bit, 0.0), weight)
+        return wanted
+
+    def language_mask(self, languages) -> int:
+        return self._mask(self.language_bits, list(languages), add=False)
+
+
+def get_caseloads() -> dict[int, int]:
+    """Open assigned referrals per therapist profile id. Cached for CASELOAD_TTL seconds."""
+    caseloads = cache.get(CASELOAD_CACHE_KEY)
+    if caseloads is None:
+        caseloads = dict(
+            Referral.objects.filter(status__in=OPEN_STATUSES, assigned_therapist__isnull=False)
+            .values("assigned_therapist")
+            .annotate(n=Count("id"))
+            .values_list("assigned_therapist", "n")
+        )
+        cache.set(CASELOAD_CACHE_KEY, caseloads, CASELOAD_TTL)
+    return caseloads
+
+
+def rank_therapists(
+    referral,
+    *,
+    languages=(),
+    city: str = "",
+    remote: bool = False,
+    price_max: float | None = None,
+    limit: int = 10,
+):
+    """
+    Rank accepting therapists for a referral. Candidates are the referral's clinic therapists
+    (all therapists for self-referrals without a clinic). Returns top `limit` as dicts.
+    """
+    index = TherapistMatchIndex.load()
+    caseloads = get_caseloads()
+    wanted = index.referral_terms(referral)
+    wanted_mask = sum(1 << bit for bit in wanted)
+    wanted_total = sum(wanted.values())
+    language_mask = index.language_mask(languages)
+    city = _normalize(city)
+
+    candidates = [
+        e
+        for e in index.entries
+        if e["is_accepting"] and (not referral.clinic_id or e["clinic_id"] == referral.clinic_id)
+    ]
+    busiest = max((caseloads.get(e["id"], 0) for e in candidates), default=0) or 1
+
+    ranked = []
+    for e in candidates:
+        overlap = e["specialties"] & wanted_mask
+        specialty = (
+            sum(w for bit, w in wanted.items() if overlap >> bit & 1) / wanted_total
+            if wanted_total
+            else 0.0
+        )
+        language = 1.0 if not language_mask or e["languages"] & language_mask else 0.0
+        if city and e["city"] == city:
+            location = 1.0
+        elif (remote or not city) and e["remote_available"]:
+            location = 1.0 if remote else 0.5
+        else:
+            location = 0.0
+        price = 1.0 if price_max is None or (e["price_min"] or 0) <= price_max else 0.0
+        caseload = caseloads.get(e["id"], 0)
+        score = (
+            WEIGHT_SPECIALTY * specialty
+            + WEIGHT_LANGUAGE * language
+            + WEIGHT_LOCATION * location
+            + WEIGHT_PRICE * price
+            - WEIGHT_CASELOAD * caseload / busiest
+        )
+        ranked.append(
+            {
+                "therapist": e["id"],
+                "display_name": e["display_name"],
+                "score": round(score, 4),
+                "matched_specialties": [
+                    index.specialty_terms[bit] for bit in wanted if overlap >> bit & 1
+                ],
+                "caseload": caseload,
+            }
+        )
+    ranked.sort(key=lambda r: (-r["score"], r["caseload"], r["display_name"]))
+    return ranked[:limit]
@@ -0,0 +1,33 @@
+# Server-side questionnaire scoring: severity band + PHQ-9 item 9 risk flag
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("referrals", "0003_add_reason"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="questionnaire",
+            name="severity",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("minimal", "Minimal"),
+                    ("mild", "Mild"),
+                    ("moderate", "Moderate"),
+                    ("moderately_severe", "Moderately Severe"),
+                    ("severe", "Severe"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="questionnaire",
+            name="risk_flag",
+            field=models.BooleanField(default=False),
+        ),
+    ]
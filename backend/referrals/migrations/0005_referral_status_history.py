@@ -0,0 +1,70 @@
+# Status history: Referral.status_entered_at + append-only ReferralStatusChange
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.deletion
+import django.utils.timezone
+
+STATUS_CHOICES = [
+    ("new", "New"),
+    ("needs_info", "Needs Info"),
+    ("approved", "Approved"),
+    ("scheduled", "Scheduled"),
+    ("ongoing", "Ongoing"),
+    ("closed", "Closed"),
+    ("rejected", "Rejected"),
+]
+
+
+def backfill_status_entered_at(apps, schema_editor):
+    """Best available approximation for existing rows: last update time."""
+    Referral = apps.get_model("referrals", "Referral")
+    Referral.objects.update(status_entered_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clinics", "0001_initial"),
+        ("referrals", "0004_questionnaire_severity_risk_flag"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="referral",
+            name="status_entered_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_status_entered_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="referral",
+            index=models.Index(
+                fields=["clinic", "status", "status_entered_at"],
+                name="referrals_re_clinic_status_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ReferralStatusChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("from_status", models.CharField(choices=STATUS_CHOICES, max_length=20)),
+                ("to_status", models.CharField(choices=STATUS_CHOICES, max_length=20)),
+                ("from_entered_at", models.DateTimeField()),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("changed_by", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ("clinic", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="clinics.clinic")),
+                ("referral", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="status_changes", to="referrals.referral")),
+            ],
+            options={"ordering": ["changed_at"]},
+        ),
+        migrations.AddIndex(
+            model_name="referralstatuschange",
+            index=models.Index(fields=["referral", "changed_at"], name="referrals_sc_referral_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="referralstatuschange",
+            index=models.Index(fields=["clinic", "to_status", "changed_at"], name="referrals_sc_clinic_to_idx"),
+        ),
+    ]
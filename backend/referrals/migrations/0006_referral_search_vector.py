@@ -0,0 +1,59 @@
+# Stored tsvector for ?q= referral search (patient_name, reason, note bodies) + GIN index
+# Index and backfill are PostgreSQL only; no-op on SQLite (e.g. tests)
+# The backfill commits one id range at a time (the migration is not atomic), so it never holds
+# row locks on the whole table in a single long transaction.
+
+import django.contrib.postgres.search
+from django.db import connection, migrations, transaction
+
+BACKFILL_BATCH = 10000
+
+VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(r.patient_name, '')), 'A') "
+    "|| setweight(to_tsvector('english', coalesce(r.reason, '')), 'B') "
+    "|| setweight(to_tsvector('english', coalesce("
+    "(SELECT string_agg(n.body, ' ') FROM referrals_referralnote n WHERE n.referral_id = r.id), "
+    "'')), 'C')"
+)
+
+
+def add_gin_index_and_backfill(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT coalesce(max(id), 0) FROM referrals_referral")
+        (max_id,) = cursor.fetchone()
+    for start in range(0, max_id + 1, BACKFILL_BATCH):
+        with transaction.atomic():
+            schema_editor.execute(
+                f"UPDATE referrals_referral AS r SET search_vector = {VECTOR_SQL} "
+                "WHERE r.id >= %s AND r.id < %s",
+                [start, start + BACKFILL_BATCH],
+            )
+    schema_editor.execute(
+        "CREATE INDEX referrals_re_search_gin ON referrals_referral USING GIN (search_vector);"
+    )
+
+
+def remove_gin_index(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS referrals_re_search_gin;")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("referrals", "0005_referral_status_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="referral",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(add_gin_index_and_backfill, remove_gin_index),
+    ]
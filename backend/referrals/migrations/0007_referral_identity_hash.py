@@ -0,0 +1,62 @@
+# Duplicate detection: identity_hash (+ created_at index) and duplicate_of flag
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_BATCH = 5000
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9 ]+")
+
+
+def _identity_hash(email, name):
+    """Frozen copy of referrals.duplicates.identity_hash."""
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode()
+    name = " ".join(_NON_ALNUM_RE.sub(" ", text.lower()).split())
+    email = (email or "").strip().lower()
+    if not email and not name:
+        return ""
+    return hashlib.sha256(f"{email}|{name}".encode()).hexdigest()
+
+
+def backfill_identity_hash(apps, schema_editor):
+    Referral = apps.get_model("referrals", "Referral")
+    batch = []
+    for ref in Referral.objects.only("id", "patient_email", "patient_name").iterator(
+        chunk_size=BACKFILL_BATCH
+    ):
+        ref.identity_hash = _identity_hash(ref.patient_email, ref.patient_name)
+        batch.append(ref)
+        if len(batch) >= BACKFILL_BATCH:
+            Referral.objects.bulk_update(batch, ["identity_hash"])
+            batch = []
+    if batch:
+        Referral.objects.bulk_update(batch, ["identity_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("referrals", "0006_referral_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="referral",
+            name="identity_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="referral",
+            name="duplicate_of",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="duplicates", to="referrals.referral"),
+        ),
+        migrations.RunPython(backfill_identity_hash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="referral",
+            index=models.Index(fields=["identity_hash", "created_at"], name="referrals_re_identity_idx"),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Compact questionnaire storage: answers dict -> responses smallint[] (q1..qN order).
+# Payloads that are not a complete integer item set are kept verbatim in raw_answers.
+
+from django.db import migrations, models
+import referrals.fields
+
+BACKFILL_BATCH = 5000
+
+ITEM_COUNTS = {"phq9": 9, "gad7": 7}
+
+
+def _responses(qtype, answers):
+    """Frozen copy of referrals.scoring.responses_from_answers."""
+    if qtype not in ITEM_COUNTS or not isinstance(answers, dict):
+        return None
+    keys = [f"q{i}" for i in range(1, ITEM_COUNTS[qtype] + 1)]
+    if set(answers) != set(keys):
+        return None
+    values = [answers[k] for k in keys]
+    for v in values:
+        if isinstance(v, bool) or not isinstance(v, int) or not -32768 <= v <= 32767:
+            return None
+    return values
+
+
+def _batched_update(Questionnaire, rows, fields):
+    batch = []
+    for q in rows:
+        batch.append(q)
+        if len(batch) >= BACKFILL_BATCH:
+            Questionnaire.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Questionnaire.objects.bulk_update(batch, fields)
+
+
+def answers_to_responses(apps, schema_editor):
+    Questionnaire = apps.get_model("referrals", "Questionnaire")
+
+    def converted():
+        for q in Questionnaire.objects.only("id", "type", "answers").iterator(
+            chunk_size=BACKFILL_BATCH
+        ):
+            q.responses = _responses(q.type, q.answers)
+            if q.responses is not None:
+                q.answers = None
+                yield q
+
+    _batched_update(Questionnaire, converted(), ["responses", "answers"])
+
+
+def responses_to_answers(apps, schema_editor):
+    Questionnaire = apps.get_model("referrals", "Questionnaire")
+
+    def restored():
+        for q in Questionnaire.objects.filter(responses__isnull=False).only(
+            "id", "responses"
+        ).iterator(chunk_size=BACKFILL_BATCH):
+            q.answers = {f"q{i}": v for i, v in enumerate(q.responses, start=1)}
+            yield q
+
+    _batched_update(Questionnaire, restored(), ["answers"])
+    Questionnaire.objects.filter(answers__isnull=True).update(answers={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("referrals", "0007_referral_identity_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="questionnaire",
+            name="responses",
+            field=referrals.fields.SmallIntArrayField(base_field=models.SmallIntegerField(), blank=True, null=True, size=None),
+        ),
+        migrations.AlterField(
+            model_name="questionnaire",
+            name="answers",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(answers_to_responses, responses_to_answers),
+        migrations.RenameField(
+            model_name="questionnaire",
+            old_name="answers",
+            new_name="raw_answers",
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Patient timeline: (referral, created_at) indexes for questionnaires and notes
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("referrals", "0008_questionnaire_responses"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="questionnaire",
+            index=models.Index(fields=["referral", "created_at"], name="referrals_qu_ref_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="referralnote",
+            index=models.Index(fields=["referral", "created_at"], name="referrals_rn_ref_created_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Duplicate detection: referrals without an email are no longer hashed or flagged.
+# A name-only hash can only match another email-less referral, so clearing both fields
+# on those rows removes exactly the flags that were set from a name alone.
+
+from django.db import migrations
+
+
+def clear_name_only_hashes(apps, schema_editor):
+    Referral = apps.get_model("referrals", "Referral")
+    Referral.objects.filter(patient_email="").exclude(identity_hash="").update(
+        identity_hash="", duplicate_of=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("referrals", "0009_timeline_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_name_only_hashes, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,17 @@
 """Referral and intake models."""
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 
 from accounts.models import User
 from clinics.models import Clinic
 from directory.models import TherapistProfile
 
+from .duplicates import identity_hash
+from .fields import SmallIntArrayField
+from .scoring import answers_from_responses, responses_from_answers
+
 
 class ReferralStatus(models.TextChoices):
     """Referral pipeline status."""
@@ -39,6 +45,14 @@ class Referral(models.Model):
         blank=True,
         related_name="assigned_referrals",
     )
+    status_entered_at = models.DateTimeField(default=timezone.now)  # when current status began
+    # patient_name + reason + note bodies; GIN-indexed on Postgres (see referrals.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized email+name hash for duplicate detection (see referrals.duplicates)
+    identity_hash = models.CharField(max_length=64, blank=True, editable=False)
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="duplicates"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -48,6 +62,40 @@ class Referral(models.Model):
             models.Index(fields=["clinic"]),
             models.Index(fields=["status"]),
             models.Index(fields=["assigned_therapist"]),
+            # SLA queries: "referrals in <status> since before <t>" per clinic
+            models.Index(
+                fields=["clinic", "status", "status_entered_at"],
+                name="referrals_re_clinic_status_idx",
+            ),
+            models.Index(fields=["identity_hash", "created_at"], name="referrals_re_identity_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.identity_hash = identity_hash(self.patient_email, self.patient_name)
+        super().save(*args, **kwargs)
+
+
+class ReferralStatusChange(models.Model):
+    """
+    Append-only status transition log. Written in the same transaction as the status change.
+    from_entered_at is when the previous status began, so time-in-state needs no self-join.
+    """
+
+    referral = models.ForeignKey(Referral, on_delete=models.CASCADE, related_name="status_changes")
+    clinic = models.ForeignKey(Clinic, on_delete=models.SET_NULL, null=True, blank=True)
+    from_status = models.CharField(max_length=20, choices=ReferralStatus.choices)
+    to_status = models.CharField(max_length=20, choices=ReferralStatus.choices)
+    from_entered_at = models.DateTimeField()
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["changed_at"]
+        indexes = [
+            models.Index(fields=["referral", "changed_at"], name="referrals_sc_referral_idx"),
+            models.Index(
+                fields=["clinic", "to_status", "changed_at"], name="referrals_sc_clinic_to_idx"
+            ),
         ]
 
 
@@ -61,6 +109,9 @@ class ReferralNote(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["referral", "created_at"], name="referrals_rn_ref_created_idx"),
+        ]
 
 
 class QuestionnaireType(models.TextChoices):
@@ -70,17 +121,45 @@ class QuestionnaireType(models.TextChoices):
     GAD7 = "gad7", "GAD-7"
 
 
+class QuestionnaireSeverity(models.TextChoices):
+    """Severity band computed from questionnaire score (see referrals.scoring)."""
+
+    MINIMAL = "minimal", "Minimal"
+    MILD = "mild", "Mild"
+    MODERATE = "moderate", "Moderate"
+    MODERATELY_SEVERE = "moderately_severe", "Moderately Severe"
+    SEVERE = "severe", "Severe"
+
+
 class Questionnaire(models.Model):
     """Screening questionnaire (PHQ-9, GAD-7) attached to referral."""
 
     referral = models.ForeignKey(Referral, on_delete=models.CASCADE, related_name="questionnaires")
     type = models.CharField(max_length=20, choices=QuestionnaireType.choices)
-    answers = models.JSONField(default=dict)  # e.g. {"q1": 1, "q2": 2, ...}
-    score = models.IntegerField(null=True, blank=True)
+    # Item values in q1..qN order (smallint[]); the API exposes them as the answers dict
+    responses = SmallIntArrayField(null=True, blank=True)
+    # Legacy payloads that are not a complete item set, kept verbatim
+    raw_answers = models.JSONField(null=True, blank=True)
+    score = models.IntegerField(null=True, blank=True)  # computed server-side
+    severity = models.CharField(max_length=20, choices=QuestionnaireSeverity.choices, blank=True)
+    risk_flag = models.BooleanField(default=False)  # PHQ-9 item 9 > 0
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["created_at"]
         indexes = [
             models.Index(fields=["referral"]),
+            models.Index(fields=["referral", "created_at"], name="referrals_qu_ref_created_idx"),
         ]
+
+    @property
+    def answers(self) -> dict:
+        """Dict form, e.g. {"q1": 1, "q2": 2, ...}."""
+        if self.responses is not None:
+            return answers_from_responses(self.responses)
+        return self.raw_answers or {}
+
+    @answers.setter
+    def answers(self, value):
+        self.responses = responses_from_answers(self.type, value)
+        self.raw_answers = None if self.responses is not None else value
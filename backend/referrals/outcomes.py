@@ -0,0 +1,219 @@
+"""
+Questionnaire outcome analytics (GET /api/v1/referrals/outcomes).
+
+Score trajectories are read in one query: window functions number each patient's questionnaires
+and attach baseline/latest score and count to every row. Deltas and response/remission rates per
+clinic and therapist are then computed with NumPy over the whole result, and cached per clinic per
+day. Item responses are stored as smallint[] (Questionnaire.responses), so item-level aggregates
+are array subscripts in SQL on PostgreSQL rather than per-row JSON parsing.
+"""
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, F, Window
+from django.db.models.functions import FirstValue, RowNumber
+from django.utils import timezone
+
+from clinics.models import Clinic
+from directory.models import TherapistProfile
+
+from .models import Questionnaire
+from .scoring import QUESTIONNAIRE_ITEMS, item_keys, responses_matrix
+
+OUTCOMES_CACHE_KEY = "referrals:outcomes:{clinic}:{qtype}:{day}"
+OUTCOMES_TTL = 60 * 60 * 24
+
+# Baseline score at or above which a patient is a clinical case (eligible for response/remission)
+CASENESS = {
+    "phq9": 10,
+    "gad7": 8,
+}
+# Latest score below which a case counts as remitted
+REMISSION_BELOW = {
+    "phq9": 5,
+    "gad7": 5,
+}
+# Response: latest score at most this fraction of baseline (>= 50% reduction)
+RESPONSE_RATIO = 0.5
+# Assessments beyond this number are not reported in the mean trajectory
+MAX_TRAJECTORY_POINTS = 12
+
+EMPTY_STATS = {
+    "patients": 0,
+    "followed_up": 0,
+    "mean_delta": None,
+    "eligible": 0,
+    "response_rate": None,
+    "remission_rate": None,
+}
+
+
+def item_means(qtype: str, queryset=None) -> dict:
+    """
+    Mean response per item for questionnaires of qtype (optionally within a queryset).
+    Returns {"count": n, "items": {"q1": mean, ...}}; means are None when there is no data.
+    """
+    qs = (queryset if queryset is not None else Questionnaire.objects.all()).filter(
+        type=qtype, responses__isnull=False
+    )
+    keys = item_keys(qtype)
+    if connection.vendor == "postgresql":
+        stats = qs.aggregate(
+            n=Count("id"), **{k: Avg(f"responses__{i}") for i, k in enumerate(keys)}
+        )
+        count = stats.pop("n")
+        means = [stats[k] for k in keys]
+    else:
+        # Fallback for other backends: load responses and average with NumPy
+        matrix = responses_matrix(qtype, list(qs.values_list("responses", flat=True)))
+        matrix = matrix[~np.isnan(matrix).any(axis=1)]
+        count = len(matrix)
+        means = matrix.mean(axis=0) if count else [None] * QUESTIONNAIRE_ITEMS[qtype]
+    return {
+        "count": count,
+        "items": {
+            k: round(float(m), 3) if m is not None else None
+            for k, m in zip(keys, means, strict=True)
+        },
+    }
+
+
+def _trajectory_rows(qtype: str, clinic_id=None) -> np.ndarray:
+    """
+    One row per scored questionnaire of patients (referrals that became patients):
+    (patient, clinic, therapist, seq, n, score, baseline, latest) as an int matrix.
+    """
+    partition = [F("referral__patient")]
+    oldest_first = [F("created_at").asc(), F("id").asc()]
+    newest_first = [F("created_at").desc(), F("id").desc()]
+    # Single filter() call so the reverse patient relation is joined once
+    filters = {"type": qtype, "score__isnull": False, "referral__patient__isnull": False}
+    if clinic_id:
+        filters["referral__patient__clinic_id"] = clinic_id
+    rows = (
+        Questionnaire.objects.filter(**filters)
+        .annotate(
+            seq=Window(RowNumber(), partition_by=partition, order_by=oldest_first),
+            n=Window(Count("id"), partition_by=partition),
+            baseline=Window(FirstValue("score"), partition_by=partition, order_by=oldest_first),
+            latest=Window(FirstValue("score"), partition_by=partition, order_by=newest_first),
+        )
+        .order_by()
+        .values_list(
+            "referral__patient",
+            "referral__patient__clinic",
+            "referral__patient__owner_therapist",
+            "seq",
+            "n",
+            "score",
+            "baseline",
+            "latest",
+        )
+    )
+    return np.array(list(rows), dtype=np.int64).reshape(-1, 8)
+
+
+def _group_stats(keys, followed, delta, eligible, response, remission) -> list[dict]:
+    """Per distinct key: patients, followed up, mean delta, response and remission rates."""
+    if not len(keys):
+        return []
+    ids, inverse = np.unique(keys, return_inverse=True)
+
+    def total(weights):
+        return np.bincount(inverse, weights=weights, minlength=len(ids))
+
+    patients = total(None)
+    followed_n = total(followed)
+    delta_sum = total(np.where(followed, delta, 0))
+    eligible_n = total(eligible)
+    response_n = total(response)
+    remission_n = total(remission)
+
+    def rate(part, whole):
+        return round(float(part / whole), 3) if whole else None
+
+    return [
+        {
+            "id": int(ids[i]),
+            "patients": int(patients[i]),
+            "followed_up": int(followed_n[i]),
+            "mean_delta": rate(delta_sum[i], followed_n[i]),
+            "eligible": int(eligible_n[i]),
+            "response_rate": rate(response_n[i], eligible_n[i]),
+            "remission_rate": rate(remission_n[i], eligible_n[i]),
+        }
+        for i in range(len(ids))
+    ]
+
+
+def outcome_stats(qtype: str, *, clinic_id=None) -> dict:
+    """
+    Outcomes for one questionnaire type, optionally for one clinic.
+    Delta is latest - baseline for patients with at least two questionnaires (negative means
+    improvement). Response and remission rates are over followed-up cases (baseline >= CASENESS).
+    """
+    rows = _trajectory_rows(qtype, clinic_id)
+    _, clinic, therapist, seq, n, score, baseline, latest = rows.T
+
+    # Mean score by assessment number (1 = baseline)
+    in_range = seq <= MAX_TRAJECTORY_POINTS
+    counts = np.bincount(seq[in_range], minlength=1)[1:]
+    sums = np.bincount(seq[in_range], weights=score[in_range], minlength=1)[1:]
+    trajectory = [
+        {"assessment": i + 1, "patients": int(c), "mean_score": round(float(sums[i] / c), 2)}
+        for i, c in enumerate(counts)
+        if c
+    ]
+
+    # One row per patient
+    first = seq == 1
+    clinic, therapist, n, baseline, latest = (
+        clinic[first],
+        therapist[first],
+        n[first],
+        baseline[first],
+        latest[first],
+    )
+    followed = n >= 2
+    delta = latest - baseline
+    eligible = followed & (baseline >= CASENESS[qtype])
+    response = eligible & (latest <= baseline * RESPONSE_RATIO)
+    remission = eligible & (latest < REMISSION_BELOW[qtype])
+    measures = (followed, delta, eligible, response, remission)
+
+    overall = _group_stats(np.zeros(len(clinic), dtype=np.int64), *measures)
+    by_clinic = _group_stats(clinic, *measures)
+    by_therapist = _group_stats(therapist, *measures)
+    clinic_names = dict(
+        Clinic.objects.filter(id__in=[c["id"] for c in by_clinic]).values_list("id", "name")
+    )
+    therapist_names = dict(
+        TherapistProfile.objects.filter(id__in=[t["id"] for t in by_therapist]).values_list(
+            "id", "display_name"
+        )
+    )
+    for c in by_clinic:
+        c["name"] = clinic_names.get(c["id"], "")
+    for t in by_therapist:
+        t["name"] = therapist_names.get(t["id"], "")
+
+    return {
+        "type": qtype,
+        "clinic": clinic_id,
+        "overall": {k: v for k, v in overall[0].items() if k != "id"} if overall else EMPTY_STATS,
+        "trajectory": trajectory,
+        "by_clinic": by_clinic,
+        "by_therapist": by_therapist,
+    }
+
+
+def cached_outcome_stats(qtype: str, *, clinic_id=None) -> dict:
+    """outcome_stats cached per clinic (or all clinics) per day."""
+    day = timezone.localdate().isoformat()
+    key = OUTCOMES_CACHE_KEY.format(clinic=clinic_id or "all", qtype=qtype, day=day)
+    result = cache.get(key)
+    if result is None:
+        result = {**outcome_stats(qtype, clinic_id=clinic_id), "day": day}
+        cache.set(key, result, OUTCOMES_TTL)
+    return result
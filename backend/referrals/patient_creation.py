@@ -28,3 +28,40 @@ def maybe_create_patient_for_referral(referral: Referral) -> None:
             "consent_flags": {},
         },
     )
+
+
+def create_patients_for_referrals(rows) -> int:
+    """
+    Batched variant for bulk triage: rows are dicts with id, clinic_id, assigned_therapist_id,
+    patient_name, patient_email of referrals just moved to APPROVED.
+    Skips rows without clinic/therapist and referrals that already have a patient (one query).
+    Returns number of patients created.
+    """
+    from patients.acl import rebuild_entries
+    from patients.models import Patient
+
+    eligible = [r for r in rows if r["clinic_id"] and r["assigned_therapist_id"]]
+    if not eligible:
+        return 0
+    existing = set(
+        Patient.objects.filter(referral_id__in=[r["id"] for r in eligible]).values_list(
+            "referral_id", flat=True
+        )
+    )
+    patients = [
+        Patient(
+            referral_id=r["id"],
+            clinic_id=r["clinic_id"],
+            owner_therapist_id=r["assigned_therapist_id"],
+            name=r["patient_name"],
+            email=r["patient_email"] or "",
+            phone="",
+            consent_flags={},
+        )
+        for r in eligible
+        if r["id"] not in existing
+    ]
+    Patient.objects.bulk_create(patients)
+    # bulk_create bypasses Patient.save, so maintain the ACL explicitly
+    rebuild_entries([p.pk for p in patients])
+    return len(patients)
@@ -25,6 +25,11 @@ def user_can_update_referral(user):
     return user.is_authenticated and (user_is_clinic_admin(user) or user.is_staff)
 
 
+def user_can_batch_create_referrals(user):
+    """Partner/clinic systems: clinic admin or staff can submit referral batches."""
+    return user.is_authenticated and (user_is_clinic_admin(user) or user.is_staff)
+
+
 def user_can_add_note(user):
     """Clinic admin, therapist (if assigned), or help-seeker (own)."""
     return user.is_authenticated
@@ -41,6 +46,8 @@ class ReferralPermission(permissions.BasePermission):
     - GET list: help-seeker, therapist, clinic admin (filtered by role)
     - GET detail: same as list (object-level)
     - PATCH: clinic admin only
+    - POST batch: clinic admin or staff (partner intake)
+    - POST triage, GET sla, GET outcomes, GET matches: clinic admin only
     """
 
     def has_permission(self, request, view):
@@ -50,6 +57,10 @@ class ReferralPermission(permissions.BasePermission):
             return request.user.is_authenticated and user_can_list_referrals(request.user)
         if view.action in ("update", "partial_update"):
             return user_can_update_referral(request.user)
+        if view.action == "batch":
+            return user_can_batch_create_referrals(request.user)
+        if view.action in ("triage", "sla", "outcomes", "matches"):
+            return user_can_update_referral(request.user)
         if view.action in ("notes", "questionnaires"):
             return user_can_add_note(request.user)
         return False
@@ -65,6 +76,6 @@ class ReferralPermission(permissions.BasePermission):
             if user_is_help_seeker(request.user):
                 return obj.requester_user_id == request.user.id
             return False
-        if view.action in ("update", "partial_update"):
+        if view.action in ("update", "partial_update", "matches"):
             return user_can_update_referral(request.user)
         return False
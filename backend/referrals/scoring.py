@@ -0,0 +1,156 @@
+"""
+Server-side scoring for PHQ-9 / GAD-7 questionnaires.
+Answers are {"q1": 0..3, ..., "qN": 0..3} in the API and stored as responses, a fixed-length
+list of item values in order. Score = sum of items; severity from standard bands.
+PHQ-9 item 9 (self-harm) > 0 raises the risk flag regardless of total.
+"""
+
+import numpy as np
+
+ITEM_MIN = 0
+ITEM_MAX = 3
+
+# Storage range of one response (smallint)
+RESPONSE_MIN = -32768
+RESPONSE_MAX = 32767
+
+# Number of items per questionnaire type
+QUESTIONNAIRE_ITEMS = {
+    "phq9": 9,
+    "gad7": 7,
+}
+
+# Severity bands: (lower bound inclusive, label), ascending
+SEVERITY_BANDS = {
+    "phq9": [
+        (0, "minimal"),
+        (5, "mild"),
+        (10, "moderate"),
+        (15, "moderately_severe"),
+        (20, "severe"),
+    ],
+    "gad7": [
+        (0, "minimal"),
+        (5, "mild"),
+        (10, "moderate"),
+        (15, "severe"),
+    ],
+}
+
+# Item that raises the risk flag when answered > 0 (1-based)
+RISK_ITEM = {
+    "phq9": 9,
+}
+
+
+def item_keys(qtype: str) -> list[str]:
+    """Return answer keys for a questionnaire type, e.g. ["q1", ..., "q9"]."""
+    return [f"q{i}" for i in range(1, QUESTIONNAIRE_ITEMS[qtype] + 1)]
+
+
+def validate_answers(qtype: str, answers) -> list[int]:
+    """
+    Validate answers for qtype and return item values in order.
+    Raises ValueError on unknown type, missing/extra items or out-of-range values.
+    """
+    if qtype not in QUESTIONNAIRE_ITEMS:
+        raise ValueError(f"Unknown questionnaire type: {qtype}")
+    if not isinstance(answers, dict):
+        raise ValueError("answers must be an object")
+    keys = item_keys(qtype)
+    missing = [k for k in keys if k not in answers]
+    if missing:
+        raise ValueError(f"Missing answers: {', '.join(missing)}")
+    extra = sorted(set(answers) - set(keys))
+    if extra:
+        raise ValueError(f"Unknown answer keys: {', '.join(extra)}")
+    values = []
+    for k in keys:
+        v = answers[k]
+        if isinstance(v, bool) or not isinstance(v, int) or not ITEM_MIN <= v <= ITEM_MAX:
+            raise ValueError(f"{k} must be an integer between {ITEM_MIN} and {ITEM_MAX}")
+        values.append(v)
+    return values
+
+
+def severity_for(qtype: str, score: int) -> str:
+    """Return severity band label for a total score."""
+    label = SEVERITY_BANDS[qtype][0][1]
+    for lower, band in SEVERITY_BANDS[qtype]:
+        if score >= lower:
+            label = band
+    return label
+
+
+def score_responses(qtype: str, values) -> dict:
+    """Score validated item values. Returns {"score": int, "severity": str, "risk_flag": bool}."""
+    score = sum(values)
+    risk_item = RISK_ITEM.get(qtype)
+    return {
+        "score": score,
+        "severity": severity_for(qtype, score),
+        "risk_flag": bool(risk_item and values[risk_item - 1] > 0),
+    }
+
+
+def score_answers(qtype: str, answers) -> dict:
+    """
+    Validate and score one questionnaire.
+    Returns {"score": int, "severity": str, "risk_flag": bool}. Raises ValueError if invalid.
+    """
+    return score_responses(qtype, validate_answers(qtype, answers))
+
+
+def responses_from_answers(qtype: str, answers) -> list[int] | None:
+    """
+    Canonical storage form of an answers dict: item values in q1..qN order.
+    None if answers are not exactly the type's items with integer values (range is not checked,
+    so stored-but-invalid answers still round-trip and are reported invalid when scored).
+    """
+    if qtype not in QUESTIONNAIRE_ITEMS or not isinstance(answers, dict):
+        return None
+    keys = item_keys(qtype)
+    if set(answers) != set(keys):
+        return None
+    values = [answers[k] for k in keys]
+    for v in values:
+        if isinstance(v, bool) or not isinstance(v, int) or not RESPONSE_MIN <= v <= RESPONSE_MAX:
+            return None
+    return values
+
+
+def answers_from_responses(responses) -> dict:
+    """Dict form of stored responses: [1, 2, ...] -> {"q1": 1, "q2": 2, ...}."""
+    return {f"q{i}": v for i, v in enumerate(responses, start=1)}
+
+
+def responses_matrix(qtype: str, rows) -> np.ndarray:
+    """
+    Build an (n, items) float matrix from stored responses. Rows that are missing (None) or of
+    the wrong length are all-NaN, so validity can be checked column-wise instead of per row.
+    """
+    n_items = QUESTIONNAIRE_ITEMS[qtype]
+    matrix = np.full((len(rows), n_items), np.nan)
+    for i, responses in enumerate(rows):
+        if responses is not None and len(responses) == n_items:
+            matrix[i] = responses
+    return matrix
+
+
+def score_matrix(qtype: str, matrix: np.ndarray):
+    """
+    Vectorized scoring of an (n, items) matrix.
+    Returns (valid, scores, severities, risk_flags) arrays of length n.
+    Invalid rows (missing or out-of-range items) get valid=False and should be left unscored.
+    """
+    valid = np.all((matrix >= ITEM_MIN) & (matrix <= ITEM_MAX), axis=1)
+    scores = np.where(valid, np.nan_to_num(matrix).sum(axis=1), 0).astype(np.int64)
+    lowers = np.array([lower for lower, _ in SEVERITY_BANDS[qtype]])
+    labels = np.array([label for _, label in SEVERITY_BANDS[qtype]], dtype=object)
+    severities = labels[np.searchsorted(lowers, scores, side="right") - 1]
+    risk_item = RISK_ITEM.get(qtype)
+    if risk_item:
+        risk_flags = valid & (np.nan_to_num(matrix[:, risk_item - 1]) > 0)
+    else:
+        risk_flags = np.zeros(len(matrix), dtype=bool)
+    return valid, scores, severities, risk_flags
@@ -0,0 +1,77 @@
+"""
+Postgres full-text search over referral patient_name + reason + note bodies.
+Uses a stored tsvector column (Referral.search_vector, GIN-indexed) so ?q= is index-driven.
+The vector is refreshed when a referral is created/edited and appended to when a note is added.
+On SQLite (tests) search falls back to icontains.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Q
+
+from .models import ReferralNote
+
+SEARCH_CONFIG = "english"
+
+# Weighted vector for one referral row aliased as r: name (A), reason (B), note bodies (C)
+VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(r.patient_name, '')), 'A') "
+    "|| setweight(to_tsvector('english', coalesce(r.reason, '')), 'B') "
+    "|| setweight(to_tsvector('english', coalesce("
+    "(SELECT string_agg(n.body, ' ') FROM referrals_referralnote n WHERE n.referral_id = r.id), "
+    "'')), 'C')"
+)
+
+
+def refresh_search_vectors(referral_ids) -> None:
+    """Recompute stored vectors for the given referrals in one UPDATE. No-op off Postgres."""
+    referral_ids = list(referral_ids)
+    if connection.vendor != "postgresql" or not referral_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE referrals_referral AS r SET search_vector = {VECTOR_SQL} "
+            "WHERE r.id = ANY(%s)",
+            [referral_ids],
+        )
+
+
+def append_note_to_search_vector(referral_id, body: str) -> None:
+    """
+    Add a new note body to the stored vector without re-reading other notes.
+    Rows never vectorized (NULL) get a full refresh instead. No-op off Postgres.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE referrals_referral AS r SET search_vector = CASE "
+            f"WHEN r.search_vector IS NULL THEN {VECTOR_SQL} "
+            "ELSE r.search_vector || setweight(to_tsvector('english', %s), 'C') END "
+            "WHERE r.id = %s",
+            [body, referral_id],
+        )
+
+
+def search_referrals(queryset, query: str):
+    """
+    Filter an (already role-scoped) referral queryset by ?q=, ordered by rank.
+    Requires PostgreSQL for index use. On SQLite, falls back to icontains.
+    """
+    if not query or not query.strip():
+        return queryset
+    q = query.strip()
+
+    if connection.vendor != "postgresql":
+        # Fallback for SQLite (e.g. tests)
+        note_match = ReferralNote.objects.filter(referral=OuterRef("pk"), body__icontains=q)
+        return queryset.filter(
+            Q(patient_name__icontains=q) | Q(reason__icontains=q) | Q(Exists(note_match))
+        )
+
+    search_query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-created_at")
+    )
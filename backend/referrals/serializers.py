@@ -2,11 +2,33 @@
 
 from rest_framework import serializers
 
-from .models import Questionnaire, Referral, ReferralNote
+from accounts.permissions import user_is_clinic_admin
+from directory.models import TherapistProfile
+
+from .duplicates import find_originals, identity_hash
+from .models import Questionnaire, Referral, ReferralNote, ReferralStatus
+from .scoring import score_responses, validate_answers
+from .search import refresh_search_vectors
 from .state_machine import can_transition, get_allowed_transitions
+from .triage import MAX_TRIAGE_ITEMS
+
+
+class StaffOnlyDuplicateOfMixin:
+    """
+    duplicate_of points at another person's referral: drop it unless the request user is a
+    clinic admin or staff (help-seekers and the public form never see it).
+    """
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+        if not (user and user.is_authenticated and (user_is_clinic_admin(user) or user.is_staff)):
+            data.pop("duplicate_of", None)
+        return data
 
-class ReferralListSerializer(serializers.ModelSerializer):
+
+class ReferralListSerializer(StaffOnlyDuplicateOfMixin, serializers.ModelSerializer):
     class Meta:
         model = Referral
         fields = [
@@ -16,6 +38,7 @@ class ReferralListSerializer(serializers.ModelSerializer):
             "patient_email",
             "status",
             "assigned_therapist",
+            "duplicate_of",
             "created_at",
         ]
 
@@ -36,12 +59,14 @@ class ReferralNoteCreateSerializer(serializers.ModelSerializer):
 
 
 class QuestionnaireSerializer(serializers.ModelSerializer):
+    answers = serializers.JSONField(read_only=True)
+
     class Meta:
         model = Questionnaire
-        fields = ["id", "type", "answers", "score", "created_at"]
+        fields = ["id", "type", "answers", "score", "severity", "risk_flag", "created_at"]
 
 
-class ReferralDetailSerializer(serializers.ModelSerializer):
+class ReferralDetailSerializer(StaffOnlyDuplicateOfMixin, serializers.ModelSerializer):
     notes = ReferralNoteSerializer(many=True, read_only=True)
     questionnaires = QuestionnaireSerializer(many=True, read_only=True)
     allowed_transitions = serializers.SerializerMethodField()
@@ -61,6 +86,7 @@ class ReferralDetailSerializer(serializers.ModelSerializer):
             "status",
             "assigned_therapist",
             "assigned_therapist_name",
+            "duplicate_of",
             "created_at",
             "updated_at",
             "notes",
@@ -98,25 +124,33 @@ class ReferralCreateSerializer(serializers.ModelSerializer):
         answers = value.get("answers", {})
         if not isinstance(answers, dict):
             raise serializers.ValidationError("questionnaire.answers must be an object")
-        return value
+        try:
+            responses = validate_answers(qtype, answers)
+        except ValueError as e:
+            raise serializers.ValidationError(f"questionnaire.answers: {e}") from e
+        # Client-sent score is ignored; score is always computed server-side
+        return {"type": qtype, "responses": responses, **score_responses(qtype, responses)}
 
     def create(self, validated_data):
         questionnaire_data = validated_data.pop("questionnaire", None)
         if self.context.get("request") and self.context["request"].user.is_authenticated:
             validated_data["requester_user"] = self.context["request"].user
+        # Flag likely duplicates of a recent referral for the same person (one index lookup)
+        h = identity_hash(validated_data.get("patient_email", ""), validated_data["patient_name"])
+        validated_data["duplicate_of_id"] = find_originals([h]).get(h)
         referral = super().create(validated_data)
         if questionnaire_data:
-            from .models import Questionnaire
-
-            Questionnaire.objects.create(
-                referral=referral,
-                type=questionnaire_data["type"],
-                answers=questionnaire_data.get("answers", {}),
-                score=questionnaire_data.get("score"),
-            )
+            Questionnaire.objects.create(referral=referral, **questionnaire_data)
+        refresh_search_vectors([referral.id])
         return referral
 
 
+class ReferralBatchItemSerializer(ReferralCreateSerializer):
+    """One item of POST /referrals/batch. clinic is a raw id; existence is checked once per batch."""
+
+    clinic = serializers.IntegerField(required=False, allow_null=True)
+
+
 class ReferralUpdateSerializer(serializers.ModelSerializer):
     """PATCH: clinic admin updates status, assigned_therapist."""
 
@@ -134,12 +168,41 @@ class ReferralUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
+class ReferralTriageSerializer(serializers.Serializer):
+    """POST /referrals/triage: move many referrals to one status (optionally assign therapist)."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_TRIAGE_ITEMS
+    )
+    status = serializers.ChoiceField(choices=ReferralStatus.choices)
+    assigned_therapist = serializers.PrimaryKeyRelatedField(
+        queryset=TherapistProfile.objects.all(), required=False
+    )
+
+
 class QuestionnaireCreateSerializer(serializers.ModelSerializer):
+    """
+    POST: answers dict is stored as responses; score, severity and risk_flag are computed from
+    it (client score ignored).
+    """
+
+    answers = serializers.JSONField(write_only=True)
+
     class Meta:
         model = Questionnaire
         fields = ["type", "answers", "score"]
+        read_only_fields = ["score"]
 
     def validate_type(self, value):
         if value not in ("phq9", "gad7"):
             raise serializers.ValidationError("type must be phq9 or gad7")
         return value
+
+    def validate(self, data):
+        try:
+            responses = validate_answers(data["type"], data.pop("answers"))
+        except ValueError as e:
+            raise serializers.ValidationError({"answers": str(e)}) from e
+        data["responses"] = responses
+        data.update(score_responses(data["type"], responses))
+        return data
@@ -1,17 +1,24 @@
-"""Referral tests: create, list, update, state transitions, notes, questionnaires."""
+"""Referral tests: create, list, update, state transitions, notes, questionnaires, scoring."""
+
+from io import StringIO
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from clinics.models import Clinic
 from directory.models import TherapistProfile
 from referrals.models import Questionnaire, Referral, ReferralNote, ReferralStatus
+from referrals.scoring import score_answers
 from referrals.state_machine import can_transition
 
 User = get_user_model()
 
+# PHQ-9: total 12 (moderate), item 9 answered -> risk flag
+PHQ9_ANSWERS = {"q1": 2, "q2": 2, "q3": 1, "q4": 1, "q5": 1, "q6": 2, "q7": 1, "q8": 1, "q9": 1}
+
 
 @pytest.fixture
 def help_seeker():
@@ -216,10 +223,513 @@ class TestReferralQuestionnaires:
         client.force_authenticate(user=help_seeker)
         resp = client.post(
             f"/api/v1/referrals/{referral.id}/questionnaires/",
-            {"type": "phq9", "answers": {"q1": 1, "q2": 2}, "score": 5},
+            {"type": "phq9", "answers": PHQ9_ANSWERS, "score": 99},
             format="json",
         )
         assert resp.status_code == status.HTTP_201_CREATED
         q = Questionnaire.objects.get(referral=referral)
         assert q.type == "phq9"
-        assert q.score == 5
+        # Client-sent score is ignored; computed from answers
+        assert q.score == 12
+        assert q.severity == "moderate"
+        assert q.risk_flag is True
+
+    def test_incomplete_answers_rejected(self, help_seeker, referral):
+        client = APIClient()
+        client.force_authenticate(user=help_seeker)
+        resp = client.post(
+            f"/api/v1/referrals/{referral.id}/questionnaires/",
+            {"type": "phq9", "answers": {"q1": 1, "q2": 2}, "score": 5},
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Questionnaire.objects.filter(referral=referral).exists()
+
+
+@pytest.mark.django_db
+class TestQuestionnaireScoring:
+    """referrals.scoring + rescore_questionnaires command."""
+
+    def test_score_answers_bands_and_risk(self):
+        result = score_answers("gad7", {f"q{i}": 3 for i in range(1, 8)})
+        assert result == {"score": 21, "severity": "severe", "risk_flag": False}
+        result = score_answers("phq9", {f"q{i}": 0 for i in range(1, 10)})
+        assert result == {"score": 0, "severity": "minimal", "risk_flag": False}
+
+    def test_score_answers_rejects_out_of_range(self):
+        with pytest.raises(ValueError):
+            score_answers("phq9", {**PHQ9_ANSWERS, "q1": 4})
+
+    def test_create_referral_scores_questionnaire(self, clinic):
+        client = APIClient()
+        resp = client.post(
+            "/api/v1/referrals/",
+            {
+                "patient_name": "Scored",
+                "questionnaire": {"type": "phq9", "answers": PHQ9_ANSWERS, "score": 0},
+            },
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.data["questionnaires"][0]["score"] == 12
+
+    def test_rescore_command_fixes_stale_scores(self, referral):
+        stale = Questionnaire.objects.create(
+            referral=referral, type="phq9", answers=PHQ9_ANSWERS, score=1
+        )
+        broken = Questionnaire.objects.create(
+            referral=referral, type="gad7", answers={"q1": 1}, score=7
+        )
+        call_command("rescore_questionnaires", "--batch-size", "1", stdout=StringIO())
+        stale.refresh_from_db()
+        broken.refresh_from_db()
+        assert (stale.score, stale.severity, stale.risk_flag) == (12, "moderate", True)
+        # Invalid answers are left unchanged
+        assert broken.score == 7
+
+    def test_extra_answer_keys_invalid_in_both_paths(self, referral):
+        answers = {**PHQ9_ANSWERS, "q10": 1}
+        with pytest.raises(ValueError, match="Unknown answer keys: q10"):
+            score_answers("phq9", answers)
+        extra = Questionnaire.objects.create(
+            referral=referral, type="phq9", answers=answers, score=3
+        )
+        assert extra.responses is None
+        call_command("rescore_questionnaires", stdout=StringIO())
+        extra.refresh_from_db()
+        assert extra.score == 3
+
+    def test_answers_stored_as_responses(self, help_seeker, referral):
+        client = APIClient()
+        client.force_authenticate(user=help_seeker)
+        resp = client.post(
+            f"/api/v1/referrals/{referral.id}/questionnaires/",
+            {"type": "phq9", "answers": PHQ9_ANSWERS},
+            format="json",
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+        # API still emits the dict form
+        assert resp.data["answers"] == PHQ9_ANSWERS
+        q = Questionnaire.objects.get(referral=referral)
+        assert q.responses == [2, 2, 1, 1, 1, 2, 1, 1, 1]
+        assert q.raw_answers is None
+
+    def test_incomplete_answers_kept_raw(self, referral):
+        q = Questionnaire.objects.create(referral=referral, type="gad7", answers={"q1": 1})
+        q.refresh_from_db()
+        assert q.responses is None
+        assert q.answers == {"q1": 1}
+
+    def test_item_means(self, referral):
+        from referrals.outcomes import item_means
+
+        Questionnaire.objects.create(referral=referral, type="phq9", answers=PHQ9_ANSWERS)
+        Questionnaire.objects.create(
+            referral=referral, type="phq9", answers={f"q{i}": 0 for i in range(1, 10)}
+        )
+        Questionnaire.objects.create(referral=referral, type="phq9", answers={"q1": 3})
+        result = item_means("phq9")
+        assert result["count"] == 2
+        assert result["items"]["q1"] == 1.0
+        assert result["items"]["q3"] == 0.5
+
+
+@pytest.mark.django_db
+class TestReferralBatch:
+    """POST /api/v1/referrals/batch/ - partner intake."""
+
+    def test_clinic_admin_batch_json(
+        self, clinic_admin, clinic, django_capture_on_commit_callbacks
+    ):
+        from audit.models import AuditEvent
+
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(
+                "/api/v1/referrals/batch/",
+                [
+                    {
+                        "clinic": clinic.id,
+                        "patient_name": "A",
+                        "questionnaire": {"type": "phq9", "answers": PHQ9_ANSWERS},
+                    },
+                    {"clinic": clinic.id, "patient_name": "B", "patient_email": "b@example.com"},
+                ],
+                format="json",
+            )
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.data["created"] == 2
+        ids = [r["id"] for r in resp.data["results"]]
+        assert Referral.objects.filter(id__in=ids, requester_user=clinic_admin).count() == 2
+        assert Questionnaire.objects.get(referral_id=ids[0]).score == 12
+        assert AuditEvent.objects.filter(action="create", entity_type="referral").count() == 2
+
+    def test_batch_ndjson_reports_invalid_items(self, clinic_admin, clinic):
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        body = "\n".join(
+            [
+                f'{{"clinic": {clinic.id}, "patient_name": "Ok"}}',
+                '{"clinic": 99999, "patient_name": "Unknown clinic"}',
+                '{"patient_email": "no-name@example.com"}',
+            ]
+        )
+        resp = client.post("/api/v1/referrals/batch/", body, content_type="application/x-ndjson")
+        assert resp.status_code == status.HTTP_207_MULTI_STATUS
+        statuses = [r["status"] for r in resp.data["results"]]
+        assert statuses == ["created", "invalid", "invalid"]
+        assert "clinic" in resp.data["results"][1]["errors"]
+        assert "patient_name" in resp.data["results"][2]["errors"]
+        assert Referral.objects.count() == 1
+
+    def test_empty_batch_rejected(self, clinic_admin):
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.post("/api/v1/referrals/batch/", [], format="json")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        resp = client.post("/api/v1/referrals/batch/", "\n", content_type="application/x-ndjson")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_oversized_ndjson_stops_parsing_at_limit(self, clinic_admin, clinic):
+        from referrals.intake import MAX_BATCH_ITEMS
+
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        line = f'{{"clinic": {clinic.id}, "patient_name": "X"}}'
+        # The malformed trailing line is never reached
+        body = "\n".join([line] * (MAX_BATCH_ITEMS + 1) + ["{not json"])
+        resp = client.post("/api/v1/referrals/batch/", body, content_type="application/x-ndjson")
+        assert resp.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert Referral.objects.count() == 0
+
+    def test_help_seeker_cannot_batch(self, help_seeker):
+        client = APIClient()
+        client.force_authenticate(user=help_seeker)
+        resp = client.post("/api/v1/referrals/batch/", [{"patient_name": "X"}], format="json")
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestReferralMatches:
+    """GET /api/v1/referrals/{id}/matches/"""
+
+    def test_ranks_by_specialty_and_caseload(self, clinic_admin, clinic):
+        def make(email, name, specialties, **extra):
+            user = User.objects.create_user(email=email, password="x", role="therapist")
+            return TherapistProfile.objects.create(
+                user=user, display_name=name, clinic=clinic, specialties=specialties, **extra
+            )
+
+        anxiety = make("a@t.com", "Anxiety Doc", ["Anxiety", "CBT"])
+        make("b@t.com", "Trauma Doc", ["PTSD", "Trauma"])
+        make("c@t.com", "Closed Doc", ["Anxiety"], is_accepting=False)
+        referral = Referral.objects.create(
+            clinic=clinic, patient_name="P", reason="Panic attacks and anxiety at work"
+        )
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.get(f"/api/v1/referrals/{referral.id}/matches/")
+        assert resp.status_code == status.HTTP_200_OK
+        results = resp.data["results"]
+        assert [r["display_name"] for r in results] == ["Anxiety Doc", "Trauma Doc"]
+        assert results[0]["therapist"] == anxiety.id
+        assert results[0]["matched_specialties"] == ["anxiety"]
+
+    def test_questionnaire_severity_drives_specialty(self, clinic_admin, clinic):
+        user = User.objects.create_user(email="d@t.com", password="x", role="therapist")
+        depression = TherapistProfile.objects.create(
+            user=user, display_name="Mood Doc", clinic=clinic, specialties=["Depression"]
+        )
+        referral = Referral.objects.create(clinic=clinic, patient_name="P")
+        Questionnaire.objects.create(
+            referral=referral, type="phq9", answers=PHQ9_ANSWERS, score=12, severity="moderate"
+        )
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.get(f"/api/v1/referrals/{referral.id}/matches/")
+        assert resp.data["results"][0]["therapist"] == depression.id
+        assert resp.data["results"][0]["matched_specialties"] == ["depression"]
+
+    def test_queryset_update_rebuilds_index(self, clinic_admin, clinic):
+        user = User.objects.create_user(email="e@t.com", password="x", role="therapist")
+        profile = TherapistProfile.objects.create(
+            user=user, display_name="Grief Doc", clinic=clinic, specialties=["Grief"]
+        )
+        referral = Referral.objects.create(clinic=clinic, patient_name="P", reason="anxiety")
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        url = f"/api/v1/referrals/{referral.id}/matches/"
+        assert client.get(url).data["results"][0]["matched_specialties"] == []
+        # Admin actions and bulk edits go through QuerySet.update(), not save()
+        TherapistProfile.objects.filter(pk=profile.pk).update(specialties=["Anxiety"])
+        assert client.get(url).data["results"][0]["matched_specialties"] == ["anxiety"]
+
+    def test_therapist_cannot_see_matches(self, therapist_user, referral):
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        resp = client.get(f"/api/v1/referrals/{referral.id}/matches/")
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestReferralTriage:
+    """POST /api/v1/referrals/triage/ - conditional bulk transitions."""
+
+    def test_bulk_approve_creates_patients(
+        self, clinic_admin, clinic, therapist_profile, django_capture_on_commit_callbacks
+    ):
+        from audit.models import AuditEvent
+        from patients.models import Patient
+
+        movable = [
+            Referral.objects.create(clinic=clinic, patient_name=f"P{i}", status="new")
+            for i in range(3)
+        ]
+        closed = Referral.objects.create(clinic=clinic, patient_name="Done", status="closed")
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        # Audit events of the transaction are buffered when it commits
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(
+                "/api/v1/referrals/triage/",
+                {
+                    "ids": [r.id for r in movable] + [closed.id],
+                    "status": "approved",
+                    "assigned_therapist": therapist_profile.id,
+                },
+                format="json",
+            )
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["updated"] == [r.id for r in movable]
+        assert resp.data["skipped"] == [{"id": closed.id, "status": "closed"}]
+        assert resp.data["patients_created"] == 3
+        assert Referral.objects.filter(status="approved").count() == 3
+        assert Patient.objects.filter(owner_therapist=therapist_profile).count() == 3
+        assert AuditEvent.objects.filter(entity_type="referral", action="update").count() == 3
+
+    def test_invalid_transition_is_skipped(self, clinic_admin, referral):
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.post(
+            "/api/v1/referrals/triage/", {"ids": [referral.id], "status": "ongoing"}, format="json"
+        )
+        assert resp.data["updated"] == []
+        referral.refresh_from_db()
+        assert referral.status == ReferralStatus.NEW
+
+    def test_help_seeker_cannot_triage(self, help_seeker, referral):
+        client = APIClient()
+        client.force_authenticate(user=help_seeker)
+        resp = client.post(
+            "/api/v1/referrals/triage/", {"ids": [referral.id], "status": "approved"}, format="json"
+        )
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestReferralStatusHistory:
+    """Status transitions are logged; GET /api/v1/referrals/sla/ reports breaches and percentiles."""
+
+    def test_patch_records_history(self, clinic_admin, referral):
+        from referrals.models import ReferralStatusChange
+
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        client.patch(f"/api/v1/referrals/{referral.id}/", {"status": "needs_info"}, format="json")
+        change = ReferralStatusChange.objects.get(referral=referral)
+        assert (change.from_status, change.to_status) == ("new", "needs_info")
+        assert change.changed_by == clinic_admin
+        referral.refresh_from_db()
+        assert referral.status_entered_at == change.changed_at
+
+    def test_triage_records_history(self, clinic_admin, referral):
+        from referrals.models import ReferralStatusChange
+
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        client.post(
+            "/api/v1/referrals/triage/", {"ids": [referral.id], "status": "rejected"}, format="json"
+        )
+        change = ReferralStatusChange.objects.get(referral=referral)
+        assert (change.from_status, change.to_status) == ("new", "rejected")
+
+    def test_sla_breaches_and_time_to_stage(self, clinic_admin, clinic):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        stuck = Referral.objects.create(
+            clinic=clinic,
+            patient_name="Stuck",
+            status="needs_info",
+            status_entered_at=timezone.now() - timedelta(days=10),
+        )
+        Referral.objects.create(clinic=clinic, patient_name="Fresh", status="needs_info")
+        moving = Referral.objects.create(clinic=clinic, patient_name="Moving", status="new")
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        client.post(
+            "/api/v1/referrals/triage/", {"ids": [moving.id], "status": "approved"}, format="json"
+        )
+        resp = client.get("/api/v1/referrals/sla/", {"clinic": clinic.id})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["sla"]["needs_info"]["breached"] == 1
+        assert resp.data["sla"]["needs_info"]["oldest"][0]["id"] == stuck.id
+        assert resp.data["time_to_stage"]["approved"]["count"] == 1
+        assert resp.data["time_to_stage"]["approved"]["p50_hours"] >= 0
+        assert resp.data["time_to_stage"]["closed"]["count"] == 0
+
+
+@pytest.mark.django_db
+class TestReferralSearch:
+    """GET /api/v1/referrals/?q= - reason, patient_name, note bodies; role scoping kept."""
+
+    def test_search_reason_and_notes(self, clinic_admin, clinic, help_seeker):
+        by_reason = Referral.objects.create(
+            clinic=clinic, patient_name="A", reason="Insomnia since spring"
+        )
+        by_note = Referral.objects.create(clinic=clinic, patient_name="B", reason="Stress")
+        Referral.objects.create(clinic=clinic, patient_name="C", reason="Grief")
+        ReferralNote.objects.create(
+            referral=by_note, author=help_seeker, body="Mentions insomnia too"
+        )
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.get("/api/v1/referrals/", {"q": "insomnia"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert {r["id"] for r in resp.data["results"]} == {by_reason.id, by_note.id}
+
+    def test_search_respects_role_scope(self, help_seeker, clinic, referral):
+        other = Referral.objects.create(clinic=clinic, patient_name="John Other")
+        client = APIClient()
+        client.force_authenticate(user=help_seeker)
+        resp = client.get("/api/v1/referrals/", {"q": "John"})
+        ids = {r["id"] for r in resp.data["results"]}
+        assert referral.id in ids
+        assert other.id not in ids
+
+
+@pytest.mark.django_db
+class TestDuplicateReferrals:
+    """identity_hash flags repeat submissions for the same person within the window."""
+
+    def test_identity_hash_normalizes(self):
+        from referrals.duplicates import identity_hash
+
+        assert identity_hash(" Jane@Example.com", "José  O'Neil") == identity_hash(
+            "jane@example.com", "jose o neil"
+        )
+        assert identity_hash("", "") == ""
+        # A name alone is not an identity
+        assert identity_hash("", "Jane Doe") == ""
+
+    def test_public_form_flags_duplicate_without_exposing_it(self, clinic_admin, help_seeker):
+        client = APIClient()
+        first = client.post(
+            "/api/v1/referrals/",
+            {"patient_name": "Walk In", "patient_email": "walkin@example.com"},
+            format="json",
+        )
+        client.force_authenticate(user=help_seeker)
+        second = client.post(
+            "/api/v1/referrals/",
+            {"patient_name": "walk-in", "patient_email": "WALKIN@example.com"},
+            format="json",
+        )
+        assert "duplicate_of" not in first.data
+        assert "duplicate_of" not in second.data
+        resp = client.get(f"/api/v1/referrals/{second.data['id']}/")
+        assert "duplicate_of" not in resp.data
+        client.force_authenticate(user=clinic_admin)
+        resp = client.get(f"/api/v1/referrals/{second.data['id']}/")
+        assert resp.data["duplicate_of"] == first.data["id"]
+
+    def test_referrals_without_email_not_flagged(self):
+        Referral.objects.create(patient_name="Jane Doe")
+        second = Referral.objects.create(patient_name="Jane Doe")
+        assert second.identity_hash == ""
+        from referrals.duplicates import find_originals
+
+        assert find_originals([second.identity_hash]) == {}
+
+    def test_old_referral_outside_window_not_flagged(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        old = Referral.objects.create(patient_name="Old", patient_email="old@example.com")
+        Referral.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=90))
+        client = APIClient()
+        resp = client.post(
+            "/api/v1/referrals/",
+            {"patient_name": "Old", "patient_email": "old@example.com"},
+            format="json",
+        )
+        assert Referral.objects.get(id=resp.data["id"]).duplicate_of_id is None
+
+    def test_batch_flags_existing_and_in_batch_duplicates(self, clinic_admin, clinic):
+        existing = Referral.objects.create(patient_name="Ann", patient_email="ann@example.com")
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.post(
+            "/api/v1/referrals/batch/",
+            [
+                {"patient_name": "Ann", "patient_email": "ann@example.com"},
+                {"patient_name": "Bea", "patient_email": "bea@example.com"},
+                {"patient_name": "BEA", "patient_email": "bea@example.com"},
+            ],
+            format="json",
+        )
+        results = resp.data["results"]
+        assert results[0]["duplicate_of"] == existing.id
+        assert "duplicate_of" not in results[1]
+        assert results[2]["duplicate_of"] == results[1]["id"]
+        assert Referral.objects.get(id=results[2]["id"]).duplicate_of_id == results[1]["id"]
+
+
+@pytest.mark.django_db
+class TestReferralOutcomes:
+    """GET /api/v1/referrals/outcomes/ - score trajectories, deltas, response/remission."""
+
+    def _patient_with_scores(self, clinic, therapist_profile, name, scores):
+        from patients.models import Patient
+
+        ref = Referral.objects.create(clinic=clinic, patient_name=name, status="approved")
+        Patient.objects.create(
+            clinic=clinic, owner_therapist=therapist_profile, referral=ref, name=name
+        )
+        for score in scores:
+            Questionnaire.objects.create(referral=ref, type="phq9", score=score)
+
+    def test_outcomes_by_clinic_and_therapist(self, clinic_admin, clinic, therapist_profile):
+        self._patient_with_scores(clinic, therapist_profile, "A", [18, 8, 6])
+        self._patient_with_scores(clinic, therapist_profile, "B", [12, 4])
+        self._patient_with_scores(clinic, therapist_profile, "C", [15])
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        resp = client.get("/api/v1/referrals/outcomes/", {"type": "phq9", "clinic": clinic.id})
+        assert resp.status_code == status.HTTP_200_OK
+        overall = resp.data["overall"]
+        assert (overall["patients"], overall["followed_up"], overall["eligible"]) == (3, 2, 2)
+        assert overall["mean_delta"] == -10.0
+        assert overall["response_rate"] == 1.0
+        assert overall["remission_rate"] == 0.5
+        assert [p["mean_score"] for p in resp.data["trajectory"]] == [15.0, 6.0, 6.0]
+        assert resp.data["by_therapist"][0]["id"] == therapist_profile.id
+        assert resp.data["by_clinic"][0]["name"] == clinic.name
+
+    def test_outcomes_cached_per_day(self, clinic_admin, clinic, therapist_profile):
+        client = APIClient()
+        client.force_authenticate(user=clinic_admin)
+        first = client.get("/api/v1/referrals/outcomes/", {"clinic": clinic.id})
+        assert first.data["overall"]["patients"] == 0
+        self._patient_with_scores(clinic, therapist_profile, "Late", [20, 10])
+        again = client.get("/api/v1/referrals/outcomes/", {"clinic": clinic.id})
+        assert again.data["overall"]["patients"] == 0
+
+    def test_outcomes_forbidden_for_therapist(self, therapist_user):
+        client = APIClient()
+        client.force_authenticate(user=therapist_user)
+        resp = client.get("/api/v1/referrals/outcomes/")
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
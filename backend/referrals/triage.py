@@ -0,0 +1,121 @@
+"""
+Bulk referral triage (POST /api/v1/referrals/triage).
+Status changes are a single conditional UPDATE ... WHERE status IN (allowed_from) RETURNING,
+so concurrent admins cannot apply an invalid transition and nothing is read before writing.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from audit.service import ENTITY_REFERRAL, log_events
+
+from .history import record_status_changes
+from .models import Referral, ReferralStatus
+from .patient_creation import create_patients_for_referrals
+from .state_machine import REFERRAL_TRANSITIONS
+
+MAX_TRIAGE_ITEMS = 1000
+
+
+def allowed_from(to_status: str) -> list[str]:
+    """Statuses that may transition to to_status (excluding to_status itself)."""
+    return [s for s, targets in REFERRAL_TRANSITIONS.items() if to_status in targets]
+
+
+def _conditional_update(ids, to_status, now, assigned_therapist_id=None):
+    """
+    UPDATE referrals in ids whose status allows the transition. Returns updated rows as dicts
+    (id, clinic_id, assigned_therapist_id, patient_name, patient_email, from_status,
+    from_entered_at). Must run inside a transaction.
+    """
+    sources = allowed_from(to_status)
+    if not ids or not sources:
+        return []
+    qn = connection.ops.quote_name
+    table = qn(Referral._meta.db_table)
+    sets = [f"{qn('status')} = %s", f"{qn('updated_at')} = %s", f"{qn('status_entered_at')} = %s"]
+    now_db = connection.ops.adapt_datetimefield_value(now)
+    params = [to_status, now_db, now_db]
+    if assigned_therapist_id is not None:
+        sets.append(f"{qn('assigned_therapist_id')} = %s")
+        params.append(assigned_therapist_id)
+    id_list = ", ".join(["%s"] * len(ids))
+    source_list = ", ".join(["%s"] * len(sources))
+    columns = ["id", "clinic_id", "assigned_therapist_id", "patient_name", "patient_email"]
+
+    if connection.vendor == "postgresql":
+        # Previous status comes from the locked pre-image in the same statement
+        sql = (
+            f"UPDATE {table} SET {', '.join(sets)} "
+            f"FROM (SELECT {qn('id')}, {qn('status')}, {qn('status_entered_at')} FROM {table} "
+            f"WHERE {qn('id')} IN ({id_list}) AND {qn('status')} IN ({source_list}) "
+            f"FOR UPDATE) AS old "
+            f"WHERE {table}.{qn('id')} = old.{qn('id')} "
+            f"RETURNING {', '.join(f'{table}.{qn(c)}' for c in columns)}, "
+            f"old.{qn('status')}, old.{qn('status_entered_at')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, *ids, *sources])
+            rows = cursor.fetchall()
+        return [
+            dict(zip([*columns, "from_status", "from_entered_at"], row, strict=True))
+            for row in rows
+        ]
+
+    # Other backends (SQLite in tests) cannot RETURNING from a joined pre-image: read it first
+    previous = {
+        pk: (status, entered_at)
+        for pk, status, entered_at in Referral.objects.select_for_update()
+        .filter(id__in=ids, status__in=sources)
+        .values_list("id", "status", "status_entered_at")
+    }
+    sql = (
+        f"UPDATE {table} SET {', '.join(sets)} "
+        f"WHERE {qn('id')} IN ({id_list}) AND {qn('status')} IN ({source_list}) "
+        f"RETURNING {', '.join(qn(c) for c in columns)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, *ids, *sources])
+        rows = [dict(zip(columns, row, strict=True)) for row in cursor.fetchall()]
+    for row in rows:
+        row["from_status"], row["from_entered_at"] = previous[row["id"]]
+    return rows
+
+
+def bulk_transition(ids, to_status, *, assigned_therapist_id=None, request=None):
+    """
+    Move many referrals to to_status in one statement. Status history and patients for newly
+    approved referrals are each written with one bulk insert in the same transaction; the audit
+    events join the request's buffer when it commits (audit.writer) and are dropped on rollback.
+    Returns {"updated", "skipped", "patients_created"}.
+    """
+    ids = list(dict.fromkeys(ids))
+    now = timezone.now()
+    with transaction.atomic():
+        rows = _conditional_update(ids, to_status, now, assigned_therapist_id)
+        record_status_changes(rows, to_status, changed_at=now, request=request)
+        patients_created = 0
+        if to_status == ReferralStatus.APPROVED:
+            patients_created = create_patients_for_referrals(rows)
+        fields = ["status"] + (["assigned_therapist"] if assigned_therapist_id is not None else [])
+        log_events(
+            [
+                {
+                    "action": "update",
+                    "entity_type": ENTITY_REFERRAL,
+                    "entity_id": row["id"],
+                    "metadata": {"fields": fields, "status": to_status, "bulk": True},
+                }
+                for row in rows
+            ],
+            request=request,
+        )
+    updated = {row["id"] for row in rows}
+    skipped_ids = [i for i in ids if i not in updated]
+    # Report current status of skipped referrals (read after the write; informational only)
+    current = dict(Referral.objects.filter(id__in=skipped_ids).values_list("id", "status"))
+    return {
+        "updated": [i for i in ids if i in updated],
+        "skipped": [{"id": i, "status": current.get(i)} for i in skipped_ids],
+        "patients_created": patients_created,
+    }
@@ -1,17 +1,27 @@
-"""Referral views: CRUD, notes, questionnaires."""
+"""Referral views: CRUD, search, batch intake, triage, analytics, notes, questionnaires."""
 
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from accounts.permissions import user_is_clinic_admin, user_is_help_seeker, user_is_therapist
 from audit.mixins import ReferralAuditMixin
 from audit.service import ENTITY_REFERRAL, log_event
+from config.parsers import NDJSONParser
 
-from .models import Questionnaire, Referral, ReferralNote
+from .history import pipeline_stats, record_status_changes
+from .intake import MAX_BATCH_ITEMS, create_referrals_batch
+from .matching import rank_therapists
+from .models import Questionnaire, QuestionnaireType, Referral, ReferralNote
+from .outcomes import cached_outcome_stats
 from .patient_creation import maybe_create_patient_for_referral
 from .permissions import ReferralPermission
+from .search import append_note_to_search_vector, search_referrals
 from .serializers import (
     QuestionnaireCreateSerializer,
     QuestionnaireSerializer,
@@ -20,21 +30,29 @@ from .serializers import (
     ReferralListSerializer,
     ReferralNoteCreateSerializer,
     ReferralNoteSerializer,
+    ReferralTriageSerializer,
     ReferralUpdateSerializer,
 )
+from .triage import bulk_transition
 
 
 class ReferralViewSet(ReferralAuditMixin, ModelViewSet):
     """
     POST /api/v1/referrals - create (public or help-seeker)
-    GET /api/v1/referrals - list (role-filtered)
+    POST /api/v1/referrals/batch - batch intake, JSON array or NDJSON (clinic admin)
+    GET /api/v1/referrals - list (role-filtered; ?status=, ?q= full-text search)
     PATCH /api/v1/referrals/{id} - update status/assigned (clinic admin)
+    POST /api/v1/referrals/triage - bulk status change (clinic admin)
+    GET /api/v1/referrals/sla - SLA breaches + time-to-stage percentiles (clinic admin)
+    GET /api/v1/referrals/outcomes - questionnaire score trajectories and outcomes (clinic admin)
+    GET /api/v1/referrals/{id}/matches - ranked therapist candidates (clinic admin)
     POST /api/v1/referrals/{id}/notes
     POST /api/v1/referrals/{id}/questionnaires
     """
 
     permission_classes = [ReferralPermission]
     http_method_names = ["get", "post", "patch", "head", "options"]
+    ndjson_max_items = MAX_BATCH_ITEMS
 
     def get_queryset(self):
         qs = (
@@ -61,6 +79,18 @@ class ReferralViewSet(ReferralAuditMixin, ModelViewSet):
         if status_filter:
             qs = qs.filter(status=status_filter)
 
+        # Duplicates: ?duplicates=exclude (originals only) or ?duplicates=only
+        duplicates = self.request.query_params.get("duplicates", "").strip().lower()
+        if duplicates == "exclude":
+            qs = qs.filter(duplicate_of__isnull=True)
+        elif duplicates == "only":
+            qs = qs.filter(duplicate_of__isnull=False)
+
+        # Text query: full-text search on patient_name, reason, note bodies (ranked)
+        query = self.request.query_params.get("q", "").strip()
+        if query and self.action == "list":
+            qs = search_referrals(qs, query)
+
         return qs
 
     def get_serializer_class(self):
@@ -77,15 +107,36 @@ class ReferralViewSet(ReferralAuditMixin, ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         return Response(
-            ReferralDetailSerializer(serializer.instance).data,
+            ReferralDetailSerializer(
+                serializer.instance, context=self.get_serializer_context()
+            ).data,
             status=status.HTTP_201_CREATED,
         )
 
     def partial_update(self, request, *args, **kwargs):
         instance = self.get_object()
+        previous_status, previous_entered_at = instance.status, instance.status_entered_at
         serializer = ReferralUpdateSerializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            if serializer.validated_data.get("status", previous_status) != previous_status:
+                now = timezone.now()
+                serializer.save(status_entered_at=now)
+                record_status_changes(
+                    [
+                        {
+                            "id": instance.id,
+                            "clinic_id": instance.clinic_id,
+                            "from_status": previous_status,
+                            "from_entered_at": previous_entered_at,
+                        }
+                    ],
+                    instance.status,
+                    changed_at=now,
+                    request=request,
+                )
+            else:
+                serializer.save()
         maybe_create_patient_for_referral(instance)
         log_event(
             action="update",
@@ -94,7 +145,128 @@ class ReferralViewSet(ReferralAuditMixin, ModelViewSet):
             request=request,
             metadata={"fields": list(serializer.validated_data.keys())},
         )
-        return Response(ReferralDetailSerializer(instance).data)
+        return Response(
+            ReferralDetailSerializer(instance, context=self.get_serializer_context()).data
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="batch",
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def batch(self, request):
+        """POST /api/v1/referrals/batch - JSON array or NDJSON of referrals. Per-item results."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Expected a JSON array or NDJSON body."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not items:
+            return Response({"detail": "Empty batch."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BATCH_ITEMS:
+            return Response(
+                {"detail": f"Batch too large: max {MAX_BATCH_ITEMS} items."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        results = create_referrals_batch(items, request=request)
+        created = sum(1 for r in results if r["status"] == "created")
+        if created == len(results):
+            code = status.HTTP_201_CREATED
+        elif created:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"created": created, "failed": len(results) - created, "results": results},
+            status=code,
+        )
+
+    @action(detail=False, methods=["post"], url_path="triage")
+    def triage(self, request):
+        """
+        POST /api/v1/referrals/triage {"ids": [...], "status": "...", "assigned_therapist": id}
+        Conditional bulk update: only referrals whose current status allows the transition move.
+        """
+        serializer = ReferralTriageSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        therapist = serializer.validated_data.get("assigned_therapist")
+        result = bulk_transition(
+            serializer.validated_data["ids"],
+            serializer.validated_data["status"],
+            assigned_therapist_id=therapist.id if therapist else None,
+            request=request,
+        )
+        return Response(result)
+
+    @action(detail=False, methods=["get"], url_path="sla")
+    def sla(self, request):
+        """
+        GET /api/v1/referrals/sla?clinic=&date_from=&date_to=
+        Current SLA breaches per status, and time-to-stage percentiles over the date window.
+        """
+        params = request.query_params
+        window = {}
+        for key in ("date_from", "date_to"):
+            dt = parse_datetime(params.get(key, ""))
+            if dt and timezone.is_naive(dt):
+                dt = timezone.make_aware(dt)
+            window[key] = dt
+        clinic_id = params.get("clinic")
+        return Response(
+            pipeline_stats(
+                clinic_id=int(clinic_id) if clinic_id and clinic_id.isdigit() else None,
+                **window,
+            )
+        )
+
+    @action(detail=False, methods=["get"], url_path="outcomes")
+    def outcomes(self, request):
+        """
+        GET /api/v1/referrals/outcomes?type=phq9|gad7&clinic=
+        Score trajectory, baseline-to-latest deltas and response/remission rates per clinic and
+        therapist. Cached per clinic per day.
+        """
+        qtype = request.query_params.get("type", QuestionnaireType.PHQ9)
+        if qtype not in QuestionnaireType.values:
+            return Response(
+                {"type": f"Must be one of {QuestionnaireType.values}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        clinic_id = request.query_params.get("clinic")
+        return Response(
+            cached_outcome_stats(
+                qtype, clinic_id=int(clinic_id) if clinic_id and clinic_id.isdigit() else None
+            )
+        )
+
+    @action(detail=True, methods=["get"], url_path="matches")
+    def matches(self, request, pk=None):
+        """
+        GET /api/v1/referrals/{id}/matches?language=&city=&remote=&price_max=&limit=
+        Therapists ranked by specialty/language overlap, location, price and caseload.
+        """
+        referral = self.get_object()
+        params = request.query_params
+        languages = [x.strip() for x in params.get("language", "").split(",") if x.strip()]
+        try:
+            price_max = float(params["price_max"]) if params.get("price_max") else None
+        except ValueError:
+            price_max = None
+        try:
+            limit = min(max(int(params.get("limit", 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        results = rank_therapists(
+            referral,
+            languages=languages,
+            city=params.get("city", "").strip(),
+            remote=params.get("remote", "").lower() in ("true", "1", "yes"),
+            price_max=price_max,
+            limit=limit,
+        )
+        return Response({"referral": referral.id, "results": results})
 
     @action(detail=True, methods=["post"], url_path="notes")
     def notes(self, request, pk=None):
@@ -107,6 +279,7 @@ class ReferralViewSet(ReferralAuditMixin, ModelViewSet):
             author=request.user,
             body=serializer.validated_data["body"],
         )
+        append_note_to_search_vector(referral.id, note.body)
         return Response(
             ReferralNoteSerializer(note).data,
             status=status.HTTP_201_CREATED,
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark JWT refresh throughput against a large OutstandingToken/BlacklistedToken history.
+Runs in-process against the configured database (use a disposable one: it inserts rows).
+Usage:
+  python scripts/bench_token_refresh.py [--history N] [--blacklisted-ratio R] [--refreshes N]
+  python scripts/bench_token_refresh.py --history 10000000 --refreshes 2000
+  python scripts/bench_token_refresh.py --purge   # also time purge_expired_tokens afterwards
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework_simplejwt.token_blacklist.models import (  # noqa: E402
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from accounts.blacklist import (  # noqa: E402
+    RefreshToken,
+    blacklist_filter,
+    purge_expired_tokens,
+)
+from accounts.jwt_serializers import ClaimsTokenRefreshSerializer  # noqa: E402
+from accounts.models import User  # noqa: E402
+
+BATCH = 10_000
+
+
+def seed_history(total: int, blacklisted_ratio: float) -> None:
+    """Insert `total` historical tokens: half expired, blacklisted_ratio of them blacklisted."""
+    existing = OutstandingToken.objects.count()
+    if existing >= total:
+        print(f"  history: {existing} tokens already present")
+        return
+    now = timezone.now()
+    step = max(int(1 / blacklisted_ratio), 1) if blacklisted_ratio else 0
+    created = existing
+    start = time.perf_counter()
+    while created < total:
+        n = min(BATCH, total - created)
+        tokens = OutstandingToken.objects.bulk_create(
+            [
+                OutstandingToken(
+                    jti=uuid.uuid4().hex,
+                    token="",
+                    created_at=now,
+                    # Oldest half expired, the rest still live (in id order, like real issuance)
+                    expires_at=now + timedelta(seconds=created + i - total // 2),
+                )
+                for i in range(n)
+            ]
+        )
+        if step:
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token=t) for i, t in enumerate(tokens) if i % step == 0]
+            )
+        created += n
+        if created % (BATCH * 100) == 0:
+            print(f"  seeded {created}/{total}")
+    print(f"  history: {created} tokens ({time.perf_counter() - start:.1f}s to seed)")
+
+
+def bench_refresh(user, refreshes: int, use_filter: bool) -> dict:
+    settings.JWT_BLACKLIST_FILTER = use_filter
+    blacklist_filter.reset()
+    refresh = str(RefreshToken.for_user(user))
+    if use_filter:
+        # Build outside the timed loop (a worker builds once per BLACKLIST_FILTER_MAX_AGE)
+        blacklist_filter.might_contain("warmup")
+    timings = []
+    for _ in range(refreshes):
+        start = time.perf_counter()
+        serializer = ClaimsTokenRefreshSerializer(data={"refresh": refresh})
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data["refresh"]
+        timings.append(time.perf_counter() - start)
+    total = sum(timings)
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95)] * 1000,
+        "throughput": len(timings) / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JWT refresh with a large token history")
+    parser.add_argument("--history", type=int, default=10_000_000, help="Historical tokens")
+    parser.add_argument(
+        "--blacklisted-ratio", type=float, default=0.5, help="Share of history blacklisted"
+    )
+    parser.add_argument("--refreshes", type=int, default=1000, help="Timed refreshes per run")
+    parser.add_argument("--purge", action="store_true", help="Time purge_expired_tokens at the end")
+    args = parser.parse_args()
+
+    print(f"Refresh benchmark ({settings.DATABASES['default']['ENGINE']})")
+    seed_history(args.history, args.blacklisted_ratio)
+    user, _ = User.objects.get_or_create(email="bench-refresh@example.com")
+
+    for use_filter in (False, True):
+        stats = bench_refresh(user, args.refreshes, use_filter)
+        label = "bloom filter" if use_filter else "db check    "
+        print(
+            f"  {label}: mean {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, "
+            f"{stats['throughput']:.0f} refresh/s"
+        )
+
+    if args.purge:
+        start = time.perf_counter()
+        deleted = purge_expired_tokens()
+        print(f"  purge: {deleted} expired tokens in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark random (v4) vs time-ordered (v7) UUID primary keys: insert throughput and final
+primary-key index size. Creates scratch tables bench_uuid_v4/bench_uuid_v7 in the configured
+database (use a disposable one) and drops them afterwards unless --keep.
+Usage:
+  python scripts/bench_uuid_keys.py [--rows N] [--batch N]
+  python scripts/bench_uuid_keys.py --rows 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from config.uuids import uuid7  # noqa: E402
+
+# Roughly an audit row: key, timestamp-ish payload
+PAYLOAD = "x" * 64
+
+
+def _key_type() -> str:
+    return "uuid" if connection.vendor == "postgresql" else "char(32)"
+
+
+def _param(value: uuid.UUID):
+    return value if connection.vendor == "postgresql" else value.hex
+
+
+def index_size(name: str) -> int | None:
+    """Bytes used by index `name`, or None if the database cannot tell."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_relation_size(%s)", [name])
+            return cursor.fetchone()[0]
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [name])
+            except Exception:
+                return None  # SQLite built without the dbstat table
+            return cursor.fetchone()[0]
+    return None
+
+
+def bench(table: str, make_key, rows: int, batch: int) -> dict:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TABLE {table} (id {_key_type()} NOT NULL, payload text NOT NULL)")
+        cursor.execute(f"CREATE UNIQUE INDEX {table}_pk ON {table} (id)")
+    start = time.perf_counter()
+    done = 0
+    while done < rows:
+        n = min(batch, rows - done)
+        params = [(_param(make_key()), PAYLOAD) for _ in range(n)]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {table} (id, payload) VALUES (%s, %s)", params)
+        done += n
+        if done % (batch * 100) == 0:
+            print(f"  {table}: {done}/{rows}")
+    elapsed = time.perf_counter() - start
+    return {
+        "rows_per_s": rows / elapsed,
+        "seconds": elapsed,
+        "index_bytes": index_size(f"{table}_pk"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark v4 vs v7 UUID primary keys")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Rows inserted per table")
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per insert transaction")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables")
+    args = parser.parse_args()
+
+    print(f"UUID key benchmark ({connection.vendor}, {args.rows} rows)")
+    results = {}
+    for label, make_key in (("v4", uuid.uuid4), ("v7", uuid7)):
+        results[label] = stats = bench(f"bench_uuid_{label}", make_key, args.rows, args.batch)
+        size = stats["index_bytes"]
+        size_text = f"{size / 2**20:.1f} MiB" if size is not None else "n/a"
+        print(
+            f"  {label}: {stats['rows_per_s']:.0f} rows/s ({stats['seconds']:.1f}s), "
+            f"pk index {size_text}"
+        )
+    if not args.keep:
+        with connection.cursor() as cursor:
+            for label in results:
+                cursor.execute(f"DROP TABLE bench_uuid_{label}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Tests for the sliding-window rate limiter (config.throttling)."""
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from config.throttling import (
+    AnonThrottle,
+    CacheStorage,
+    DatabaseStorage,
+    MemoryStorage,
+    SlidingWindowThrottle,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **django_settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": rates,
+        }
+
+    return set_rates
+
+
+class _Throttle(SlidingWindowThrottle):
+    scope = "test"
+
+
+def _request(user=None):
+    from django.contrib.auth.models import AnonymousUser
+
+    request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+    request.user = user or AnonymousUser()
+    return request
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("storage_class", [MemoryStorage, CacheStorage, DatabaseStorage])
+def test_storage_counts(storage_class):
+    storage = storage_class()
+    assert storage.get("k") == 0
+    assert [storage.incr("k", ttl=60) for _ in range(3)] == [1, 2, 3]
+    assert storage.get("k") == 3
+
+
+@pytest.mark.django_db
+def test_database_storage_restarts_expired_counter():
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from accounts.models import ThrottleCounter
+
+    storage = DatabaseStorage()
+    storage.incr("k", ttl=60)
+    storage.incr("k", ttl=60)
+    ThrottleCounter.objects.filter(key="k").update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert storage.get("k") == 0
+    assert storage.incr("k", ttl=60) == 1
+    assert ThrottleCounter.objects.get(key="k").expires_at > timezone.now()
+
+
+def test_sliding_window_weights_previous_window(rates):
+    rates(test="10/minute")
+    now = [600.0]
+    _Throttle.timer = staticmethod(lambda: now[0])
+    try:
+        request = _request()
+        assert all(_Throttle().allow_request(request, None) for _ in range(10))
+        assert not _Throttle().allow_request(request, None)
+        # Half-way into the next window the previous one counts half (10 * 0.5); the rejected
+        # request above was not counted
+        now[0] = 690.0
+        allowed = sum(_Throttle().allow_request(request, None) for _ in range(6))
+        assert allowed == 5
+        throttle = _Throttle()
+        assert not throttle.allow_request(request, None)
+        # 10 * w + 5 + 1 <= 10 once w <= 0.4, i.e. 6s from now
+        assert throttle.wait() == pytest.approx(6.0)
+    finally:
+        _Throttle.timer = SlidingWindowThrottle.timer
+
+
+def test_rejected_requests_not_counted(rates):
+    rates(test="3/minute")
+    now = [600.0]
+    _Throttle.timer = staticmethod(lambda: now[0])
+    try:
+        request = _request()
+        results = [_Throttle().allow_request(request, None) for _ in range(20)]
+        assert results == [True] * 3 + [False] * 17
+        # Next window: only the 3 allowed requests weigh in, not the 17 rejected ones
+        now[0] = 680.0
+        assert _Throttle().allow_request(request, None)
+    finally:
+        _Throttle.timer = SlidingWindowThrottle.timer
+
+
+@pytest.mark.django_db
+def test_per_role_rates(rates):
+    rates(test="5/minute", test_help_seeker="2/minute")
+    seeker = User.objects.create_user(email="hs@example.com", password="x", role="help_seeker")
+    therapist = User.objects.create_user(email="t@example.com", password="x", role="therapist")
+    assert sum(_Throttle().allow_request(_request(seeker), None) for _ in range(5)) == 2
+    assert sum(_Throttle().allow_request(_request(therapist), None) for _ in range(7)) == 5
+    # Anonymous-only throttles ignore authenticated users
+    assert AnonThrottle().get_ident_key(_request(therapist)) is None
+
+
+@pytest.mark.django_db
+def test_login_throttled(rates):
+    rates(auth="3/minute", anon="100/minute")
+    client = APIClient()
+    codes = [
+        client.post(
+            "/api/v1/auth/login/", {"email": "x@example.com", "password": "bad"}, format="json"
+        ).status_code
+        for _ in range(4)
+    ]
+    assert codes == [status.HTTP_401_UNAUTHORIZED] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS]
@@ -0,0 +1,37 @@
+"""Tests for time-ordered UUID keys (config.uuids)."""
+
+import time
+import uuid
+
+import pytest
+
+from config import uuids
+from config.uuids import uuid7, uuid7_time_ms
+
+
+def test_uuid7_layout():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= uuid7_time_ms(value) <= after
+
+
+def test_uuid7_strictly_increasing_when_clock_stalls(monkeypatch):
+    monkeypatch.setattr(uuids.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    monkeypatch.setattr(uuids, "_last", 0)
+    values = [uuid7() for _ in range(5000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    assert all(v.version == 7 for v in values)
+
+
+@pytest.mark.django_db
+def test_audit_events_get_uuid7_ids():
+    from audit.models import AuditEvent
+
+    first = AuditEvent.objects.create(action="view", entity_type="patient")
+    second = AuditEvent.objects.create(action="view", entity_type="patient")
+    assert first.id.version == 7
+    assert first.id < second.id